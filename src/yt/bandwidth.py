@@ -0,0 +1,170 @@
+import sys
+import threading
+import time
+
+# --- BANDWIDTH SCHEDULER ---
+# The scheduler gives each download its share of the total by editing the params
+# dict its YoutubeDL holds. When a download sees the change depends on how yt-dlp
+# fetches the stream:
+# - plain HTTP (YouTube's usual DASH video and audio) re-reads params['ratelimit']
+#   for every chunk, so running streams are retuned live;
+# - HLS/DASH fragment downloads copy the params when each stream starts and keep
+#   that rate limit and connection count until it ends;
+# - aria2c gets the limit on its command line when each stream starts.
+# Each fragment connection enforces ratelimit on its own, so while it has a share
+# a download gets one fragment connection and its share really is its cap.
+
+BACKOFF_MIN = 1 / 16   # Never throttle below this fraction of the normal limit
+BACKOFF_COOLDOWN = 60  # Seconds without a 429 before the limit doubles again
+BACKOFF_GRACE = 5      # 429s this soon after a halving (retries of one burst) don't halve again
+TICK = 1.0             # Seconds between rebalances driven by progress hooks
+
+def in_window(hour, window):
+    """True if `hour` falls in (start, end); windows may wrap past midnight, e.g. (22, 6)."""
+    start, end = window
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+class BandwidthScheduler:
+    """Shares a total rate limit between the running downloads.
+
+    `limit` applies during the day and `off_peak_limit` inside `off_peak_hours`
+    (local time); None means unlimited. HTTP 429 responses halve the limit for a
+    while, backing off from the measured speed when no limit is set.
+    """
+
+    def __init__(self, limit=None, off_peak_limit=None, off_peak_hours=(1, 7), clock=time.time):
+        self.limit = limit
+        self.off_peak_limit = off_peak_limit
+        self.off_peak_hours = off_peak_hours
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.slots = {} # id(params) -> [params, last speed, its own fragment connections]
+        self.backoff = 1.0
+        self.backoff_base = None # Total speed when the 429s started
+        self.last_throttled = 0 # Last 429 (or recovery step): the cooldown counts from here
+        self.last_halved = 0
+        self.last_tick = 0
+
+    def configure(self, limit=None, off_peak_limit=None, off_peak_hours=None):
+        with self.lock:
+            self.limit = limit
+            self.off_peak_limit = off_peak_limit
+            if off_peak_hours:
+                self.off_peak_hours = off_peak_hours
+            self._rebalance()
+
+    def current_limit(self):
+        """Total bytes/s allowed right now, or None."""
+        now = self.clock()
+        hour = time.localtime(now).tm_hour
+        limit = self.off_peak_limit if in_window(hour, self.off_peak_hours) else self.limit
+        if self.backoff < 1:
+            # From what was actually flowing when the 429s started, if below the limit
+            base = min((x for x in (limit, self.backoff_base) if x), default=None)
+            if base:
+                limit = base * self.backoff
+        return limit
+
+    # --- Downloads ---
+    def join(self, params):
+        """Start managing a YoutubeDL params dict (before or while it downloads)."""
+        with self.lock:
+            self.slots[id(params)] = [params, None, params.get('concurrent_fragment_downloads', 1)]
+            self._rebalance()
+
+    def leave(self, params):
+        with self.lock:
+            self.slots.pop(id(params), None)
+            self._rebalance()
+
+    def hook(self, params):
+        """Progress hook for the download using `params`: feeds its speed and rebalances once a second."""
+        def on_progress(d):
+            if d['status'] != 'downloading':
+                return
+            with self.lock:
+                slot = self.slots.get(id(params))
+                if slot is not None:
+                    slot[1] = d.get('speed')
+                now = self.clock()
+                if now - self.last_tick >= TICK:
+                    self.last_tick = now
+                    self._recover(now)
+                    self._rebalance()
+        return on_progress
+
+    def throttled(self):
+        """Report an HTTP 429: halve the total rate."""
+        with self.lock:
+            now = self.clock()
+            self.last_throttled = now
+            if now - self.last_halved < BACKOFF_GRACE:
+                return
+            if self.backoff == 1.0:
+                self.backoff_base = sum(s[1] or 0 for s in self.slots.values()) or None
+            self.backoff = max(self.backoff / 2, BACKOFF_MIN)
+            self.last_halved = now
+            self._rebalance()
+
+    def logger(self):
+        """yt-dlp `logger` that spots 429s in the retry warnings and prints everything like quiet mode does."""
+        return ThrottleLogger(self)
+
+    # --- Sharing ---
+    def _recover(self, now):
+        if self.backoff < 1 and now - self.last_throttled >= BACKOFF_COOLDOWN:
+            self.backoff = min(self.backoff * 2, 1.0)
+            self.last_throttled = now
+
+    def _rebalance(self):
+        limit = self.current_limit()
+        shares = fair_shares(limit, [s[1] for s in self.slots.values()])
+        for (params, _, connections), share in zip(self.slots.values(), shares):
+            params['ratelimit'] = int(share) if share else None
+            params['concurrent_fragment_downloads'] = 1 if share else connections
+
+def fair_shares(limit, speeds):
+    """Max-min fair split of `limit` bytes/s between downloads currently going at `speeds`.
+
+    A download running well below its equal share (slow server, nearly done)
+    only keeps what it uses plus some headroom; the rest goes to the others.
+    """
+    n = len(speeds)
+    if not limit or not n:
+        return [None] * n
+    shares = [None] * n
+    remaining = limit
+    open_slots = list(range(n))
+    while open_slots:
+        equal = remaining / len(open_slots)
+        # Headroom so a download held back by its cap isn't mistaken for a slow one
+        slow = [i for i in open_slots if speeds[i] is not None and speeds[i] * 1.25 < equal]
+        if not slow or len(slow) == len(open_slots):
+            for i in open_slots:
+                shares[i] = equal
+            break
+        for i in slow:
+            shares[i] = speeds[i] * 1.25
+            remaining -= shares[i]
+            open_slots.remove(i)
+    return shares
+
+class ThrottleLogger:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def debug(self, msg):
+        pass # quiet mode drops these too
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        if 'HTTP Error 429' in msg:
+            self.scheduler.throttled()
+        print(msg, file=sys.stderr)
+
+    def error(self, msg):
+        if 'HTTP Error 429' in msg:
+            self.scheduler.throttled()
+        print(msg, file=sys.stderr)
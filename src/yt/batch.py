@@ -0,0 +1,73 @@
+from yt.urls import VIDEO_ID_RE, extract_video_id, normalize_url
+
+# --- BATCH INGESTION ---
+# Expands URL lists, playlists and channels into individual videos using yt-dlp's
+# flat extraction: entries are enumerated page by page without fetching each video.
+
+FLAT_OPTS = {
+    'quiet': True,
+    'extract_flat': 'in_playlist',
+    'lazy_playlist': True,
+    'ignoreerrors': True,
+}
+
+def read_url_file(path):
+    """Yield the URLs/IDs in a text file, one per line; blank lines and # comments are skipped."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield normalize_url(line)
+
+def iter_flat_entries(url, ydl):
+    """Yield flat entries for every video under `url`, descending into nested playlists (e.g. channel tabs)."""
+    info = ydl.extract_info(url, download=False, process=False)
+    if not info:
+        return
+    if info.get('_type') in ('url', 'url_transparent') and info.get('url') and info['url'] != url:
+        # Redirect (e.g. a channel handle resolving to its canonical URL)
+        yield from iter_flat_entries(info['url'], ydl)
+        return
+    if info.get('_type') not in ('playlist', 'multi_video'):
+        yield info
+        return
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        entry_id = entry.get('id') or ''
+        if entry.get('_type') == 'url' and not VIDEO_ID_RE.match(entry_id) and entry.get('url'):
+            # A channel lists its Videos/Shorts/Live tabs as playlists
+            yield from iter_flat_entries(entry['url'], ydl)
+        else:
+            yield entry
+
+def expand_sources(sources, known_ids=(), cancelled=lambda: False):
+    """Lazily yield {'id', 'url', 'title', 'creator'} for each new video in `sources`.
+
+    `sources` is an iterable of video, playlist or channel URLs. Videos whose ID is in
+    `known_ids` (e.g. already in the diary) or was already yielded are skipped.
+    """
+    import yt_dlp # Deferred: the GUI imports this module at startup
+    seen = set(known_ids)
+    with yt_dlp.YoutubeDL(FLAT_OPTS) as ydl:
+        for source in sources:
+            if cancelled(): return
+            video_id = extract_video_id(source)
+            if video_id:
+                # Single videos need no network round-trip at all
+                entries = [{'id': video_id, 'url': source}]
+            else:
+                entries = iter_flat_entries(source, ydl)
+            for entry in entries:
+                if cancelled(): return
+                video_id = entry.get('id')
+                if not video_id or video_id in seen:
+                    continue
+                seen.add(video_id)
+                url = entry.get('webpage_url') or entry.get('url') or video_id
+                yield {
+                    'id': video_id,
+                    'url': normalize_url(url) if VIDEO_ID_RE.match(url) else url,
+                    'title': entry.get('title'),
+                    'creator': entry.get('uploader') or entry.get('channel'),
+                }
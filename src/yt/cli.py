@@ -0,0 +1,421 @@
+"""Headless command line interface: `yt-cli fetch|download|subs|process|list|delete ...`.
+
+Never imports PySide6, so it runs on servers and from cron.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from yt.diary import DiaryManager
+from yt.metadata_cache import MetadataCache
+from yt.downloader import fetch_info, run_download, TransferMeter
+from yt.formats import MAX_HEIGHT, video_format_selector, video_opts
+from yt.profiles import PROFILES, DEFAULT_PROFILE, profile_opts
+from yt.batch import expand_sources, read_url_file
+from yt.urls import normalize_url
+from yt.thumbnails import ThumbnailStore
+from yt.bandwidth import BandwidthScheduler
+from yt.content_store import ContentStore
+from yt.search_index import SearchIndex, format_timestamp
+from yt.transcript_store import TranscriptStore
+from yt.postprocess import (POSTPROCESS_WORKERS, REMUX_PROFILES, plan, process_pool, run_pipeline,
+                            diary_fields, describe_media)
+from yt.transcripts import TranscriptEngine, TRANSCRIPT_WORKERS, SRT_DIR, result_record, ytdlp_fallback
+from yt_dlp.utils import parse_bytes
+
+class Output:
+    """Prints human-readable lines, or one JSON object per line with --json."""
+
+    def __init__(self, as_json):
+        self.as_json = as_json
+        self.lock = threading.Lock()
+
+    def emit(self, record, text):
+        with self.lock:
+            if self.as_json:
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+            else:
+                print(text, flush=True)
+
+    def log(self, text):
+        if not self.as_json:
+            with self.lock:
+                print(text, file=sys.stderr, flush=True)
+
+def gather_sources(args):
+    sources = [normalize_url(u) for u in args.urls]
+    if getattr(args, 'file', None):
+        sources.extend(read_url_file(args.file))
+    return sources
+
+def info_summary(info):
+    heights = sorted({f['height'] for f in info.get('formats') or []
+                      if f.get('vcodec') != 'none' and f.get('height')}, reverse=True)
+    return {
+        'id': info.get('id'),
+        'title': info.get('title'),
+        'uploader': info.get('uploader'),
+        'duration': info.get('duration'),
+        'url': info.get('webpage_url'),
+        'heights': heights,
+        'subtitles': sorted(k for k in (info.get('subtitles') or {}) if k != 'live_chat'),
+        'automatic_captions': sorted(k for k in (info.get('automatic_captions') or {}) if k != 'live_chat'),
+    }
+
+# --- COMMANDS ---
+SAVE_BATCH = 50 # Transcripts per diary write in `subs`
+
+def cmd_fetch(args, diary, cache, out):
+    failures = 0
+    for url in gather_sources(args):
+        try:
+            summary = info_summary(fetch_info(url, cache, args.refresh))
+            out.emit({'ok': True, 'source': url, **summary},
+                     f"{summary['id']}\t{summary['title']}\t{summary['uploader']}\t"
+                     f"{'/'.join(f'{h}p' for h in summary['heights'])}")
+        except Exception as e:
+            failures += 1
+            out.emit({'ok': False, 'source': url, 'error': str(e)}, f"ERROR {url}: {e}")
+    return failures
+
+def run_jobs(args, diary, out, make_job, path_key):
+    """Expand the sources and run make_job(entry) -> (opts, context) downloads on a thread pool.
+
+    Videos whose diary entry already has `path_key` are skipped unless --force.
+    """
+    os.makedirs("videos/SRT", exist_ok=True)
+    known_ids = set() if args.force else diary.get_history_video_ids(path_key)
+    entries = expand_sources(gather_sources(args), known_ids)
+    thumbs = ThumbnailStore(args.db) if path_key == 'video_path' and not args.no_thumbnail else None
+    content = ContentStore(args.db) if path_key == 'video_path' else None
+    search = SearchIndex(args.db)
+    bandwidth = None
+    if args.limit or args.off_peak_limit:
+        bandwidth = BandwidthScheduler(args.limit, args.off_peak_limit, args.off_peak)
+    failures = 0
+
+    def work(entry):
+        job = make_job(entry)
+        if job is None:
+            return entry, None, "No matching subtitles", None
+        opts, context = job
+        out.log(f"[start] {entry.get('title') or entry['url']}")
+        meter = TransferMeter()
+        filepath, info = run_download(entry['url'], opts, info=context.pop('info', None), progress_hooks=[meter],
+                                      bandwidth=bandwidth, content=content)
+        # Flat entries carry little metadata; fill the diary fields from the real info dict
+        context['title'] = context.get('title') or info.get('title')
+        context['creator'] = context.get('creator') or info.get('uploader')
+        if context['type'] == 'video':
+            context['description'] = info.get('description', '')
+        is_sub = context['type'] == 'subtitle'
+        diary.save_entry(
+            title=context.get('title') or 'Unknown',
+            url=entry['url'],
+            creator=context.get('creator') or 'Unknown',
+            description=context.get('description') or '',
+            format_info=context['format_desc'],
+            video_path=filepath if not is_sub else None,
+            srt_path=filepath if is_sub else None,
+            thumbnail=info.get('thumbnail')
+        )
+        saved = diary.find_by_url(entry['url'])
+        if saved:
+            # Full description for videos; transcript runs keep whatever was indexed before
+            search.update_entry(saved, context.get('description') if not is_sub else None)
+        if thumbs and filepath:
+            try:
+                thumbs.save_beside(filepath, entry['id'], info.get('thumbnail'))
+            except Exception as e:
+                out.log(f"[thumbnail] {entry['url']}: {e}")
+        return entry, filepath, None, meter.summary()
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(work, entry): entry for entry in entries}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                _, filepath, error, transfer = future.result()
+            except Exception as e:
+                filepath, error, transfer = None, str(e), None
+            if error:
+                failures += 1
+                out.emit({'ok': False, 'id': entry['id'], 'url': entry['url'], 'error': error},
+                         f"FAILED {entry['url']}: {error}")
+            else:
+                rate = f"\t{transfer['throughput'] / 1024 / 1024:.1f} MB/s" if transfer['bytes'] else ""
+                out.emit({'ok': True, 'id': entry['id'], 'url': entry['url'], 'filepath': filepath, **transfer},
+                         f"{entry['id']}\t{filepath}{rate}")
+    if thumbs:
+        thumbs.close()
+    if content:
+        content.close()
+    search.close()
+    return failures
+
+def cmd_download(args, diary, cache, out):
+    def make_job(entry):
+        opts = {**video_opts("best_1080", args.audio, args.quality), **profile_opts(args.profile)}
+        context = {
+            'type': 'video',
+            'title': entry.get('title'),
+            'creator': entry.get('creator'),
+            'profile': args.profile,
+            'format_desc': f"Video: {video_format_selector("best_1080", args.audio, args.quality)} (cli)",
+        }
+        return opts, context
+
+    return run_jobs(args, diary, out, make_job, 'video_path')
+
+def cmd_subs(args, diary, cache, out):
+    os.makedirs(SRT_DIR, exist_ok=True)
+    known_ids = set() if args.force else diary.get_history_video_ids('srt_path')
+    bandwidth = None
+    if args.limit or args.off_peak_limit:
+        # Only the yt-dlp fallback downloads through the scheduler
+        bandwidth = BandwidthScheduler(args.limit, args.off_peak_limit, args.off_peak)
+    store = TranscriptStore(args.db)
+    engine = TranscriptEngine(args.lang, args.jobs, fallback=ytdlp_fallback(args.lang, cache, bandwidth), store=store)
+    search = SearchIndex(args.db)
+    failures = 0
+    batch = []
+
+    def with_known_title(entry):
+        # Name the .srt after the video already in the diary instead of asking YouTube
+        known = None if entry.get('title') else diary.find_by_url(entry['url'])
+        return {**entry, 'title': known['title'], 'creator': known.get('creator')} if known else entry
+
+    def save():
+        for entry in diary.save_entries([result_record(r) for r in batch]):
+            search.update_entry(entry)
+        batch.clear()
+
+    try:
+        for result in engine.run(map(with_known_title, expand_sources(gather_sources(args), known_ids))):
+            if result['error']:
+                failures += 1
+                out.emit({'ok': False, 'id': result['id'], 'url': result['url'], 'error': result['error']},
+                         f"FAILED {result['url']}: {result['error']}")
+                continue
+            batch.append(result)
+            out.emit({'ok': True, **result}, f"{result['id']}\t{result['srt_path']}\t{result['source']}")
+            if len(batch) >= SAVE_BATCH:
+                save()
+        save()
+    finally:
+        search.close()
+        store.close()
+    return failures
+
+def cmd_transcript(args, diary, cache, out):
+    entry = diary.get_entry(args.id)
+    if not entry:
+        out.emit({'ok': False, 'id': args.id, 'error': "not found"}, f"Not found: {args.id}")
+        return 1
+    store = TranscriptStore(args.db)
+    try:
+        offset = entry.get('transcript_offset')
+        if offset is None and entry.get('srt_path'):
+            # Downloaded before the store existed: copy it in now
+            offset = store.add_srt(diary.resolve_path(entry['srt_path']))
+            diary.update_entries({entry['id']: {'transcript_offset': offset}})
+        if offset is None:
+            out.emit({'ok': False, 'id': args.id, 'error': "no transcript"}, f"No transcript: {args.id}")
+            return 1
+        if args.start is not None or args.end is not None:
+            cues = store.window(offset, args.start or 0, args.end if args.end is not None else float('inf'))
+        else:
+            cues = store.cues(offset)
+        for start, end, text in cues:
+            out.emit({'start': start, 'end': end, 'text': text}, f"[{format_timestamp(start)}] {text}")
+    finally:
+        store.close()
+    return 0
+
+def cmd_process(args, diary, cache, out):
+    if args.ids:
+        entries = [diary.get_entry(i) or {'id': i} for i in args.ids]
+    else:
+        entries = [e for e in diary.get_all_entries() if e.get('video_path')]
+    stages = plan(args.remux, args.loudnorm, args.split_chapters)
+    options = {'remux': args.remux, 'loudness': args.loudness}
+    failures = 0
+    updates = {}
+    with process_pool(args.jobs) as pool:
+        futures = {}
+        for entry in entries:
+            path = diary.resolve_path(entry.get('video_path'))
+            if not path or not os.path.exists(path):
+                failures += 1
+                out.emit({'ok': False, 'id': entry['id'], 'error': "no video file"}, f"FAILED {entry['id']}: no video file")
+                continue
+            futures[pool.submit(run_pipeline, path, stages, options, args.db)] = entry
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = {'path': None, 'results': {}, 'errors': {'pipeline': str(e)}, 'cached': []}
+            if outcome['results']:
+                updates[entry['id']] = diary_fields(outcome)
+            media = outcome['results'].get('probe', {}).get('media')
+            ok = not outcome['errors']
+            failures += not ok
+            errors = "; ".join(f"{name}: {error}" for name, error in outcome['errors'].items())
+            out.emit({'ok': ok, 'id': entry['id'], **outcome},
+                     f"{entry['id']}\t{outcome['path']}\t{describe_media(media) if media else ''}"
+                     + (f"\tFAILED {errors}" if errors else ""))
+    diary.update_entries(updates)
+    return failures
+
+def cmd_list(args, diary, cache, out):
+    for entry in diary.get_all_entries():
+        out.emit(entry, f"{entry.get('id')}\t{entry.get('date')}\t{entry.get('title')}\t{entry.get('url')}")
+    return 0
+
+def cmd_dedup(args, diary, cache, out):
+    content = ContentStore(args.db)
+    try:
+        seen, saved = content.dedup(args.dirs)
+    finally:
+        content.close()
+    out.emit({'ok': True, 'files': seen, 'saved_bytes': saved},
+             f"{seen} files checked, {saved / 1024 / 1024:.1f} MB reclaimed")
+    return 0
+
+def cmd_search(args, diary, cache, out):
+    search = SearchIndex(args.db)
+    try:
+        # Index whatever changed since the last run (new SRTs, entries added by the GUI)
+        entries = diary.get_all_entries()
+        for entry in entries:
+            search.update_entry(entry)
+        search.prune(e['id'] for e in entries)
+        hits = search.search_entries(" ".join(args.query), args.limit)
+    finally:
+        search.close()
+    for entry_id, hit in hits:
+        entry = diary.get_entry(entry_id) or {}
+        at = format_timestamp(hit['start']) if hit['start'] is not None else ""
+        out.emit({'id': entry_id, 'title': entry.get('title'), 'url': entry.get('url'), **hit},
+                 f"{entry_id}\t{at}\t{entry.get('title')}\t{hit['snippet']}")
+    return 0
+
+def cmd_delete(args, diary, cache, out):
+    failures = 0
+    search = SearchIndex(args.db)
+    for entry_id in args.ids:
+        ok = diary.delete_entry(entry_id)
+        if ok:
+            search.remove_entry(entry_id)
+        failures += not ok
+        out.emit({'ok': ok, 'id': entry_id}, f"{'Deleted' if ok else 'Not found'}: {entry_id}")
+    search.close()
+    return failures
+
+def rate_arg(text):
+    rate = parse_bytes(text)
+    if rate is None:
+        raise argparse.ArgumentTypeError(f"invalid rate: {text!r} (e.g. 500K, 2M)")
+    return rate
+
+def hours_arg(text):
+    try:
+        start, end = (int(h) for h in text.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid hours: {text!r} (e.g. 22-6)")
+    if not (0 <= start <= 23 and 0 <= end <= 23):
+        raise argparse.ArgumentTypeError(f"invalid hours: {text!r} (e.g. 22-6)")
+    return start, end
+
+# --- ENTRY POINT ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="yt-cli", description="Headless Youtube Video Manager")
+    parser.add_argument("--db", default="db", help="Diary/cache directory (default: db)")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output, one JSON object per line")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_sources(p):
+        p.add_argument("urls", nargs="*", help="Video, playlist or channel URLs (or video IDs)")
+        p.add_argument("-f", "--file", help="Text file with one URL per line")
+
+    def add_job_options(p):
+        p.add_argument("-j", "--jobs", type=int, default=2, help="Parallel downloads (default: 2, subs: 8)")
+        p.add_argument("--force", action="store_true", help="Download even if already in the diary")
+        p.add_argument("--limit", type=rate_arg, help="Total rate limit shared by all jobs, e.g. 2M")
+        p.add_argument("--off-peak-limit", type=rate_arg, help="Rate limit during --off-peak hours (default: none)")
+        p.add_argument("--off-peak", type=hours_arg, default=(1, 7), help="Off-peak hours, e.g. 22-6 (default: 1-7)")
+
+    p = sub.add_parser("fetch", help="Print metadata without downloading")
+    add_sources(p)
+    p.add_argument("--refresh", action="store_true", help="Ignore the metadata cache")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("download", help="Download videos")
+    add_sources(p)
+    add_job_options(p)
+    p.add_argument("-q", "--quality", type=int, default=MAX_HEIGHT, help=f"Max height (default: {MAX_HEIGHT})")
+    p.add_argument("--audio", default="bestaudio", help="Audio format_id (default: bestaudio)")
+    p.add_argument("--no-thumbnail", action="store_true", help="Don't save the thumbnail next to the video")
+    p.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE,
+                   help=f"Download speed profile (default: {DEFAULT_PROFILE}; 'max' uses aria2c if installed)")
+    p.set_defaults(func=cmd_download)
+
+    p = sub.add_parser("subs", help="Download transcripts as .srt")
+    add_sources(p)
+    add_job_options(p)
+    p.add_argument("-l", "--lang", default="en", help="Subtitle language (default: en)")
+    p.set_defaults(jobs=TRANSCRIPT_WORKERS)
+    p.set_defaults(func=cmd_subs)
+
+    p = sub.add_parser("process", help="Probe, remux, normalize or split downloaded videos (needs ffmpeg)")
+    p.add_argument("ids", nargs="*", help="Diary entry ids (default: every entry with a video)")
+    p.add_argument("-j", "--jobs", type=int, default=POSTPROCESS_WORKERS,
+                   help=f"Worker processes (default: {POSTPROCESS_WORKERS})")
+    p.add_argument("--remux", choices=list(REMUX_PROFILES), help="Convert to this profile, replacing the file")
+    p.add_argument("--loudnorm", action="store_true", help="Normalize audio loudness (EBU R128)")
+    p.add_argument("--loudness", type=float, help="Loudness target in LUFS (default: -16)")
+    p.add_argument("--split-chapters", action="store_true", help="Write each chapter to videos/Chapters/")
+    p.set_defaults(func=cmd_process)
+
+    p = sub.add_parser("list", help="List the download diary")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("transcript", help="Print a stored transcript, or the part between --from and --to")
+    p.add_argument("id", help="Diary entry id (see `list`)")
+    p.add_argument("--from", dest="start", type=float, help="Start, in seconds")
+    p.add_argument("--to", dest="end", type=float, help="End, in seconds")
+    p.set_defaults(func=cmd_transcript)
+
+    p = sub.add_parser("search", help="Search titles, descriptions and transcripts")
+    p.add_argument("query", nargs="+", help="Words to look for; the last one may be a prefix")
+    p.add_argument("-n", "--limit", type=int, default=20, help="Max videos to show (default: 20)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("dedup", help="Hardlink identical video files to reclaim disk space")
+    p.add_argument("dirs", nargs="*", default=["videos"], help="Folders to scan (default: videos)")
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser("delete", help="Delete diary entries and their files")
+    p.add_argument("ids", nargs="+", help="Diary entry ids (see `list`)")
+    p.set_defaults(func=cmd_delete)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if hasattr(args, 'urls') and not args.urls and not args.file:
+        build_parser().error(f"{args.command}: give at least one URL or --file")
+
+    diary = DiaryManager(args.db)
+    cache = MetadataCache(args.db)
+    try:
+        failures = args.func(args, diary, cache, Output(args.json))
+    finally:
+        diary.close()
+        cache.close()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+# --- CONTENT-ADDRESSED FILE INDEX ---
+# Downloaded files are indexed by content hash and by (video id, format). A
+# repeat request for the same video and format is answered from disk, and a
+# file identical to one already in the library becomes a hardlink to it.
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+class ContentStore:
+    """`db/content.db`: path -> (hash, size, mtime) plus the video id and format it was downloaded as."""
+
+    def __init__(self, storage_dir="db"):
+        os.makedirs(storage_dir, exist_ok=True)
+        self.db_path = os.path.join(storage_dir, "content.db")
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                video_id TEXT,
+                format TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_hash ON files(hash);
+            CREATE INDEX IF NOT EXISTS idx_files_video ON files(video_id, format);
+        """)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _valid(self, path, size, mtime_ns):
+        """The file is still there and unchanged since it was hashed; forgets it otherwise."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st and (st.st_size, st.st_mtime_ns) == (size, mtime_ns):
+            return True
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return False
+
+    def find(self, video_id, fmt):
+        """Path of an intact file already downloaded for `video_id` with format selector `fmt`, or None."""
+        if not video_id:
+            return None
+        with self.lock, self.conn:
+            rows = self.conn.execute("SELECT path, size, mtime_ns FROM files WHERE video_id = ? AND format IS ?",
+                                     (video_id, fmt)).fetchall()
+            return next((path for path, size, mtime_ns in rows if self._valid(path, size, mtime_ns)), None)
+
+    def find_hash(self, digest, exclude=None):
+        with self.lock, self.conn:
+            rows = self.conn.execute("SELECT path, size, mtime_ns FROM files WHERE hash = ? AND path != ?",
+                                     (digest, exclude or "")).fetchall()
+            return next((path for path, size, mtime_ns in rows if self._valid(path, size, mtime_ns)), None)
+
+    def hash_of(self, path):
+        """Content hash of `path`, from the index when the file hasn't changed since it was last hashed."""
+        key = self.key(path)
+        st = os.stat(path)
+        with self.lock:
+            row = self.conn.execute("SELECT hash, size, mtime_ns FROM files WHERE path = ?", (key,)).fetchone()
+        if row and (row[1], row[2]) == (st.st_size, st.st_mtime_ns):
+            return row[0]
+        digest = file_hash(path)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO files (path, hash, size, mtime_ns) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET hash = excluded.hash, size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns", (key, digest, st.st_size, st.st_mtime_ns))
+        return digest
+
+    def add(self, path, video_id=None, fmt=None):
+        """Index a finished file; if identical content is already stored, hardlink `path` to it.
+
+        Returns the number of bytes saved (0 if nothing was linked).
+        """
+        key = self.key(path)
+        digest = file_hash(path)
+        saved = 0
+        original = self.find_hash(digest, exclude=key)
+        if original and not os.path.samefile(original, path):
+            try:
+                tmp = f"{path}.link.tmp"
+                os.link(original, tmp)
+                os.replace(tmp, path)
+                saved = os.path.getsize(path)
+            except OSError as e:
+                # Other drive, or no hardlinks on this filesystem: keep both copies
+                print(f"Could not hardlink {path} to {original}: {e}")
+        st = os.stat(path)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO files (path, hash, size, mtime_ns, video_id, format) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET hash = excluded.hash, size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, video_id = COALESCE(excluded.video_id, video_id), "
+                "format = COALESCE(excluded.format, format)",
+                (key, digest, st.st_size, st.st_mtime_ns, video_id, fmt))
+        return saved
+
+    def dedup(self, dirs, extensions=('.mp4', '.mkv', '.webm', '.m4a', '.mp3', '.opus')):
+        """Index every media file in `dirs`, hardlinking duplicates. Returns (files seen, bytes saved)."""
+        seen = saved = 0
+        for directory in dirs:
+            try:
+                entries = [e for e in os.scandir(directory)
+                           if e.is_file() and os.path.splitext(e.name)[1].lower() in extensions]
+            except OSError:
+                continue
+            # Size first: only files sharing a size can be identical, so the rest are never hashed
+            by_size = {}
+            for entry in entries:
+                by_size.setdefault(entry.stat().st_size, []).append(entry.path)
+            for paths in by_size.values():
+                seen += len(paths)
+                if len(paths) > 1:
+                    for path in paths:
+                        saved += self.add(path)
+        return seen, saved
@@ -1,119 +1,318 @@
-import json
+import atexit
 import os
 import re
+import threading
 from datetime import datetime
 
+try:
+    from yt.storage import SQLiteStore
+    from yt.urls import extract_video_id, canonical_url
+    from yt.thumbnails import sidecar_path
+except ImportError:
+    from storage import SQLiteStore
+    from urls import extract_video_id, canonical_url
+    from thumbnails import sidecar_path
+
 class DiaryManager:
-    def __init__(self, storage_dir="db"):
+    def __init__(self, storage_dir="db", flush_delay=2.0):
         self.storage_dir = storage_dir
-        self.file_path = os.path.join(self.storage_dir, "download_history.json")
+        # Old JSON diary: imported once into SQLite
+        self.legacy_path = os.path.join(self.storage_dir, "download_history.json")
+        self.file_path = os.path.join(self.storage_dir, "download_history.db")
+        # Writes are buffered in memory and flushed this many seconds after the last one (0 = write-through)
+        self.flush_delay = flush_delay
+        self.lock = threading.RLock()
+
+        # In-memory view of the diary
+        self.entries = {}   # id -> entry (insertion ordered)
+        self.by_url = {}    # url -> id of the first entry with that url
+        self.by_video_id = {} # YouTube video id -> id of the first entry for it, whatever the url form
+        self.disk_signature = None
+        # Optional LibraryIndex: lets resolve_path answer from one directory scan instead of probing the disk
+        self.path_index = None
+
+        # Write-behind state
+        self.pending_upserts = {}
+        self.pending_deletes = set()
+        self.pending_clear = False
+        self.flush_timer = None
+
         self.ensure_history_file()
+        # Buffered writes land even if nobody calls close(); close() unregisters this again
+        atexit.register(self.flush)
 
     def ensure_history_file(self):
         if not os.path.exists(self.storage_dir):
             os.makedirs(self.storage_dir)
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+        self.store = SQLiteStore(self.file_path)
+        if os.path.exists(self.legacy_path) and not self.store.get_meta('legacy_imported'):
+            self.import_legacy_json(self.legacy_path)
+        self.reload()
+
+    def import_legacy_json(self, json_path):
+        count = self.store.import_json(json_path)
+        self.store.set_meta('legacy_imported', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        return count
+
+    def close(self):
+        with self.lock:
+            if self.store is None:
+                return
+            self.flush()
+            self.store.close()
+            self.store = None
+        atexit.unregister(self.flush)
+
+    # --- CACHE ---
+    def read_disk_signature(self):
+        """(mtime, size) of the store's files; changes when anyone writes to the diary."""
+        sig = []
+        for path in self.store.paths:
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def reload(self):
+        with self.lock:
+            self.entries = {e['id']: e for e in self.store.all_entries()}
+            self.by_url = {}
+            self.by_video_id = {}
+            for entry_id, entry in self.entries.items():
+                self.index_entry(entry)
+            self.disk_signature = self.read_disk_signature()
+
+    def ensure_fresh(self):
+        """Re-read the diary only if another process changed it on disk."""
+        with self.lock:
+            if self.read_disk_signature() != self.disk_signature:
+                # Our own unflushed writes win over what's on disk
+                self.flush()
+                self.reload()
+
+    def has_pending_writes(self):
+        return bool(self.pending_upserts or self.pending_deletes or self.pending_clear)
+
+    def schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self.flush_timer:
+            self.flush_timer.cancel()
+        self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+        self.flush_timer.daemon = True
+        self.flush_timer.start()
+
+    def flush(self):
+        """Write all buffered changes to disk in a single transaction."""
+        with self.lock:
+            if self.flush_timer:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if self.store is None or not self.has_pending_writes():
+                return
+            self.store.apply(
+                upserts=list(self.pending_upserts.values()),
+                deletes=list(self.pending_deletes),
+                clear=self.pending_clear)
+            self.pending_upserts = {}
+            self.pending_deletes = set()
+            self.pending_clear = False
+            self.disk_signature = self.read_disk_signature()
+
+    def index_entry(self, entry):
+        self.by_url.setdefault(entry.get('url'), entry['id'])
+        video_id = extract_video_id(entry.get('url'))
+        if video_id:
+            self.by_video_id.setdefault(video_id, entry['id'])
 
+    def put(self, entry, schedule=True):
+        with self.lock:
+            self.entries[entry['id']] = entry
+            self.index_entry(entry)
+            self.pending_upserts[entry['id']] = entry
+            if schedule:
+                self.schedule_flush()
+
+    # --- PUBLIC API ---
     def clear_history(self):
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+        with self.lock:
+            self.entries = {}
+            self.by_url = {}
+            self.by_video_id = {}
+            self.pending_upserts = {}
+            self.pending_deletes = set()
+            self.pending_clear = True
+            self.schedule_flush()
 
     def get_history_urls(self):
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            return list(set(entry['url'] for entry in history))
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
+        self.ensure_fresh()
+        with self.lock:
+            return [url for url in self.by_url if url]
+
+    def get_history_video_ids(self, path_key=None):
+        """Video IDs in the diary; with path_key ('video_path'/'srt_path') only entries that have that file."""
+        self.ensure_fresh()
+        with self.lock:
+            ids = {extract_video_id(e.get('url')) for e in self.entries.values()
+                   if path_key is None or e.get(path_key)}
+        ids.discard(None)
+        return ids
 
     def get_all_entries(self):
-        try:
-            if not os.path.exists(self.file_path):
-                return []
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
+        self.ensure_fresh()
+        with self.lock:
+            return [dict(e) for e in self.entries.values()]
+
+    def get_entry(self, entry_id):
+        self.ensure_fresh()
+        with self.lock:
+            entry = self.entries.get(entry_id)
+            return dict(entry) if entry else None
+
+    def find_by_url(self, url):
+        """Entry for `url`, or for the same YouTube video under another url form."""
+        self.ensure_fresh()
+        with self.lock:
+            entry_id = self.by_url.get(url) or self.by_video_id.get(extract_video_id(url))
+            return dict(self.entries[entry_id]) if entry_id else None
 
     def delete_entry(self, entry_id):
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            
-            # Find entry to get paths
-            entry = next((e for e in history if e.get('id') == entry_id), None)
-            if entry:
-                # Remove files if they exist
-                for path_key in ['video_path', 'srt_path']:
-                    raw_path = entry.get(path_key)
-                    if raw_path:
-                        actual_path = self.resolve_path(raw_path)
-                        if actual_path and os.path.exists(actual_path):
-                            try:
-                                os.remove(actual_path)
-                            except Exception as e:
-                                print(f"Error deleting file {actual_path}: {e}")
-                
-                # Remove from history
-                new_history = [e for e in history if e.get('id') != entry_id]
-                with open(self.file_path, 'w', encoding='utf-8') as f:
-                    json.dump(new_history, f, indent=4, ensure_ascii=False)
-                return True
-            return False
-        except (json.JSONDecodeError, FileNotFoundError):
-            return False
+        self.ensure_fresh()
+        with self.lock:
+            entry = self.entries.get(entry_id)
+            if not entry:
+                return False
+
+            # Remove files if they exist (and the thumbnail saved next to the video)
+            paths = [self.resolve_path(entry.get(k)) for k in ['video_path', 'srt_path']]
+            if paths[0]:
+                paths.append(sidecar_path(paths[0]))
+            if paths[1]:
+                # Timed transcript written next to the .srt by the transcript engine
+                paths.append(os.path.splitext(paths[1])[0] + ".json")
+            for actual_path in paths:
+                if actual_path and os.path.exists(actual_path):
+                    try:
+                        os.remove(actual_path)
+                    except Exception as e:
+                        print(f"Error deleting file {actual_path}: {e}")
+                    if self.path_index:
+                        self.path_index.update_file(actual_path)
+
+            # Remove from history
+            del self.entries[entry_id]
+            self.pending_upserts.pop(entry_id, None)
+            self.pending_deletes.add(entry_id)
+            url = entry.get('url')
+            if self.by_url.get(url) == entry_id:
+                del self.by_url[url]
+                # Legacy diaries may hold several entries for one url
+                other = next((i for i, e in self.entries.items() if e.get('url') == url), None)
+                if other:
+                    self.by_url[url] = other
+            video_id = extract_video_id(url)
+            if video_id and self.by_video_id.get(video_id) == entry_id:
+                del self.by_video_id[video_id]
+                other = next((i for i, e in self.entries.items() if extract_video_id(e.get('url')) == video_id), None)
+                if other:
+                    self.by_video_id[video_id] = other
+            self.schedule_flush()
+            return True
 
     def resolve_path(self, path):
         """Robustly find the file even if extension changed or suffix added."""
         if not path: return None
-        if os.path.exists(path): return path
-        
+        exists = self.path_index.exists if self.path_index else os.path.exists
+        if exists(path): return path
+
         # Try different extensions
         base, ext = os.path.splitext(path)
         for alt_ext in ['.mp4', '.mkv', '.webm', '.avi', '.srt']:
             alt_path = base + alt_ext
-            if os.path.exists(alt_path): return alt_path
-            
+            if exists(alt_path): return alt_path
+
         # Try stripping stream suffixes (e.g. .f251)
         cleaned_base = re.sub(r'\.f\d+$', '', base)
         if cleaned_base != base:
             for alt_ext in ['.mp4', '.mkv', '.webm', '.avi', '.srt']:
                 alt_path = cleaned_base + alt_ext
-                if os.path.exists(alt_path): return alt_path
-        
+                if exists(alt_path): return alt_path
+
         return path # Return original if not found
 
-    def save_entry(self, title, url, creator, description, format_info, video_path=None, srt_path=None):
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            history = []
+    def new_entry_id(self):
+        # Timestamp ids, bumped when two downloads finish within the same second
+        entry_id = int(datetime.now().timestamp())
+        while str(entry_id) in self.entries or str(entry_id) in self.pending_deletes:
+            entry_id += 1
+        return str(entry_id)
+
+    def save_entry(self, title, url, creator, description, format_info, video_path=None, srt_path=None, thumbnail=None):
+        return self.save_entries([{
+            'title': title, 'url': url, 'creator': creator, 'description': description, 'format_info': format_info,
+            'video_path': video_path, 'srt_path': srt_path, 'thumbnail': thumbnail}])[0]
+
+    def save_entries(self, records):
+        """save_entry() for many downloads at once (dicts of its arguments): one freshness check, one flush.
+
+        Returns the saved entries.
+        """
+        self.ensure_fresh()
+        if self.path_index:
+            for record in records:
+                for path in (record.get('video_path'), record.get('srt_path')):
+                    if path: self.path_index.update_file(path)
+        saved = []
+        with self.lock:
+            for record in records:
+                entry = self.merge_record(**record)
+                self.put(entry, schedule=False)
+                saved.append(entry)
+            if records:
+                self.schedule_flush()
+        return saved
+
+    def update_entries(self, updates):
+        """Set fields on existing entries, {entry id: {field: value}}, in one flush. Unknown ids are skipped."""
+        self.ensure_fresh()
+        with self.lock:
+            for entry_id, fields in updates.items():
+                if entry_id in self.entries:
+                    self.put({**self.entries[entry_id], **fields}, schedule=False)
+            if updates:
+                self.schedule_flush()
 
-        # Find existing entry for this URL to update it if possible
-        existing_entry = next((e for e in history if e['url'] == url), None)
+    def merge_record(self, title, url, creator, description, format_info, video_path=None, srt_path=None,
+                     thumbnail=None, transcript_offset=None):
+        # Find the existing entry for this video (youtu.be, shorts, watch?v=... are all one) to update it
+        existing_id = self.by_video_id.get(extract_video_id(url)) or self.by_url.get(url)
 
-        if existing_entry:
+        if existing_id:
+            existing_entry = dict(self.entries[existing_id])
             if video_path: existing_entry['video_path'] = video_path
-            if srt_path: existing_entry['srt_path'] = srt_path
+            if srt_path:
+                existing_entry['srt_path'] = srt_path
+                # A new .srt makes the stored copy stale unless it was stored along with it
+                existing_entry['transcript_offset'] = transcript_offset
             existing_entry['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             # Possibly update title/format if missing
             if not existing_entry.get('title'): existing_entry['title'] = title
-        else:
-            entry = {
-                "id": str(int(datetime.now().timestamp())),
-                "title": title,
-                "url": url,
-                "creator": creator,
-                "description": description[:200] + "..." if len(description) > 200 else description,
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "video_path": video_path,
-                "srt_path": srt_path,
-                "format": format_info
-            }
-            history.append(entry)
-
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=4, ensure_ascii=False)
+            if thumbnail and not existing_entry.get('thumbnail'): existing_entry['thumbnail'] = thumbnail
+            return existing_entry
+        description = description or ''
+        return {
+            "id": self.new_entry_id(),
+            "title": title,
+            "url": canonical_url(url),
+            "creator": creator,
+            "description": description[:200] + "..." if len(description) > 200 else description,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "video_path": video_path,
+            "srt_path": srt_path,
+            "format": format_info,
+            "thumbnail": thumbnail,
+            "transcript_offset": transcript_offset
+        }
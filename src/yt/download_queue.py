@@ -0,0 +1,215 @@
+import itertools
+from urllib.parse import urlparse
+from PySide6.QtCore import QObject, Signal
+from yt.workers import DownloadThread
+
+QUEUED, RUNNING, PAUSED, DONE, FAILED, CANCELLED = "Queued", "Running", "Paused", "Done", "Failed", "Cancelled"
+
+def host_of(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class DownloadJob:
+    def __init__(self, job_id, url, opts, context, info=None, priority=0):
+        self.id = job_id
+        self.url = url
+        self.opts = opts
+        self.context = context
+        self.info = info
+        self.priority = priority # Higher runs first
+        self.host = host_of(url)
+        self.status = QUEUED
+        self.message = ""
+        self.progress = None # Latest progress_stats() of the running download
+        self.transfer = None # TransferMeter summary once done: bytes, elapsed, throughput
+        self.thread = None
+        self.stop_reason = None # PAUSED / CANCELLED while a stop is pending
+        self.store_id = None # Row in the JobStore, if the queue persists jobs
+        self.filename = None # File yt-dlp is writing; its .part pieces are kept for resuming
+
+    @property
+    def title(self):
+        return self.context.get('title') or self.url
+
+# --- DOWNLOAD QUEUE ---
+class DownloadQueue(QObject):
+    """Runs DownloadThreads from a priority queue with global and per-host concurrency limits.
+
+    With a JobStore, unfinished jobs are persisted and can be restore()d after a restart.
+    A BandwidthScheduler shared by all jobs splits its rate limit between the running ones,
+    and a ContentStore lets them reuse files already downloaded.
+    """
+
+    job_added = Signal(object)     # DownloadJob
+    job_updated = Signal(object)   # DownloadJob (status, message or progress changed)
+    job_removed = Signal(object)   # DownloadJob
+    job_finished = Signal(dict)    # Same payload as DownloadThread.finished_signal, for the diary
+
+    def __init__(self, max_workers=3, per_host_limit=2, store=None, bandwidth=None, content=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.store = store
+        self.bandwidth = bandwidth
+        self.content = content
+        self.jobs = {} # job id -> DownloadJob, in submission order
+        self.ids = itertools.count(1)
+
+    # --- Submission & control ---
+    def enqueue(self, url, opts, context, info=None, priority=0):
+        job = DownloadJob(next(self.ids), url, opts, context, info, priority)
+        if self.store:
+            job.store_id = self.store.add(url, opts, context, priority)
+        self.jobs[job.id] = job
+        self.job_added.emit(job)
+        self.schedule()
+        return job
+
+    def restore(self, record, info=None):
+        """Re-add a JobStore record from a previous run as a paused job; resuming continues its .part files."""
+        job = DownloadJob(next(self.ids), record['url'], record['opts'], record['context'], info, record['priority'])
+        job.store_id = record['id']
+        job.filename = record['filename']
+        self.jobs[job.id] = job
+        self.job_added.emit(job)
+        self._set_status(job, PAUSED, "Interrupted")
+        return job
+
+    def set_limits(self, max_workers=None, per_host_limit=None):
+        if max_workers is not None: self.max_workers = max_workers
+        if per_host_limit is not None: self.per_host_limit = per_host_limit
+        self.schedule()
+
+    def set_priority(self, job_id, priority):
+        job = self.jobs.get(job_id)
+        if job:
+            job.priority = priority
+            self._persist(job, priority=priority)
+            self.job_updated.emit(job)
+            self.schedule()
+
+    def prioritize(self, job_id):
+        """Move a job ahead of everything else still waiting."""
+        top = max((j.priority for j in self.jobs.values()), default=0)
+        self.set_priority(job_id, top + 1)
+
+    def pause(self, job_id):
+        self._stop(job_id, PAUSED)
+
+    def cancel(self, job_id):
+        self._stop(job_id, CANCELLED)
+
+    def resume(self, job_id):
+        job = self.jobs.get(job_id)
+        if job and job.status in (PAUSED, FAILED):
+            self._set_status(job, QUEUED, "")
+            self.schedule()
+
+    def remove_finished(self):
+        for job in [j for j in self.jobs.values() if j.status in (DONE, FAILED, CANCELLED)]:
+            del self.jobs[job.id]
+            if job.status == FAILED:
+                self._forget(job, CANCELLED) # Given up on: its fragments go at the next startup
+            self.job_removed.emit(job)
+
+    def _stop(self, job_id, reason):
+        job = self.jobs.get(job_id)
+        if not job: return
+        if job.status == RUNNING:
+            # Takes effect at the next progress callback
+            job.stop_reason = reason
+            job.thread.cancel()
+            self._set_status(job, RUNNING, "Stopping...")
+        elif job.status in (QUEUED, PAUSED) or (job.status == FAILED and reason == CANCELLED):
+            self._set_status(job, reason, "")
+
+    # --- Scheduling ---
+    def running_jobs(self):
+        return [j for j in self.jobs.values() if j.status == RUNNING]
+
+    def pending_count(self):
+        return sum(1 for j in self.jobs.values() if j.status == QUEUED)
+
+    def schedule(self):
+        running = self.running_jobs()
+        per_host = {}
+        for job in running:
+            per_host[job.host] = per_host.get(job.host, 0) + 1
+
+        # Highest priority first, FIFO within a priority
+        waiting = sorted((j for j in self.jobs.values() if j.status == QUEUED), key=lambda j: (-j.priority, j.id))
+        slots = self.max_workers - len(running)
+        for job in waiting:
+            if slots <= 0: break
+            if per_host.get(job.host, 0) >= self.per_host_limit: continue
+            per_host[job.host] = per_host.get(job.host, 0) + 1
+            slots -= 1
+            self._start(job)
+
+    def _start(self, job):
+        job.stop_reason = None
+        job.progress = None
+        job.thread = DownloadThread(job.url, job.opts, job.context, info=job.info,
+                                    bandwidth=self.bandwidth, content=self.content)
+        job.thread.progress_signal.connect(lambda msg, j=job: self._on_progress(j, msg))
+        job.thread.stats_signal.connect(lambda stats, j=job: self._on_stats(j, stats))
+        job.thread.file_signal.connect(lambda path, j=job: self._on_file(j, path))
+        job.thread.finished_signal.connect(lambda result, j=job: self._on_result(j, result))
+        job.thread.finished.connect(lambda j=job: self._on_thread_done(j))
+        self._set_status(job, RUNNING, "Starting...")
+        job.thread.start()
+
+    def _on_progress(self, job, message):
+        if job.stop_reason: return
+        job.message = message
+        self.job_updated.emit(job)
+
+    def _on_stats(self, job, stats):
+        if job.stop_reason: return
+        job.progress = stats
+        job.message = ""
+        self.job_updated.emit(job)
+
+    def _on_file(self, job, path):
+        job.filename = path
+        self._persist(job, filename=path)
+
+    def _on_result(self, job, result):
+        if result.get('filepath'):
+            job.transfer = result.get('transfer')
+            self._set_status(job, DONE, result['filepath'])
+            self.job_finished.emit(result)
+        elif job.stop_reason:
+            self._set_status(job, job.stop_reason, "")
+        else:
+            self._set_status(job, FAILED, job.message)
+            self.job_finished.emit(result)
+
+    def _on_thread_done(self, job):
+        # Only now is the worker slot really free
+        job.thread = None
+        self.schedule()
+
+    def _set_status(self, job, status, message):
+        if status != job.status:
+            if status in (DONE, CANCELLED):
+                self._forget(job, status)
+            else:
+                self._persist(job, status=status)
+        job.status = status
+        job.message = message
+        self.job_updated.emit(job)
+
+    # --- Persistence ---
+    def _persist(self, job, **fields):
+        if self.store and job.store_id:
+            self.store.update(job.store_id, **fields)
+
+    def _forget(self, job, status):
+        if self.store and job.store_id:
+            self.store.finish(job.store_id, status)
+            job.store_id = None
+
+    def detach_store(self):
+        """Stop writing to the JobStore (app shutdown); what it holds now is what the next start restores."""
+        self.store = None
@@ -0,0 +1,162 @@
+import os
+import time
+from yt.urls import extract_video_id
+
+# --- QT-FREE DOWNLOAD CORE ---
+# Shared by DownloadThread (GUI) and the headless CLI. yt_dlp is imported by the
+# functions that run it: importing it costs more than the rest of the app's startup.
+
+DEFAULT_OUTTMPL = 'videos/%(title)s [%(height)sp].%(ext)s'
+
+# Stream URLs inside an info dict expire after a few hours; only reuse fresher ones for downloading
+INFO_REUSE_MAX_AGE = 2 * 3600
+
+def fetch_info(url, cache=None, force_refresh=False):
+    """Metadata for `url` (no download), served from a MetadataCache when possible. Sets `_fetched_at`."""
+    video_id = extract_video_id(url)
+    if cache and not force_refresh:
+        info = cache.get(video_id)
+        if info is not None:
+            return info
+    import yt_dlp
+    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    if cache:
+        cache.put(info.get('id') or video_id, info)
+    info['_fetched_at'] = time.time()
+    return info
+
+def build_params(ydl_opts, progress_hooks=()):
+    params = ydl_opts.copy()
+    params['progress_hooks'] = list(progress_hooks)
+    params['quiet'] = True
+    params['no_color'] = True
+    # Pick up .part files left by an interrupted run instead of starting over
+    params.setdefault('continuedl', True)
+
+    # Output template - ensure it goes to 'videos/' if not set
+    if 'outtmpl' not in params:
+        params['outtmpl'] = DEFAULT_OUTTMPL
+    return params
+
+def can_reuse_info(url, info):
+    if not info or info.get('id') != extract_video_id(url):
+        return False
+    return time.time() - info.get('_fetched_at', 0) < INFO_REUSE_MAX_AGE
+
+def extract(ydl, url, info=None):
+    """Download `url`, reusing an already-fetched info dict when it is fresh enough."""
+    import yt_dlp
+    if can_reuse_info(url, info):
+        try:
+            info = ydl.sanitize_info(dict(info), remove_private_keys=True)
+            return ydl.process_ie_result(info, download=True)
+        except yt_dlp.utils.DownloadError as e:
+            print(f"Cached info failed, re-extracting: {e}")
+    return ydl.extract_info(url, download=True)
+
+def final_filename(ydl, info, hook_filename=None):
+    # Determine the filename (if not already set by hook)
+    # prioritizing info.get('_filename') or info.get('filepath') if download finished
+    if info.get('_filename') and os.path.exists(info['_filename']):
+        return info['_filename']
+    elif info.get('requested_downloads') and os.path.exists(info['requested_downloads'][0].get('filepath', '')):
+        return info['requested_downloads'][0]['filepath']
+    elif hook_filename:
+        return hook_filename
+    # 1. Fallback
+    if info.get('requested_downloads'):
+        return info['requested_downloads'][0].get('filepath')
+    # 2. Check info dict for requested_subtitles
+    elif info.get('requested_subtitles'):
+        first_lang = next(iter(info['requested_subtitles']))
+        return info['requested_subtitles'][first_lang].get('filepath')
+    # 3. Fallback
+    return ydl.prepare_filename(info)
+
+# --- PROGRESS ---
+PROGRESS_INTERVAL = 0.1 # At most 10 progress updates per second per download
+
+def progress_stats(d):
+    """Numbers from a yt-dlp progress hook dict; total, speed (bytes/s) and eta (s) may be None."""
+    return {
+        'downloaded': d.get('downloaded_bytes') or 0,
+        'total': d.get('total_bytes') or d.get('total_bytes_estimate'),
+        'speed': d.get('speed'),
+        'eta': d.get('eta'),
+    }
+
+class ProgressThrottle:
+    """Rate-limits progress callbacks, which yt-dlp fires for every chunk written."""
+
+    def __init__(self, interval=PROGRESS_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.last = None
+
+    def ready(self, final=False):
+        """True if an update should go out now; `final` ones always do."""
+        now = self.clock()
+        if final or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            return True
+        return False
+
+class TransferMeter:
+    """Progress hook totalling the files of one job, for its overall throughput."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.bytes = 0
+
+    def __call__(self, d):
+        # One 'finished' per file: video stream, audio stream, subtitles...
+        if d['status'] == 'finished':
+            self.bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+
+    def summary(self):
+        elapsed = max(self.clock() - self.started, 1e-6)
+        return {'bytes': self.bytes, 'elapsed': round(elapsed, 2), 'throughput': self.bytes / elapsed}
+
+def run_download(url, ydl_opts, info=None, progress_hooks=(), bandwidth=None, content=None):
+    """Run one download to completion. Returns (filepath, info); raises on failure.
+
+    With a BandwidthScheduler the download's rate limit is managed for its whole run.
+    With a ContentStore a video already downloaded in the same format is not fetched
+    again, and a finished file identical to one on disk is hardlinked to it.
+    """
+    import yt_dlp
+    video_id = extract_video_id(url)
+    fmt = ydl_opts.get('format')
+    dedup = content is not None and not ydl_opts.get('skip_download')
+    if dedup:
+        existing = content.find(video_id, fmt)
+        if existing:
+            return existing, info or {'id': video_id}
+
+    state = {'filename': None}
+
+    def track_filename(d):
+        if d['status'] == 'finished' and 'filename' in d:
+            state['filename'] = d['filename']
+
+    params = build_params(ydl_opts, [*progress_hooks, track_filename])
+    if bandwidth:
+        params['progress_hooks'].append(bandwidth.hook(params))
+        params['logger'] = bandwidth.logger()
+        bandwidth.join(params)
+    try:
+        with yt_dlp.YoutubeDL(params) as ydl:
+            info = extract(ydl, url, info)
+            filepath = final_filename(ydl, info, state['filename'])
+        if dedup and filepath and os.path.isfile(filepath):
+            content.add(filepath, video_id or info.get('id'), fmt)
+        return filepath, info
+    except yt_dlp.utils.DownloadError as e:
+        if bandwidth and 'HTTP Error 429' in str(e):
+            bandwidth.throttled()
+        raise
+    finally:
+        if bandwidth:
+            bandwidth.leave(params)
@@ -0,0 +1,190 @@
+# --- FORMAT SELECTION ---
+# Qt-free helpers shared by the GUI and the CLI: what to offer for a fetched video,
+# and how to turn the user's choices into yt-dlp options.
+import re
+
+MAX_HEIGHT = 1080
+
+# Language names mapping (short list of common ones)
+LANG_MAP = {
+    'en': 'English', 'ko': 'Korean', 'es': 'Spanish', 'ja': 'Japanese',
+    'zh': 'Chinese', 'fr': 'French', 'de': 'German', 'hi': 'Hindi',
+    'ru': 'Russian', 'pt': 'Portuguese', 'it': 'Italian', 'ar': 'Arabic'
+}
+
+QUALITY_TERMS = ("low", "medium", "ultra-low", "high")
+
+def clean_note(note):
+    """Format note without the low/medium/high quality words, e.g. "original (default), low" -> "Original (Default)"."""
+    if not note: return ""
+    n = note.lower()
+    for term in QUALITY_TERMS:
+        n = n.replace(term, "")
+    n = n.strip(", ").strip()
+    return n.title() if n else ""
+
+def audio_language(code):
+    lang = LANG_MAP.get(code.split('-')[0]) if code else None
+    if not lang:
+        # If really unknown, use 'Original Audio' as base
+        lang = 'Original Audio' if not code or code == 'und' else code
+    return lang
+
+def en_score(code, label):
+    """English priority: exact English first, then anything English-ish, then the rest."""
+    c = code.lower()
+    l = label.lower()
+    if c == 'en' or l == 'english': return -2
+    if 'en' in c or 'english' in l: return -1
+    return 0
+
+def sub_label(code, formats):
+    if formats and formats[0].get('name'):
+        name = formats[0].get('name')
+        # Clean up "English - English" -> "English"
+        if " - " in name:
+            parts = name.split(" - ")
+            if parts[0].strip() == parts[1].strip():
+                return parts[0].strip()
+        return name
+    return code
+
+def substrings(text):
+    return {text[i:j] for i in range(len(text)) for j in range(i + 1, len(text) + 1)}
+
+
+def video_audio_choices(formats):
+    """One pass over `formats` -> (video choices, audio choices) as (label, combo data) lists."""
+    video_options = []
+    audio_tracks = {} # (lang, note) -> (abr, lang, note, format)
+    for f in formats:
+        vcodec = f.get('vcodec')
+        if vcodec != 'none':
+            h = f.get('height')
+            if h and h <= MAX_HEIGHT:
+                video_options.append((h, f))
+        elif f.get('acodec') != 'none':
+            lang = audio_language(f.get('language'))
+            note = clean_note(f.get('format_note'))
+            abr = f.get('abr') or 0
+            track = audio_tracks.get((lang, note))
+            if track is None or abr > track[0]:
+                audio_tracks[(lang, note)] = (abr, lang, note, f)
+
+    # Video: highest first, one entry per resolution
+    video_options.sort(key=lambda x: x[0], reverse=True)
+    best_vid_text = "Best Available (Max 1080p)"
+    if video_options:
+        best_vid_text = f"Best Available ({video_options[0][0]}p)"
+    video = [(best_vid_text, "best_1080")]
+    seen_res = set()
+    for h, f in video_options:
+        if h not in seen_res:
+            video.append((f"{h}p - {f.get('ext')}", f['format_id']))
+            seen_res.add(h)
+
+    # Audio: by language code, then bitrate
+    sorted_audio = sorted(audio_tracks.values(),
+                          key=lambda t: (t[3].get('language') or 'und', t[0]), reverse=True)
+    best_audio_text = "Default / Best Audio"
+    if sorted_audio:
+        abr, lang = sorted_audio[0][:2]
+        best_audio_text = f"Default / Best Audio ({lang} - {int(abr)} kbps)"
+    audio = [(best_audio_text, "bestaudio")]
+    for abr, lang, note, f in sorted_audio:
+        label = f"{lang}"
+        if note: label += f" ({note})"
+        if abr: label += f" - {int(abr)} kbps"
+        audio.append((label, f['format_id']))
+    return video, audio
+
+def subtitle_choices(info):
+    """Manual subtitles plus auto captions for languages with no manual track, English first.
+
+    An auto caption counts as covered when its code is a substring of a manual code or vice
+    versa ('en' vs 'en-US'): a set of every substring of the manual codes answers one direction,
+    a compiled alternation the other, so there is no manual x auto scan.
+    """
+    sub_options = []
+    manual_subs = info.get('subtitles') or {}
+    for code, formats in manual_subs.items():
+        if code == 'live_chat': continue
+        sub_options.append((sub_label(code, formats), {"code": code, "is_auto": False}))
+
+    manual_codes = set(manual_subs)
+    # One alternation over the manual codes finds "manual inside auto" in a single C-level scan
+    contains_manual = re.compile('|'.join(map(re.escape, manual_codes))).search if manual_codes else lambda code: None
+    manual_parts = set()
+    for m in manual_codes:
+        manual_parts |= substrings(m)
+
+    auto_subs = info.get('automatic_captions') or {}
+    for code, formats in auto_subs.items():
+        if code == 'live_chat': continue
+        # If any manual track exists for roughly the same language, skip auto for it
+        exists = code in manual_parts or contains_manual(code) is not None
+        if not exists:
+            label = f"{sub_label(code, formats)} (auto-generated)"
+            sub_options.append((label, {"code": code, "is_auto": True}))
+
+    # Sort: English first, then by score, then alphabetically
+    sub_options.sort(key=lambda x: (en_score(x[1]["code"], x[0]), x[0]))
+    return sub_options
+
+def format_choices(info):
+    """Everything the Download/Transcript tabs offer for a fetched video."""
+    video, audio = video_audio_choices(info.get('formats') or [])
+    return {'video': video, 'audio': audio, 'subtitles': subtitle_choices(info)}
+
+def height_selector(height=MAX_HEIGHT):
+    return f"bestvideo[height<={height}]"
+
+def video_format_selector(vid_fmt="best_1080", audio_fmt="bestaudio", height=MAX_HEIGHT):
+    """yt-dlp format string for a video choice ("best_1080", a selector or a format_id) plus an audio choice.
+
+    `height` caps "best_1080" and the single-file fallback.
+    """
+    # Build format selector
+    if vid_fmt == "best_1080":
+        video_sel = height_selector(height)
+    else:
+        video_sel = vid_fmt
+
+    if audio_fmt == "bestaudio":
+        # Default behavior: best video (<=height) + best audio
+        return f"{video_sel}+bestaudio/best[height<={height}]"
+    # Strict behavior: best video (<=1080) + PRECISE audio selected by user
+    # No fallback to 'best' because 'best' might have the wrong language.
+    # We want to force video_sel + specific audio_fmt.
+    # However, we must handle cases where the video_sel + audio_fmt can't merge.
+    # Usually, + handles this if ffmpeg is present.
+    return f"{video_sel}+{audio_fmt}"
+
+def video_opts(vid_fmt="best_1080", audio_fmt="bestaudio", height=MAX_HEIGHT):
+    return {
+        'format': video_format_selector(vid_fmt, audio_fmt, height),
+        'merge_output_format': 'mp4',
+    }
+
+def subtitle_opts(code, is_auto=False):
+    return {
+        'skip_download': True,
+        'subtitleslangs': [code],
+        'outtmpl': 'videos/SRT/%(title)s (Subtitle).%(ext)s',
+        'writesubtitles': not is_auto,
+        'writeautomaticsub': is_auto,
+        'subtitlesformat': 'srt',
+        'convertsubtitles': 'srt',
+    }
+
+def choose_subtitle(info, lang="en"):
+    """Pick (code, is_auto) for `lang`: manual subtitles before auto captions, exact code before prefix match."""
+    manual = info.get('subtitles') or {}
+    auto = info.get('automatic_captions') or {}
+    for tracks, is_auto in ((manual, False), (auto, True)):
+        if lang in tracks:
+            return lang, is_auto
+        for code in tracks:
+            if code != 'live_chat' and code.split('-')[0] == lang:
+                return code, is_auto
+    return None
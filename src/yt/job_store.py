@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# --- PERSISTED DOWNLOAD JOBS ---
+# A row per queued/running download in `db/jobs.db`, so an app restart (or crash)
+# can pick unfinished downloads up again from yt-dlp's .part files. A download that
+# ends (done, cancelled, given up) after writing files keeps its row as finished
+# until the next start has removed the pieces it left behind.
+
+UNFINISHED = ("Queued", "Running", "Paused", "Failed")
+
+class JobStore:
+    """Download jobs that have not finished yet: URL, format, output template, status."""
+
+    def __init__(self, storage_dir="db"):
+        os.makedirs(storage_dir, exist_ok=True)
+        self.db_path = os.path.join(storage_dir, "jobs.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                format TEXT,
+                outtmpl TEXT,
+                opts TEXT NOT NULL,
+                context TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                filename TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def add(self, url, opts, context, priority=0, status="Queued"):
+        now = time.time()
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO jobs (url, format, outtmpl, opts, context, priority, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, opts.get('format'), opts.get('outtmpl'), json.dumps(opts), json.dumps(context),
+                 priority, status, now, now))
+        return cur.lastrowid
+
+    def update(self, job_id, **fields):
+        """Set some of status, filename, priority."""
+        if not fields:
+            return
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {columns}, updated_at = ? WHERE id = ?",
+                              (*fields.values(), time.time(), job_id))
+
+    def remove(self, job_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def finish(self, job_id, status):
+        """The job is over. Kept as `status` if it wrote files, for finished() to clean up after; else dropped."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE id = ? AND filename IS NULL", (job_id,))
+            self.conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def finished(self):
+        """Ended jobs whose pieces may still be on disk: [{'id', 'filename'}]."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, filename FROM jobs "
+                f"WHERE status NOT IN ({', '.join('?' * len(UNFINISHED))}) ORDER BY id", UNFINISHED).fetchall()
+        return [{'id': r[0], 'filename': r[1]} for r in rows]
+
+    def unfinished(self):
+        """Jobs left over from a previous run, oldest first, as dicts with decoded opts/context."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, url, opts, context, priority, status, filename FROM jobs "
+                f"WHERE status IN ({', '.join('?' * len(UNFINISHED))}) ORDER BY id", UNFINISHED).fetchall()
+        return [{'id': r[0], 'url': r[1], 'opts': json.loads(r[2]), 'context': json.loads(r[3]),
+                 'priority': r[4], 'status': r[5], 'filename': r[6]} for r in rows]
+
+# --- LEFTOVER FRAGMENTS ---
+# yt-dlp writes `<name>.<ext>.part` (+ `.ytdl` state and `.part-FragN` pieces for
+# fragmented streams, `.aria2` control files with aria2c) and keeps `<name>.f<format id>.<ext>` until video and audio
+# are merged. After an interruption these stay behind next to the real videos.
+# Only the pieces of downloads this app recorded are ever removed: files with the
+# same name as a finished or abandoned job, in that job's directory. Anything else
+# in the folders, kept on purpose or from yt-dlp runs outside the app, is left alone.
+
+FRAGMENT_RE = re.compile(r'(\.part(-Frag\d+)?|\.ytdl|\.aria2)$')
+FORMAT_FILE_RE = re.compile(r'\.f\d+(-\d+)?$')
+
+def download_stem(path):
+    """`videos/Title [1080p].f137.mp4.part` -> `title [1080p]` (normcased), the name shared by all pieces."""
+    name = os.path.basename(path)
+    while True:
+        stripped = FRAGMENT_RE.sub('', name)
+        if stripped == name:
+            break
+        name = stripped
+    name = os.path.splitext(name)[0]
+    return os.path.normcase(FORMAT_FILE_RE.sub('', name))
+
+def is_fragment(name):
+    if FRAGMENT_RE.search(name):
+        return True
+    return bool(FORMAT_FILE_RE.search(os.path.splitext(name)[0]))
+
+def clean_fragments(paths, keep_paths=(), older_than=None):
+    """Delete the pieces left by the downloads of `paths` (files they were writing). Returns removed paths.
+
+    Pieces shared with one of `keep_paths` (downloads that can still be resumed) and
+    pieces modified after `older_than` (a timestamp; downloads started since) stay.
+    """
+    keep = {(os.path.normcase(os.path.dirname(os.path.abspath(p))), download_stem(p)) for p in keep_paths if p}
+    stems = {}
+    for path in paths:
+        if not path:
+            continue
+        directory = os.path.dirname(os.path.abspath(path))
+        if (os.path.normcase(directory), download_stem(path)) not in keep:
+            stems.setdefault(directory, set()).add(download_stem(path))
+    removed = []
+    for directory, wanted in stems.items():
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if not is_fragment(entry.name) or download_stem(entry.name) not in wanted:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    if older_than is None or entry.stat().st_mtime < older_than:
+                        os.remove(entry.path)
+                        removed.append(entry.path)
+                except OSError as e:
+                    print(f"Could not remove {entry.path}: {e}")
+    return removed
@@ -0,0 +1,217 @@
+import os
+import re
+import threading
+from yt.urls import extract_video_id
+
+# --- LIBRARY INDEX ---
+# One os.scandir pass over the download folders replaces the per-entry exists/getsize
+# probes of DiaryManager.resolve_path, which are slow on network drives.
+
+VIDEO_DIR = "videos"
+SRT_DIR = os.path.join("videos", "SRT")
+
+def dir_key(path):
+    return os.path.normcase(os.path.abspath(path or '.'))
+
+class LibraryIndex:
+    """Stem -> file index of a few flat directories, with each file's size and mtime.
+
+    Built off the GUI thread by scan(); lookups only read the current dict, which
+    scan() replaces in one assignment, so they never block on the filesystem.
+    """
+
+    def __init__(self, roots=(VIDEO_DIR, SRT_DIR)):
+        self.roots = list(roots)
+        self.lock = threading.Lock()
+        # dir key -> {stem key -> {ext key -> (name, size, mtime_ns)}}
+        self.dirs = {}
+        self.dir_keys = {} # raw dirname -> dir key; abspath dominates lookups otherwise
+        self.ready = False
+
+    def scan(self, progress=None, cancelled=lambda: False):
+        """Rebuild the index. `progress(files_seen)` is called every 500 files. Returns False if cancelled."""
+        dirs = {}
+        seen = 0
+        for root in self.roots:
+            stems = dirs.setdefault(dir_key(root), {})
+            try:
+                it = os.scandir(root)
+            except OSError:
+                continue # Missing folder: indexed as empty
+            with it:
+                for entry in it:
+                    if cancelled(): return False
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    self.add_record(stems, entry.name, st.st_size, st.st_mtime_ns)
+                    seen += 1
+                    if progress and seen % 500 == 0:
+                        progress(seen)
+        with self.lock:
+            self.dirs = dirs
+            self.ready = True
+        return True
+
+    @staticmethod
+    def add_record(stems, name, size, mtime_ns):
+        stem, ext = os.path.splitext(name)
+        stems.setdefault(os.path.normcase(stem), {})[os.path.normcase(ext)] = (name, size, mtime_ns)
+
+    def split(self, path):
+        """(stems of the containing dir or None if not indexed, stem key, ext key)."""
+        directory, name = os.path.split(path)
+        key = self.dir_keys.get(directory)
+        if key is None:
+            key = self.dir_keys[directory] = dir_key(directory)
+        stems = self.dirs.get(key) if self.ready else None
+        stem, ext = os.path.splitext(name)
+        return stems, os.path.normcase(stem), os.path.normcase(ext)
+
+    def covers(self, path):
+        return bool(path) and self.split(path)[0] is not None
+
+    def lookup(self, path):
+        """(name, size, mtime_ns) for `path`, or None if it is not in the index."""
+        stems, stem, ext = self.split(path)
+        return (stems or {}).get(stem, {}).get(ext)
+
+    def exists(self, path):
+        stems, stem, ext = self.split(path)
+        if stems is None:
+            return os.path.exists(path)
+        return ext in stems.get(stem, ())
+
+    def size(self, path):
+        """Size in bytes, or None if the file is missing."""
+        if not path:
+            return None
+        stems, stem, ext = self.split(path)
+        if stems is None:
+            try:
+                return os.path.getsize(path)
+            except OSError:
+                return None
+        record = stems.get(stem, {}).get(ext)
+        return record[1] if record else None
+
+    def update_file(self, path):
+        """Re-stat one file (after a download or deletion) without rescanning its folder."""
+        if not self.covers(path):
+            return
+        with self.lock:
+            stems, stem, ext = self.split(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                files = stems.get(stem)
+                if files:
+                    files.pop(ext, None)
+                    if not files:
+                        del stems[stem]
+                return
+            self.add_record(stems, os.path.basename(path), st.st_size, st.st_mtime_ns)
+
+    def sync_dir(self, root, check_sizes=False):
+        """Bring one indexed folder up to date; returns [(kind, path)] with kind added/removed/changed.
+
+        Only new names are stat-ed, unless `check_sizes` (polling, where no change
+        notifications arrive) asks to compare every file's size and mtime.
+        """
+        key = dir_key(root)
+        if not self.ready or key not in self.dirs:
+            return []
+        try:
+            with os.scandir(root) as it:
+                listing = {e.name: e for e in it if e.is_file()}
+        except OSError:
+            listing = {}
+
+        events = []
+        with self.lock:
+            stems = self.dirs[key]
+            known = {rec[0]: rec for files in stems.values() for rec in files.values()}
+            for name, rec in known.items():
+                if name not in listing:
+                    stem, ext = os.path.splitext(name)
+                    files = stems.get(os.path.normcase(stem), {})
+                    files.pop(os.path.normcase(ext), None)
+                    if not files:
+                        stems.pop(os.path.normcase(stem), None)
+                    events.append(('removed', os.path.join(root, name)))
+            for name, entry in listing.items():
+                rec = known.get(name)
+                if rec is not None and not check_sizes:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if rec is None:
+                    events.append(('added', os.path.join(root, name)))
+                elif (rec[1], rec[2]) == (st.st_size, st.st_mtime_ns):
+                    continue
+                else:
+                    events.append(('changed', os.path.join(root, name)))
+                self.add_record(stems, name, st.st_size, st.st_mtime_ns)
+        return events
+
+    def keys_for(self, path):
+        """(dir key, stem key) pairs whose files can change what resolve_path returns for `path`."""
+        if not path:
+            return []
+        directory, name = os.path.split(path)
+        stem = os.path.normcase(os.path.splitext(name)[0])
+        key = self.dir_keys.get(directory) or dir_key(directory)
+        keys = [(key, stem)]
+        cleaned = re.sub(r'\.f\d+$', '', stem)
+        if cleaned != stem:
+            keys.append((key, cleaned))
+        return keys
+
+def library_row(diary, entry):
+    """Display row for a diary entry: resolved paths plus what the explorer shows."""
+    index = diary.path_index
+    video_path = diary.resolve_path(entry.get('video_path'))
+    srt_path = diary.resolve_path(entry.get('srt_path'))
+    if index:
+        size = index.size(video_path)
+        has_srt = bool(srt_path and index.exists(srt_path))
+    else:
+        size = os.path.getsize(video_path) if video_path and os.path.exists(video_path) else None
+        has_srt = bool(srt_path and os.path.exists(srt_path))
+    return {
+        'id': entry.get('id'),
+        'title': entry.get('title', 'Unknown'),
+        'url': entry.get('url'),
+        'video_path': video_path,
+        'size': size,
+        'has_srt': has_srt,
+        'scanned': True,
+        'paths': (entry.get('video_path'), entry.get('srt_path')),
+        'video_id': extract_video_id(entry.get('url')),
+        'thumbnail': entry.get('thumbnail'),
+        'media': entry.get('media'),
+    }
+
+def placeholder_row(entry):
+    """Row shown before the first scan finishes; size and SRT are filled in afterwards."""
+    return {
+        'id': entry.get('id'),
+        'title': entry.get('title', 'Unknown'),
+        'url': entry.get('url'),
+        'video_path': entry.get('video_path'),
+        'size': None,
+        'has_srt': False,
+        'scanned': False,
+        'paths': (entry.get('video_path'), entry.get('srt_path')),
+        'video_id': extract_video_id(entry.get('url')),
+        'thumbnail': entry.get('thumbnail'),
+    }
+
+def library_stats(rows):
+    sizes = [r['size'] for r in rows if r['size'] is not None]
+    return {'videos': len(sizes), 'size': sum(sizes), 'srts': sum(1 for r in rows if r['has_srt'])}
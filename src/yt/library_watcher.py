@@ -0,0 +1,107 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+from yt.workers import LibrarySyncThread
+
+# --- LIBRARY WATCHER ---
+# Keeps a LibraryIndex in step with videos/ and videos/SRT/ without full rescans.
+# QFileSystemWatcher reports which folder changed; only that folder's listing is
+# diffed and only new files are stat-ed. Folders it cannot watch (missing at
+# startup, or filesystems without change notifications) are polled instead.
+# Network mounts (NFS, SMB) accept a watch but never report changes made from
+# other machines, so every poll also stats each watched folder: when its mtime
+# moved since the last sync (a file was added, removed or renamed there), that
+# folder is diffed like a notified one. One stat per folder, whatever its size.
+
+class LibraryWatcher(QObject):
+    files_changed = Signal(list) # [(kind, path)], kind is added/removed/changed
+
+    DEBOUNCE_MS = 500 # A download touches .part/.ytdl files many times a second
+    POLL_MS = 10000
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.dirty = set()
+        self.sync_thread = None
+        self.signatures = {} # root -> folder mtime when it was last listed
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.sync)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_MS)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.watch_roots()
+        self.remember_signatures(self.index.roots)
+        self.poll_timer.start()
+
+    def stop(self):
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+        if self.sync_thread:
+            self.sync_thread.wait(2000)
+
+    def watch_roots(self):
+        watched = set(self.watcher.directories())
+        for root in self.index.roots:
+            if root not in watched and os.path.isdir(root):
+                self.watcher.addPath(root)
+
+    def unwatched_roots(self):
+        watched = set(self.watcher.directories())
+        return [root for root in self.index.roots if root not in watched]
+
+    @staticmethod
+    def signature(root):
+        try:
+            return os.stat(root).st_mtime_ns
+        except OSError:
+            return None
+
+    def remember_signatures(self, roots):
+        for root in roots:
+            self.signatures[root] = self.signature(root)
+
+    def on_directory_changed(self, path):
+        self.dirty.add(path)
+        self.debounce_timer.start()
+
+    def poll(self):
+        # A folder created after startup becomes watchable; the rest are diffed in full
+        self.watch_roots()
+        roots = self.unwatched_roots()
+        # Watched folders that changed without a notification, e.g. on a network mount
+        missed = [root for root in self.index.roots
+                  if root not in roots and root not in self.dirty and self.signature(root) != self.signatures.get(root)]
+        if missed:
+            self.dirty.update(missed)
+            self.debounce_timer.start()
+        if roots and not self.sync_thread:
+            self.run_sync(roots, check_sizes=True)
+
+    def sync(self):
+        if self.sync_thread:
+            # Picked up when the running sync finishes
+            return
+        roots, self.dirty = sorted(self.dirty), set()
+        if roots:
+            self.run_sync(roots)
+
+    def run_sync(self, roots, check_sizes=False):
+        # Taken before listing: a change made while the sync runs is seen again at the next poll
+        self.remember_signatures(roots)
+        self.sync_thread = LibrarySyncThread(self.index, roots, check_sizes)
+        self.sync_thread.events_signal.connect(self.files_changed.emit)
+        self.sync_thread.finished.connect(self.on_sync_done)
+        self.sync_thread.start()
+
+    def on_sync_done(self):
+        self.sync_thread = None
+        if self.dirty:
+            self.debounce_timer.start()
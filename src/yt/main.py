@@ -1,178 +1,48 @@
 import sys
 import os
+import multiprocessing
 import re
+import time
 import webbrowser
-import yt_dlp
-import requests
-from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                               QHBoxLayout, QLineEdit, QPushButton, QLabel, 
-                               QSplitter, QComboBox, QMessageBox, QTextEdit, QScrollArea,
-                               QTabWidget, QStatusBar, QFrame, QCompleter, QMenuBar, QMenu)
-from PySide6.QtGui import QPixmap, QIcon, QFont, QColor, QAction
-from PySide6.QtCore import Qt, QThread, Signal, QSize, QStringListModel
-import qtawesome as qta
-from yt.workers import DownloadThread, ThumbnailThread
-from yt.ui.explorer_tab import ExplorerTab
-try:
-    from yt.diary import DiaryManager
-except ImportError:
-    # Fallback if running directly without package structure
-    from diary import DiaryManager
-
-
-# --- THEMES ---
-DARK_THEME = """
-    QMainWindow { background-color: #121212; color: #E0E0E0; font-family: 'Segoe UI', Roboto, Helvetica; }
-    
-    /* Card/Panel Style */
-    QFrame#card, QFrame#stats_card {
-        background-color: #1E1E1E;
-        border-radius: 12px;
-        border: 1px solid #333;
-    }
-    
-    QLineEdit, QComboBox, QTextEdit { 
-        padding: 10px; border-radius: 8px; border: 1px solid #333; 
-        background-color: #181818; color: white; 
-    }
-    
-    QComboBox::drop-down { border: none; }
-    
-    QPushButton#primary { 
-        padding: 12px; border-radius: 8px; background-color: #cc0000; 
-        color: white; font-weight: bold; border: none; 
-    }
-    QPushButton#primary:hover { background-color: #e60000; }
-    QPushButton#primary:disabled { background-color: #444; color: #888; }
-    
-    QPushButton#secondary, QPushButton#refresh_btn { 
-        padding: 8px; border-radius: 6px; background-color: #333; 
-        color: white; border: none; 
-    }
-    QPushButton#secondary:hover, QPushButton#refresh_btn:hover { background-color: #444; }
-
-    QTableWidget {
-        background-color: #181818;
-        color: #E0E0E0;
-        gridline-color: #333;
-        border: none;
-        border-radius: 8px;
-    }
-    QHeaderView::section {
-        background-color: #1E1E1E;
-        color: #888;
-        padding: 5px;
-        border: none;
-        font-weight: bold;
-    }
-    QTableWidget::item:selected {
-        background-color: #333;
-    }
-
-    QTabWidget::pane { border: 1px solid #333; border-radius: 8px; background: #1E1E1E; top: -1px; }
-    QTabBar::tab {
-        background: #181818; color: #888; padding: 10px 20px; 
-        border-top-left-radius: 8px; border-top-right-radius: 8px;
-        margin-right: 2px;
-    }
-    QTabBar::tab:selected { background: #1E1E1E; color: white; border-bottom: 2px solid #cc0000; }
-    
-    QLabel#title { font-size: 24px; font-weight: bold; color: white; }
-    QLabel#subtitle { color: #888; font-size: 14px; }
-    QLabel#subtitle a { color: #cc0000; text-decoration: none; font-weight: bold; }
-    QLabel#description { color: #E0E0E0; }
-    QLabel#stat_label { color: #cc0000; font-weight: bold; }
-    
-    QStatusBar { background-color: #181818; color: #888; }
-    
-    QLabel#thumbnail { background-color: #000; border-radius: 8px; }
-
-    QMessageBox { background-color: #1E1E1E; border: 1px solid #333; }
-    QMessageBox QLabel { color: #E0E0E0; }
-    QMessageBox QPushButton { 
-        background-color: #333; color: white; border-radius: 4px; padding: 5px 15px; 
-    }
-    QMessageBox QPushButton:hover { background-color: #444; }
-"""
-
-LIGHT_THEME = """
-    QMainWindow { background-color: #F5F5F7; color: #1D1D1F; font-family: 'Segoe UI', Roboto, Helvetica; }
-    
-    QFrame#card, QFrame#stats_card {
-        background-color: #FFFFFF;
-        border-radius: 12px;
-        border: 1px solid #E1E1E1;
-    }
-    
-    QLineEdit, QComboBox, QTextEdit { 
-        padding: 10px; border-radius: 8px; border: 1px solid #D2D2D7; 
-        background-color: #FFFFFF; color: #1D1D1F; 
-    }
-    
-    QPushButton#primary { 
-        padding: 12px; border-radius: 8px; background-color: #CC0000; 
-        color: white; font-weight: bold; border: none; 
-    }
-    QPushButton#primary:hover { background-color: #B20000; }
-    QPushButton#primary:disabled { background-color: #E8E8ED; color: #999; }
-    
-    QPushButton#secondary, QPushButton#refresh_btn { 
-        padding: 8px; border-radius: 6px; background-color: #E8E8ED; 
-        color: #1D1D1F; border: none; 
-    }
-    QPushButton#secondary:hover, QPushButton#refresh_btn:hover { background-color: #D1D1D6; }
-
-    QTableWidget {
-        background-color: #FFFFFF;
-        color: #1D1D1F;
-        gridline-color: #E1E1E1;
-        border: none;
-        border-radius: 8px;
-    }
-    QHeaderView::section {
-        background-color: #F5F5F7;
-        color: #555;
-        padding: 5px;
-        border: none;
-        font-weight: bold;
-    }
-    QTableWidget::item:selected {
-        background-color: #E8E8ED;
-        color: #1D1D1F;
-    }
-
-    QTabWidget::pane { border: 1px solid #E1E1E1; border-radius: 8px; background: #FFFFFF; top: -1px; }
-    QTabBar::tab {
-        background: #E8E8ED; color: #555; padding: 10px 20px; 
-        border-top-left-radius: 8px; border-top-right-radius: 8px;
-    }
-    QTabBar::tab:selected { background: #FFFFFF; color: #1D1D1F; border-bottom: 2px solid #CC0000; }
-    
-    QLabel { color: #1D1D1F; }
-    QTabBar, QStatusBar { color: #1D1D1F; }
-    
-    QLabel#title { font-size: 24px; font-weight: bold; color: #1D1D1F; }
-    QLabel#subtitle { color: #555; font-size: 14px; }
-    QLabel#subtitle a { color: #CC0000; text-decoration: none; font-weight: bold; }
-    QLabel#description { color: #1D1D1F; }
-    QLabel#stat_label { color: #CC0000; font-weight: bold; }
-    
-    QStatusBar { background-color: #FFFFFF; color: #555; border-top: 1px solid #E1E1E1; }
-    
-    QLabel#thumbnail { background-color: #E1E1E1; border-radius: 8px; }
-    
-    QMenuBar { background-color: #F5F5F7; color: #1D1D1F; }
-    QMenuBar::item:selected { background-color: #E8E8ED; }
-    QMenu { background-color: #FFFFFF; color: #1D1D1F; border: 1px solid #E1E1E1; }
-    QMenu::item:selected { background-color: #E8E8ED; }
-
-    QMessageBox { background-color: #FFFFFF; border: 1px solid #E1E1E1; }
-    QMessageBox QLabel { color: #1D1D1F; }
-    QMessageBox QPushButton { 
-        background-color: #E8E8ED; color: #1D1D1F; border-radius: 4px; padding: 5px 15px; 
-    }
-    QMessageBox QPushButton:hover { background-color: #D1D1D6; }
-"""
+from yt.startup import profiler, finish as finish_profile
+# yt-dlp, requests, youtube-transcript-api and qtawesome are imported where first used
+with profiler.phase("import PySide6"):
+    from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                                   QHBoxLayout, QLineEdit, QPushButton, QLabel, 
+                                   QSplitter, QComboBox, QMessageBox, QTextEdit, QScrollArea,
+                                   QTabWidget, QStatusBar, QFrame, QCompleter, QMenuBar, QMenu,
+                                   QFileDialog, QCheckBox)
+    from PySide6.QtGui import QPixmap, QIcon, QFont, QColor, QAction
+    from PySide6.QtCore import Qt, QThread, Signal, QSize, QStringListModel, QTimer
+with profiler.phase("import app modules"):
+    from yt.workers import MetadataThread, BatchThread, FragmentCleanupThread, SearchIndexThread, TranscriptThread, TranscriptImportThread
+    from yt.batch import read_url_file
+    from yt.formats import video_opts, format_choices
+    from yt.profiles import PROFILES, DEFAULT_PROFILE, profile_opts
+    from yt.ui.explorer_tab import ExplorerTab
+    from yt.ui.queue_tab import QueueTab
+    from yt.ui.icons import set_icon, load_icons
+    from yt.ui.theme import themes
+    from yt.download_queue import DownloadQueue
+    from yt.job_store import JobStore
+    from yt.bandwidth import BandwidthScheduler
+    from yt.content_store import ContentStore
+    from yt.search_index import SearchIndex
+    from yt.transcript_store import TranscriptStore
+    from yt.metadata_cache import MetadataCache
+    from yt.library_index import LibraryIndex
+    from yt.library_watcher import LibraryWatcher
+    from yt.thumbnail_service import ThumbnailService
+    from yt.postprocess import REMUX_PROFILES, plan, diary_fields, missing_tools
+    from yt.postprocess_service import PostProcessService
+    from yt.thumbnails import ThumbnailStore
+    from yt.urls import extract_video_id
+    try:
+        from yt.diary import DiaryManager
+    except ImportError:
+        # Fallback if running directly without package structure
+        from diary import DiaryManager
+
 
 # --- MAIN APPLICATION ---
 class YouTubeApp(QMainWindow):
@@ -181,18 +51,67 @@ class YouTubeApp(QMainWindow):
         self.setWindowTitle("Youtube Video Manager")
         self.setWindowIcon(QIcon("assets/logo.png"))
         self.resize(1200, 850)
-        
+
+        with profiler.phase("open stores"):
+            self.setup_stores()
+        with profiler.phase("build window"):
+            self.setup_ui()
+        with profiler.phase("menu and theme"):
+            self.setup_menu()
+            # Both themes are in one stylesheet, parsed here once; Ctrl+L only flips a property
+            themes.attach(self)
+        with profiler.phase("start background jobs"):
+            self.start_background_jobs()
+        # qtawesome is imported once the event loop runs, after the window's first paint
+        QTimer.singleShot(0, self.load_icons)
+
+    def load_icons(self):
+        with profiler.phase("load icons"):
+            load_icons()
+            themes.prepare_icons()
+
+    def setup_stores(self):
         self.diary = DiaryManager("db")
+        # Answers the diary's path lookups from one background scan of videos/ and videos/SRT/
+        self.library_index = LibraryIndex()
+        self.diary.path_index = self.library_index
+        self.metadata_cache = MetadataCache("db")
+        # Unfinished downloads survive restarts and crashes in db/jobs.db
+        self.job_store = JobStore("db")
+        # One rate limit shared by all downloads, set from the Queue tab
+        self.bandwidth = BandwidthScheduler()
+        # Same video + format again is served from disk; identical files are hardlinked
+        self.content_store = ContentStore("db")
+        # Full-text search over titles, descriptions and transcripts for the Explorer
+        self.search_index = SearchIndex("db")
+        self.index_threads = set()
+        # Every transcript as compact columns in one memory-mapped file; entries keep their offset
+        self.transcript_store = TranscriptStore("db")
+        self.import_thread = None
+        self.download_queue = DownloadQueue(max_workers=3, per_host_limit=2, store=self.job_store,
+                                            bandwidth=self.bandwidth, content=self.content_store, parent=self)
+        self.download_queue.job_finished.connect(self.on_download_finished)
+        self.thumbnails = ThumbnailService(ThumbnailStore("db"), parent=self)
+        # Probing, remuxing, loudness and chapter splitting in worker processes, cached by file hash
+        self.postprocess = PostProcessService("db", parent=self)
+        self.postprocess.job_finished.connect(self.on_postprocess_finished)
+        self.thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.thumb_key = None
         
-        self.current_theme = "dark"
         self.current_info = {}
         self.desc_expanded = False
+        self.metadata_thread = None
+        self.batch_thread = None
+        self.transcript_thread = None
+        self.cleanup_thread = None
+        self.stale_threads = set()
         
         # Ensure SRT folder exists
         if not os.path.exists("videos/SRT"):
             os.makedirs("videos/SRT")
 
-        # --- UI SETUP ---
+    # --- UI SETUP ---
+    def setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
@@ -218,20 +137,20 @@ class YouTubeApp(QMainWindow):
         
         self.fetch_btn = QPushButton(" Fetch")
         self.fetch_btn.setObjectName("primary")
-        self.fetch_btn.setIcon(qta.icon('fa5s.search', color='white'))
+        set_icon(self.fetch_btn, 'fa5s.search', 'white')
         self.fetch_btn.clicked.connect(self.load_video_data)
 
         self.browser_btn = QPushButton()
         self.browser_btn.setObjectName("secondary")
         self.browser_btn.setToolTip("View on YouTube")
-        self.browser_btn.setIcon(qta.icon('fa5s.external-link-alt', color='white'))
+        themes.set_icon(self.browser_btn, 'fa5s.external-link-alt')
         self.browser_btn.setFixedSize(40, 40)
         self.browser_btn.clicked.connect(self.open_current_url)
         
         self.theme_btn = QPushButton()
         self.theme_btn.setObjectName("secondary")
         self.theme_btn.setToolTip("Toggle Theme")
-        self.theme_btn.setIcon(qta.icon('fa5s.moon', color='white'))
+        themes.set_icon(self.theme_btn, {'dark': 'fa5s.moon', 'light': 'fa5s.sun'})
         self.theme_btn.setFixedSize(40, 40)
         self.theme_btn.clicked.connect(self.toggle_theme)
  
@@ -274,7 +193,7 @@ class YouTubeApp(QMainWindow):
         self.desc_scroll.setWidgetResizable(True)
         self.desc_scroll.setFixedHeight(100)
         self.desc_scroll.setFrameShape(QFrame.NoFrame)
-        self.desc_scroll.setStyleSheet("background: transparent;")
+        self.desc_scroll.setObjectName("desc_scroll")
         
         self.meta_desc = QLabel("Description goes here...")
         self.meta_desc.setObjectName("description")
@@ -315,11 +234,33 @@ class YouTubeApp(QMainWindow):
         self.audio_combo.setEnabled(False)
         dl_layout.addWidget(self.audio_combo)
 
+        dl_layout.addWidget(QLabel("<b>Download Speed</b>"))
+        self.profile_combo = QComboBox()
+        for name, profile in PROFILES.items():
+            self.profile_combo.addItem(profile['label'], name)
+        self.profile_combo.setCurrentIndex(self.profile_combo.findData(DEFAULT_PROFILE))
+        dl_layout.addWidget(self.profile_combo)
+
+        dl_layout.addWidget(QLabel("<b>After Download</b>"))
+        self.remux_combo = QComboBox()
+        self.remux_combo.addItem("Keep as downloaded", None)
+        for name, profile in REMUX_PROFILES.items():
+            self.remux_combo.addItem(profile['label'], name)
+        dl_layout.addWidget(self.remux_combo)
+        self.loudnorm_check = QCheckBox("Normalize loudness")
+        self.chapters_check = QCheckBox("Split into chapters")
+        dl_layout.addWidget(self.loudnorm_check)
+        dl_layout.addWidget(self.chapters_check)
+        if missing_tools('remux'):
+            for widget in (self.remux_combo, self.loudnorm_check, self.chapters_check):
+                widget.setEnabled(False)
+                widget.setToolTip("Needs ffmpeg on the PATH")
+
         dl_layout.addStretch()
         
         self.download_btn = QPushButton(" Download Video")
         self.download_btn.setObjectName("primary")
-        self.download_btn.setIcon(qta.icon('fa5s.download', color='white'))
+        set_icon(self.download_btn, 'fa5s.download', 'white')
         self.download_btn.setEnabled(False)
         self.download_btn.clicked.connect(self.start_download_video)
         dl_layout.addWidget(self.download_btn)
@@ -337,9 +278,8 @@ class YouTubeApp(QMainWindow):
         sub_layout.addStretch()
 
         self.dl_subs_btn = QPushButton(" Download Transcript")
-        self.dl_subs_btn.setObjectName("primary")
-        self.dl_subs_btn.setStyleSheet("background-color: #0077cc;")
-        self.dl_subs_btn.setIcon(qta.icon('fa5s.closed-captioning', color='white'))
+        self.dl_subs_btn.setObjectName("subs_btn")
+        set_icon(self.dl_subs_btn, 'fa5s.closed-captioning', 'white')
         self.dl_subs_btn.setEnabled(False)
         self.dl_subs_btn.clicked.connect(self.start_download_subs)
         sub_layout.addWidget(self.dl_subs_btn)
@@ -348,9 +288,18 @@ class YouTubeApp(QMainWindow):
         self.tab_sidebar.addTab(sub_tab, "Transcript")
         
         # Tab 3: Explorer
-        self.explorer_tab = ExplorerTab(self.diary)
+        self.explorer_tab = ExplorerTab(self.diary, self.library_index, self.thumbnails, self.search_index)
         self.explorer_tab.status_message_signal.connect(self.statusBar().showMessage)
+        # File changes in videos/ update single rows instead of rescanning the library
+        self.library_watcher = LibraryWatcher(self.library_index, self)
+        self.library_watcher.files_changed.connect(self.explorer_tab.apply_file_events)
+        self.library_watcher.start()
         self.tab_sidebar.addTab(self.explorer_tab, "Explorer")
+
+        # Tab 4: Download Queue
+        self.queue_tab = QueueTab(self.download_queue)
+        self.queue_tab.status_message_signal.connect(self.statusBar().showMessage)
+        self.tab_sidebar.addTab(self.queue_tab, "Queue")
         
         splitter.addWidget(self.tab_sidebar)
         splitter.setSizes([800, 400])
@@ -360,19 +309,33 @@ class YouTubeApp(QMainWindow):
         self.setStatusBar(QStatusBar())
         self.statusBar().showMessage("Ready")
 
-        # Setup Menu
-        self.setup_menu()
+    def start_background_jobs(self):
+        # The Explorer loads the library itself the first time it is shown
+        self.restore_jobs()
+        # Catch up on entries/transcripts added while the index wasn't running; unchanged ones are skipped
+        self.update_search_index(self.diary.get_all_entries(), prune=True)
+        self.import_thread = TranscriptImportThread(self.transcript_store, self.diary)
+        self.import_thread.start()
 
-        self.apply_theme(DARK_THEME)
-        # self.explorer_tab.refresh_explorer() is already called in ExplorerTab.__init__
+    def action(self, icon_name, text):
+        action = QAction(text, self)
+        set_icon(action, icon_name)
+        return action
 
     def setup_menu(self):
         menubar = self.menuBar()
 
         # File Menu
         file_menu = menubar.addMenu("&File")
-        
-        exit_action = QAction(qta.icon('fa5s.power-off'), "Exit", self)
+
+        import_action = self.action('fa5s.file-import', "Import URL List...")
+        import_action.setShortcut("Ctrl+O")
+        import_action.triggered.connect(self.import_url_list)
+        file_menu.addAction(import_action)
+
+        file_menu.addSeparator()
+
+        exit_action = self.action('fa5s.power-off', "Exit")
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -380,32 +343,53 @@ class YouTubeApp(QMainWindow):
         # Actions Menu
         actions_menu = menubar.addMenu("&Actions")
 
-        fetch_action = QAction(qta.icon('fa5s.search'), "Fetch Video Data", self)
+        fetch_action = self.action('fa5s.search', "Fetch Video Data")
         fetch_action.setShortcut("Ctrl+F")
         fetch_action.triggered.connect(self.load_video_data)
         actions_menu.addAction(fetch_action)
 
+        refetch_action = self.action('fa5s.redo', "Re-fetch (Ignore Cache)")
+        refetch_action.setShortcut("Ctrl+Shift+F")
+        refetch_action.triggered.connect(lambda: self.load_video_data(force_refresh=True))
+        actions_menu.addAction(refetch_action)
+
         actions_menu.addSeparator()
 
-        download_video_action = QAction(qta.icon('fa5s.download'), "Download Video", self)
+        download_video_action = self.action('fa5s.download', "Download Video")
         download_video_action.setShortcut("Ctrl+D")
         download_video_action.triggered.connect(self.start_download_video)
         actions_menu.addAction(download_video_action)
 
-        download_subs_action = QAction(qta.icon('fa5s.closed-captioning'), "Download Transcript", self)
+        download_subs_action = self.action('fa5s.closed-captioning', "Download Transcript")
         download_subs_action.setShortcut("Ctrl+T")
         download_subs_action.triggered.connect(self.start_download_subs)
         actions_menu.addAction(download_subs_action)
 
+        actions_menu.addSeparator()
+
+        batch_action = self.action('fa5s.list', "Download All (Playlist / Channel)")
+        batch_action.setShortcut("Ctrl+Shift+D")
+        batch_action.triggered.connect(self.start_batch_from_input)
+        actions_menu.addAction(batch_action)
+
+        batch_subs_action = self.action('fa5s.closed-captioning', "Download All Transcripts (Playlist / Channel)")
+        batch_subs_action.setShortcut("Ctrl+Shift+T")
+        batch_subs_action.triggered.connect(self.start_transcripts_from_input)
+        actions_menu.addAction(batch_subs_action)
+
+        stop_batch_action = self.action('fa5s.stop', "Stop Batch Import")
+        stop_batch_action.triggered.connect(self.stop_batch)
+        actions_menu.addAction(stop_batch_action)
+
         # View Menu
         view_menu = menubar.addMenu("&View")
 
-        refresh_action = QAction(qta.icon('fa5s.sync'), "Refresh Library", self)
+        refresh_action = self.action('fa5s.sync', "Refresh Library")
         refresh_action.setShortcut("F5")
         refresh_action.triggered.connect(lambda: self.explorer_tab.refresh_explorer())
         view_menu.addAction(refresh_action)
 
-        theme_action = QAction(qta.icon('fa5s.adjust'), "Toggle Theme", self)
+        theme_action = self.action('fa5s.adjust', "Toggle Theme")
         theme_action.setShortcut("Ctrl+L")
         theme_action.triggered.connect(self.toggle_theme)
         view_menu.addAction(theme_action)
@@ -413,11 +397,11 @@ class YouTubeApp(QMainWindow):
         # Help Menu
         help_menu = menubar.addMenu("&Help")
 
-        how_to_action = QAction(qta.icon('fa5s.question-circle'), "How to Use", self)
+        how_to_action = self.action('fa5s.question-circle', "How to Use")
         how_to_action.triggered.connect(self.show_help)
         help_menu.addAction(how_to_action)
 
-        credits_action = QAction(qta.icon('fa5s.info-circle'), "Credits", self)
+        credits_action = self.action('fa5s.info-circle', "Credits")
         credits_action.triggered.connect(self.show_credits)
         help_menu.addAction(credits_action)
 
@@ -433,8 +417,12 @@ class YouTubeApp(QMainWindow):
             <li><b>Shortcuts:</b> 
                 <ul>
                     <li>Ctrl+F: Fetch</li>
+                    <li>Ctrl+Shift+F: Re-fetch, ignoring cached metadata</li>
                     <li>Ctrl+D: Download Video</li>
                     <li>Ctrl+T: Download Transcript</li>
+                    <li>Ctrl+Shift+D: Download a whole playlist or channel</li>
+                    <li>Ctrl+Shift+T: Download the transcripts of a whole playlist or channel</li>
+                    <li>Ctrl+O: Import a text file of URLs</li>
                     <li>F5: Refresh Library</li>
                 </ul>
             </li>
@@ -452,22 +440,60 @@ class YouTubeApp(QMainWindow):
         """
         QMessageBox.about(self, "Credits", credits_text)
 
-    def apply_theme(self, theme_stylesheet):
-        self.setStyleSheet(theme_stylesheet)
-
     def toggle_theme(self):
-        if self.current_theme == "dark":
-            self.apply_theme(LIGHT_THEME)
-            self.current_theme = "light"
-            self.theme_btn.setIcon(qta.icon('fa5s.sun', color='#1D1D1F'))
-            self.browser_btn.setIcon(qta.icon('fa5s.external-link-alt', color='#1D1D1F'))
-            self.explorer_tab.set_theme_style("light")
-        else:
-            self.apply_theme(DARK_THEME)
-            self.current_theme = "dark"
-            self.theme_btn.setIcon(qta.icon('fa5s.moon', color='white'))
-            self.browser_btn.setIcon(qta.icon('fa5s.external-link-alt', color='white'))
-            self.explorer_tab.set_theme_style("dark")
+        # Re-polishes the widgets and swaps cached icons; nothing is reloaded
+        themes.toggle()
+
+    def restore_jobs(self):
+        """Offer downloads interrupted by the last exit for resuming; delete the pieces of ones that ended."""
+        started = time.time()
+        records = self.job_store.unfinished()
+        for record in records:
+            # Fresh cached metadata saves the extract_info round trip when resuming
+            info = self.metadata_cache.get(extract_video_id(record['url']))
+            self.download_queue.restore(record, info)
+        if records:
+            self.statusBar().showMessage(f"{len(records)} interrupted downloads can be resumed from the Queue tab")
+
+        self.cleanup_thread = FragmentCleanupThread(
+            self.job_store, [r['filename'] for r in records], older_than=started)
+        self.cleanup_thread.finished_signal.connect(
+            lambda removed: removed and print(f"Removed {len(removed)} leftover download fragments"))
+        self.cleanup_thread.start()
+
+    def update_search_index(self, entries, descriptions=None, prune=False):
+        thread = SearchIndexThread(self.search_index, entries, descriptions, prune)
+        thread.finished_signal.connect(lambda count: count and self.explorer_tab.refresh_search())
+        thread.finished.connect(lambda: self.index_threads.discard(thread))
+        self.index_threads.add(thread)
+        thread.start()
+
+    def closeEvent(self, event):
+        self.stop_batch()
+        self.explorer_tab.stop_scan()
+        self.library_watcher.stop()
+        self.thumbnails.shutdown()
+        self.postprocess.shutdown()
+        for job in self.download_queue.running_jobs():
+            self.download_queue.pause(job.id)
+            job.thread.wait(5000)
+        if self.cleanup_thread:
+            self.cleanup_thread.wait()
+        if self.transcript_thread:
+            self.transcript_thread.wait()
+        if self.import_thread:
+            self.import_thread.cancel()
+            self.import_thread.wait()
+        for thread in list(self.index_threads):
+            thread.cancel()
+            thread.wait()
+        self.download_queue.detach_store()
+        self.job_store.close()
+        self.content_store.close()
+        self.search_index.close()
+        self.transcript_store.close()
+        self.diary.close() # Flush buffered diary writes
+        super().closeEvent(event)
 
     def update_completer(self):
         urls = self.diary.get_history_urls()
@@ -491,7 +517,7 @@ class YouTubeApp(QMainWindow):
             self.toggle_desc_btn.setText("Show Less")
             self.desc_expanded = True
 
-    def load_video_data(self):
+    def load_video_data(self, force_refresh=False):
         url = self.url_input.text().strip()
         if not url: return
 
@@ -502,8 +528,10 @@ class YouTubeApp(QMainWindow):
 
         self.statusBar().showMessage("Fetching metadata...")
         self.quality_combo.clear(); self.audio_combo.clear(); self.subs_combo.clear()
-        self.fetch_btn.setEnabled(False)
-        
+        self.quality_combo.setEnabled(False); self.audio_combo.setEnabled(False); self.subs_combo.setEnabled(False)
+        self.download_btn.setEnabled(False); self.dl_subs_btn.setEnabled(False)
+        self.current_info = {}
+
         # Reset UI
         self.thumbnail_label.clear()
         self.thumbnail_label.setText("Loading Preview...")
@@ -512,212 +540,93 @@ class YouTubeApp(QMainWindow):
         self.meta_desc.setText("")
         self.toggle_desc_btn.hide()
 
-        # Fetch in thread (conceptually - simplistic here to keep single-block logic readable)
-        # For 'uv run' context let's do synchronous but robust, or simple thread wrapper
-        # To avoid blocking UI too much, we usually use Worker. 
-        # For simplicity in this step, I'll execute inline but alert via status.
-        # Ideally this should be threaded like DownloadThread.
-        
-        QApplication.processEvents() # Force UI update
-
+        # A new fetch supersedes any one still in flight
+        if self.metadata_thread:
+            self.metadata_thread.cancel()
+            self.stale_threads.add(self.metadata_thread)
+
+        self.metadata_thread = MetadataThread(url, self.metadata_cache, force_refresh=bool(force_refresh))
+        self.metadata_thread.info_signal.connect(self.on_metadata_loaded)
+        self.metadata_thread.error_signal.connect(self.on_metadata_error)
+        self.metadata_thread.finished.connect(self.prune_stale_threads)
+        self.metadata_thread.start()
+
+    def prune_stale_threads(self):
+        # Keep superseded threads referenced until they actually stop
+        self.stale_threads = {t for t in self.stale_threads if t.isRunning()}
+
+    def on_metadata_error(self, message):
+        if self.sender() is not self.metadata_thread: return
+        self.meta_title.setText("Video Title")
+        self.thumbnail_label.setText("Waiting for link...")
+        self.statusBar().showMessage(f"Error: {message}")
+        print(message)
+
+    def on_metadata_loaded(self, info):
+        if self.sender() is not self.metadata_thread: return
         try:
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                self.current_info = info
-                
-                # 1. Metadata
-                self.meta_title.setText(info.get('title', 'Unknown'))
-                
-                uploader = info.get('uploader', 'Unknown')
-                uploader_url = info.get('uploader_url') or info.get('channel_url')
-                if uploader_url:
-                    self.meta_creator.setText(f'<a href="{uploader_url}">{uploader}</a>')
-                else:
-                    self.meta_creator.setText(uploader)
-
-                self.meta_desc.setText(info.get('description', ''))
-                self.toggle_desc_btn.show()
-                self.toggle_desc_btn.setText("Show More")
-                self.desc_scroll.setFixedHeight(100)
-                self.desc_expanded = False
-                
-                # 2. Thumbnail
-                thumb_url = info.get('thumbnail')
-                if thumb_url:
-                    self.thumb_thread = ThumbnailThread(thumb_url)
-                    self.thumb_thread.loaded_signal.connect(self.set_thumbnail)
-                    self.thumb_thread.start()
-
-                # 3. Formats (Video)
-                formats = info.get('formats', [])
-                video_options = []
-                for f in formats:
-                    if f.get('vcodec') != 'none' and f.get('height'):
-                        h = f['height']
-                        if h <= 1080: # Max 1080p
-                            # We want video-only usually to mix with best audio
-                            # But yt-dlp formats list serves both mixed and unmixed.
-                            # We'll filter for mp4/video-only preference
-                            video_options.append((h, f))
-                
-                # Sort Descending by Height
-                video_options.sort(key=lambda x: x[0], reverse=True)
-                
-                seen_res = set()
-                # Determine dynamic 'Best' label
-                best_vid_text = "Best Available (Max 1080p)"
-                if video_options:
-                    best_vid_text = f"Best Available ({video_options[0][0]}p)"
-                
-                self.quality_combo.addItem(best_vid_text, "best_1080")
-                for h, f in video_options:
-                    res_str = f"{h}p"
-                    if res_str not in seen_res:
-                        self.quality_combo.addItem(f"{res_str} - {f.get('ext')}", f['format_id'])
-                        seen_res.add(res_str)
- 
-                # Language names mapping (short list of common ones)
-                LANG_MAP = {
-                    'en': 'English', 'ko': 'Korean', 'es': 'Spanish', 'ja': 'Japanese',
-                    'zh': 'Chinese', 'fr': 'French', 'de': 'German', 'hi': 'Hindi',
-                    'ru': 'Russian', 'pt': 'Portuguese', 'it': 'Italian', 'ar': 'Arabic'
-                }
-
-                # 4. Audio Tracks - Group by Language & Quality
-                audio_tracks = {} # track_key -> format_info
-                
-                # Helper to clean up notes (remove low/medium)
-                def clean_note(note):
-                    if not note: return ""
-                    # Remove common quality terms
-                    n = note.lower()
-                    for term in ["low", "medium", "ultra-low", "high"]:
-                        n = n.replace(term, "")
-                    n = n.strip(", ").strip()
-                    return n.title() if n else ""
-
-                for f in formats:
-                    if f.get('acodec') != 'none' and f.get('vcodec') == 'none':
-                        code = f.get('language')
-                        lang = LANG_MAP.get(code.split('-')[0]) if code else None
-                        
-                        if not lang:
-                             # Some tracks have it in the note or elsewhere
-                             # But if really None, use 'Original Audio' as base
-                             lang = 'Original Audio' if not code or code == 'und' else code
-                        
-                        note = clean_note(f.get('format_note'))
-                        track_key = (lang, note)
-                        
-                        abr = f.get('abr') or 0
-                        if track_key not in audio_tracks or abr > audio_tracks[track_key].get('abr', 0):
-                            audio_tracks[track_key] = f
-
-                # Sort audio tracks
-                sorted_audio = sorted(audio_tracks.values(), 
-                                    key=lambda x: (x.get('language') or 'und', x.get('abr') or 0), 
-                                    reverse=True)
-
-                # Determine dynamic 'Best' label
-                best_audio_text = "Default / Best Audio"
-                if sorted_audio:
-                    f = sorted_audio[0]
-                    code = f.get('language')
-                    lang = LANG_MAP.get(code.split('-')[0]) if code else None
-                    if not lang:
-                        lang = 'Original Audio' if not code or code == 'und' else code
-                    abr = int(f.get('abr') or 0)
-                    best_audio_text = f"Default / Best Audio ({lang} - {abr} kbps)"
-
-                self.audio_combo.addItem(best_audio_text, "bestaudio")
-                
-                for f in sorted_audio:
-                    code = f.get('language')
-                    lang = LANG_MAP.get(code.split('-')[0]) if code else None
-                    if not lang:
-                        lang = 'Original Audio' if not code or code == 'und' else code
-
-                    note = clean_note(f.get('format_note'))
-                    abr = int(f.get('abr') or 0)
-                    
-                    label = f"{lang}"
-                    if note: label += f" ({note})"
-                    if abr: label += f" - {abr} kbps"
-                    
-                    self.audio_combo.addItem(label, f['format_id'])
-
-                # 5. Subtitles - Smart CC Handling
-                sub_options = []  # List of (label, {"code": ..., "is_auto": ...})
-                
-                # Helper: English priority scoring
-                def en_score(code, label):
-                    c = code.lower()
-                    l = label.lower()
-                    if c == 'en' or l == 'english': return -2
-                    if 'en' in c or 'english' in l: return -1
-                    return 0
-                
-                # Helper: Get best label
-                def get_sub_label(code, formats):
-                    if formats and formats[0].get('name'):
-                        name = formats[0].get('name')
-                        # Clean up "English - English" -> "English"
-                        if " - " in name:
-                            parts = name.split(" - ")
-                            if parts[0].strip() == parts[1].strip():
-                                return parts[0].strip()
-                        return name
-                    return code
-
-                # Add manual subtitles first (priority)
-                manual_subs = info.get('subtitles') or {}
-                for code, formats in manual_subs.items():
-                    if code == 'live_chat': continue
-                    label = get_sub_label(code, formats)
-                    sub_options.append((label, {"code": code, "is_auto": False}))
-                
-                # Add auto-generated (marked clearly)
-                auto_subs = info.get('automatic_captions') or {}
-                for code, formats in auto_subs.items():
-                    if code == 'live_chat': continue
-                    # Only add if it's not already in manual for roughly same language
-                    # (Note: manual might have code 'en-US' while auto has 'en')
-                    # But if manual has ANY English, we might still want Auto English?
-                    # The user said: "if manual exists... only display these 2"
-                    # So if ANY manual exists for a language, we skip auto for it.
-                    # We'll check if any existing code starts with this code or vice versa
-                    exists = any(code in m or m in code for m in manual_subs.keys())
-                    if not exists:
-                        label = f"{get_sub_label(code, formats)} (auto-generated)"
-                        sub_options.append((label, {"code": code, "is_auto": True}))
-                
-                # Sort: English first, then by score, then alphabetically
-                sub_options.sort(key=lambda x: (en_score(x[1]["code"], x[0]), x[0]))
-                
-                # Populate combo
-                if sub_options:
-                    self.subs_combo.addItem("Select Subtitle", None)
-                    for label, data in sub_options:
-                        self.subs_combo.addItem(label, data)
-                    self.subs_combo.setEnabled(True)
-                    self.dl_subs_btn.setEnabled(True)
-                else:
-                    self.subs_combo.addItem("No CC available", None)
-                    self.subs_combo.setEnabled(False)
-                    self.dl_subs_btn.setEnabled(False)
-                
-                # Enable Video Controls
-                self.quality_combo.setEnabled(True)
-                self.audio_combo.setEnabled(True)
-                self.download_btn.setEnabled(True)
-                
-                self.statusBar().showMessage("Ready")
+            self.current_info = info
+
+            # 1. Metadata
+            self.meta_title.setText(info.get('title', 'Unknown'))
+            
+            uploader = info.get('uploader', 'Unknown')
+            uploader_url = info.get('uploader_url') or info.get('channel_url')
+            if uploader_url:
+                self.meta_creator.setText(f'<a href="{uploader_url}">{uploader}</a>')
+            else:
+                self.meta_creator.setText(uploader)
+
+            self.meta_desc.setText(info.get('description', ''))
+            self.toggle_desc_btn.show()
+            self.toggle_desc_btn.setText("Show More")
+            self.desc_scroll.setFixedHeight(100)
+            self.desc_expanded = False
+            
+            # 2. Thumbnail
+            thumb_url = info.get('thumbnail')
+            if thumb_url and info.get('id'):
+                size = (self.thumbnail_label.width(), self.thumbnail_label.height())
+                self.thumb_key = self.thumbnails.key(info['id'], size)
+                pixmap = self.thumbnails.request(info['id'], thumb_url, size)
+                if pixmap is not None:
+                    self.set_thumbnail(pixmap)
+
+            # 3. Formats, audio tracks & subtitles (computed in yt.formats)
+            choices = format_choices(info)
+            for label, data in choices['video']:
+                self.quality_combo.addItem(label, data)
+            for label, data in choices['audio']:
+                self.audio_combo.addItem(label, data)
+            sub_options = choices['subtitles']
+
+            # Populate combo
+            if sub_options:
+                self.subs_combo.addItem("Select Subtitle", None)
+                for label, data in sub_options:
+                    self.subs_combo.addItem(label, data)
+                self.subs_combo.setEnabled(True)
+                self.dl_subs_btn.setEnabled(True)
+            else:
+                self.subs_combo.addItem("No CC available", None)
+                self.subs_combo.setEnabled(False)
+                self.dl_subs_btn.setEnabled(False)
+            
+            # Enable Video Controls
+            self.quality_combo.setEnabled(True)
+            self.audio_combo.setEnabled(True)
+            self.download_btn.setEnabled(True)
+            
+            self.statusBar().showMessage("Ready")
 
         except Exception as e:
             self.statusBar().showMessage(f"Error: {str(e)}")
             print(e)
-        
-        self.fetch_btn.setEnabled(True)
+
+    def on_thumbnail_ready(self, key, pixmap):
+        # Only the video currently shown; late results of earlier fetches stay in the cache
+        if key == self.thumb_key:
+            self.set_thumbnail(pixmap)
 
     def set_thumbnail(self, pixmap):
         scaled = pixmap.scaled(self.thumbnail_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -730,27 +639,8 @@ class YouTubeApp(QMainWindow):
         vid_fmt = self.quality_combo.currentData()
         audio_fmt = self.audio_combo.currentData()
         
-        # Build format selector
-        if vid_fmt == "best_1080":
-             video_sel = "bestvideo[height<=1080]"
-        else:
-             video_sel = vid_fmt
-        
-        if audio_fmt == "bestaudio":
-            # Default behavior: best video (<=1080) + best audio
-            final_format = f"{video_sel}+bestaudio/best[height<=1080]"
-        else:
-            # Strict behavior: best video (<=1080) + PRECISE audio selected by user
-            # No fallback to 'best' because 'best' might have the wrong language.
-            # We want to force video_sel + specific audio_fmt.
-            # However, we must handle cases where the video_sel + audio_fmt can't merge.
-            # Usually, + handles this if ffmpeg is present.
-            final_format = f"{video_sel}+{audio_fmt}"
-        
-        opts = {
-            'format': final_format,
-            'merge_output_format': 'mp4',
-        }
+        profile = self.profile_combo.currentData()
+        opts = {**video_opts(vid_fmt, audio_fmt), **profile_opts(profile)}
 
         context = {
             'type': 'video',
@@ -758,6 +648,9 @@ class YouTubeApp(QMainWindow):
             'creator': self.current_info.get('uploader'),
             'description': self.current_info.get('description', ''),
             'url': url,
+            'thumbnail': self.current_info.get('thumbnail'),
+            'profile': profile,
+            'postprocess': self.postprocess_request(self.current_info.get('chapters')),
             'format_desc': f"Video: {self.quality_combo.currentText()}, Audio: {self.audio_combo.currentText()}"
         }
 
@@ -767,44 +660,122 @@ class YouTubeApp(QMainWindow):
         sub_data = self.subs_combo.currentData()
         if not sub_data or not isinstance(sub_data, dict):
             return
-        
-        code = sub_data.get("code")
-        is_auto = sub_data.get("is_auto", False)
-        
-        opts = {
-            'skip_download': True,
-            'subtitleslangs': [code],
-            'outtmpl': 'videos/SRT/%(title)s (Subtitle).%(ext)s',
-            'writesubtitles': not is_auto,
-            'writeautomaticsub': is_auto,
-            'subtitlesformat': 'srt',
-            'convertsubtitles': 'srt',
-        }
-        
-        context = {
-            'type': 'subtitle',
+        entry = {
+            'id': self.current_info.get('id'),
+            'url': self.url_input.text(),
             'title': self.current_info.get('title'),
             'creator': self.current_info.get('uploader'),
-            'description': "Subtitle File",
-            'url': self.url_input.text(),
-            'format_desc': f"Subtitle ({code}{' auto' if is_auto else ''})"
         }
-        
-        self.start_download(opts, context)
+        self.start_transcripts(entries=[entry], code=sub_data.get("code"))
+
+    # --- TRANSCRIPTS ---
+    def start_transcripts_from_input(self):
+        url = self.url_input.text().strip()
+        if url:
+            self.start_transcripts(sources=[url])
+
+    def start_transcripts(self, sources=None, entries=None, code=None, lang="en"):
+        """Fetch transcripts through the transcript engine; yt-dlp only for videos it can't serve."""
+        if self.transcript_thread and self.transcript_thread.isRunning():
+            self.statusBar().showMessage("Transcripts are already being downloaded")
+            return
+        from yt.transcripts import TranscriptEngine, ytdlp_fallback # Imports yt-dlp and youtube-transcript-api
+        engine = TranscriptEngine(lang, fallback=ytdlp_fallback(lang, self.metadata_cache, self.bandwidth),
+                                  store=self.transcript_store)
+        self.transcript_thread = TranscriptThread(engine, self.diary, sources, entries, code,
+                                                  self.diary.get_history_video_ids('srt_path'))
+        self.transcript_thread.progress_signal.connect(self.statusBar().showMessage)
+        self.transcript_thread.saved_signal.connect(self.on_transcripts_saved)
+        self.transcript_thread.finished_signal.connect(
+            lambda saved, failed: self.statusBar().showMessage(
+                f"Transcripts finished: {saved} saved, {failed} unavailable", 10000))
+        self.transcript_thread.start()
+        self.statusBar().showMessage("Fetching transcripts...")
+
+    def on_transcripts_saved(self, entries):
+        self.update_search_index(entries)
+        self.update_completer()
+        self.explorer_tab.update_entries([entry['id'] for entry in entries])
+
+    # --- BATCH INGESTION ---
+    def import_url_list(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import URL List", "", "Text Files (*.txt);;All Files (*)")
+        if path:
+            self.start_batch(read_url_file(path))
+
+    def start_batch_from_input(self):
+        url = self.url_input.text().strip()
+        if url:
+            self.start_batch([url])
+
+    def start_batch(self, sources):
+        if self.batch_thread and self.batch_thread.isRunning():
+            self.statusBar().showMessage("A batch import is already running")
+            return
+        self.batch_thread = BatchThread(sources, self.diary.get_history_video_ids('video_path'))
+        self.batch_thread.entry_signal.connect(self.queue_batch_entry)
+        self.batch_thread.progress_signal.connect(self.statusBar().showMessage)
+        self.batch_thread.finished_signal.connect(
+            lambda count: self.statusBar().showMessage(f"Batch import finished: {count} new videos queued"))
+        self.batch_thread.start()
+        self.statusBar().showMessage("Expanding batch...")
+
+    def stop_batch(self):
+        if self.batch_thread and self.batch_thread.isRunning():
+            self.batch_thread.cancel()
+        if self.transcript_thread and self.transcript_thread.isRunning():
+            self.transcript_thread.cancel()
+
+    def queue_batch_entry(self, entry):
+        # Batch items get the default quality: best video up to 1080p + best audio
+        profile = self.profile_combo.currentData()
+        opts = {**video_opts(), **profile_opts(profile)}
+        context = {
+            'type': 'video',
+            'title': entry.get('title') or entry['url'],
+            'creator': entry.get('creator') or 'Unknown',
+            'description': '',
+            'url': entry['url'],
+            'profile': profile,
+            'postprocess': self.postprocess_request(),
+            'format_desc': "Video: Best Available (Max 1080p), Audio: Default / Best Audio (batch)"
+        }
+        self.download_queue.enqueue(entry['url'], opts, context)
+
+    # --- POST-PROCESSING ---
+    def postprocess_request(self, chapters=None):
+        """Stages and options from the Download tab, kept in the job context until the file is done."""
+        split = self.chapters_check.isEnabled() and self.chapters_check.isChecked()
+        options = {'remux': self.remux_combo.currentData(), 'loudness': None,
+                   'chapters': [{k: c.get(k) for k in ('start_time', 'end_time', 'title')} for c in chapters or []]
+                               if split else None}
+        stages = plan(options['remux'], self.loudnorm_check.isChecked(), split)
+        return {'stages': stages, 'options': options}
+
+    def start_postprocess(self, entry, path, request):
+        stages = [name for name in request['stages'] if not missing_tools(name)]
+        if stages:
+            self.postprocess.submit(entry['id'], path, stages, request.get('options'))
+
+    def on_postprocess_finished(self, entry_id, outcome):
+        for name, error in outcome['errors'].items():
+            print(f"Post-processing ({name}) failed for {outcome['path']}: {error}")
+        if outcome.get('error'):
+            print(f"Post-processing failed for {outcome['path']}: {outcome['error']}")
+            return
+        if outcome['results']:
+            self.diary.update_entries({entry_id: diary_fields(outcome)})
+        done = [name for name in outcome['results'] if name != 'probe']
+        if done:
+            self.statusBar().showMessage(f"Post-processed ({', '.join(done)}): {outcome['path']}", 10000)
+        if outcome['results']:
+            self.explorer_tab.update_entries([entry_id])
 
     def start_download(self, opts, context):
-        self.download_btn.setEnabled(False)
-        self.dl_subs_btn.setEnabled(False)
-        
-        self.download_thread = DownloadThread(self.url_input.text(), opts, context)
-        self.download_thread.progress_signal.connect(self.statusBar().showMessage)
-        self.download_thread.finished_signal.connect(self.on_download_finished)
-        self.download_thread.start()
+        self.download_queue.enqueue(self.url_input.text(), opts, context, info=self.current_info)
+        self.statusBar().showMessage(f"Queued: {context.get('title')}")
 
     def on_download_finished(self, result_info):
-        self.download_btn.setEnabled(True)
-        self.dl_subs_btn.setEnabled(True)
-        
         if result_info.get('filepath'):
             self.statusBar().showMessage("Download Successful")
             
@@ -817,20 +788,44 @@ class YouTubeApp(QMainWindow):
                 description=result_info.get('description', ''),
                 format_info=result_info.get('format_desc', ''),
                 video_path=result_info['filepath'] if not is_sub else None,
-                srt_path=result_info['filepath'] if is_sub else None
+                srt_path=result_info['filepath'] if is_sub else None,
+                thumbnail=result_info.get('thumbnail')
             )
+            entry = self.diary.find_by_url(result_info.get('url', ''))
+            if entry and is_sub:
+                self.diary.update_entries({entry['id']: {
+                    'transcript_offset': self.transcript_store.add_srt(result_info['filepath'])}})
+            if entry:
+                # The diary keeps 200 characters of the description; the index gets all of it
+                self.update_search_index([entry], {entry['id']: result_info.get('description')})
+            if entry and not is_sub:
+                self.start_postprocess(entry, result_info['filepath'],
+                                       result_info.get('postprocess') or {'stages': plan(), 'options': {}})
+            video_id = extract_video_id(result_info.get('url'))
+            if not is_sub and video_id:
+                # Keeps the library browsable offline
+                self.thumbnails.save_beside(result_info['filepath'], video_id, result_info.get('thumbnail'))
             self.update_completer()
-            QMessageBox.information(self, "Download Complete", f"Saved to: {result_info['filepath']}")
+            # Status bar rather than a dialog: with several downloads in flight, popups would pile up
+            self.statusBar().showMessage(f"Saved to: {result_info['filepath']}", 10000)
+            if entry:
+                # save_entry already indexed the new file; the watcher covers anything else that changed
+                self.explorer_tab.update_entries([entry['id']])
         else:
              self.statusBar().showMessage("Download Failed")
-        self.explorer_tab.refresh_explorer()
 
 
 def main():
-    app = QApplication(sys.argv)
-    app.setWindowIcon(QIcon("assets/logo.png"))
-    window = YouTubeApp()
-    window.show()
+    multiprocessing.freeze_support() # Post-processing workers are spawned from the frozen build too
+    with profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setWindowIcon(QIcon("assets/logo.png"))
+    with profiler.phase("main window"):
+        window = YouTubeApp()
+    with profiler.phase("show"):
+        window.show()
+    # `--profile-startup`: report once the event loop is running and the window painted
+    QTimer.singleShot(0, lambda: finish_profile(profiler) and window.close())
     sys.exit(app.exec())
 
 if __name__ == "__main__":
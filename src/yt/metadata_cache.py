@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# --- EXTRACT_INFO CACHE ---
+class MetadataCache:
+    """Persistent cache of yt-dlp info dicts keyed by video ID.
+
+    Info dicts are stored zlib-compressed in `db/metadata_cache.db`. Entries
+    older than `ttl` seconds are treated as missing, and the least recently
+    used ones are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, storage_dir="db", ttl=6 * 3600, max_bytes=100 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        if not os.path.exists(storage_dir):
+            os.makedirs(storage_dir)
+        self.db_path = os.path.join(storage_dir, "metadata_cache.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS info (
+                video_id TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_info_accessed ON info(accessed_at)")
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get(self, video_id):
+        """Cached info dict for `video_id`, or None if missing/expired. Sets `_fetched_at` on the dict."""
+        if not video_id:
+            return None
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, data FROM info WHERE video_id = ?", (video_id,)).fetchone()
+            if not row:
+                return None
+            fetched_at, data = row
+            if now - fetched_at > self.ttl:
+                with self.conn:
+                    self.conn.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE info SET accessed_at = ? WHERE video_id = ?", (now, video_id))
+        info = json.loads(zlib.decompress(data))
+        info['_fetched_at'] = fetched_at
+        return info
+
+    def put(self, video_id, info):
+        if not video_id:
+            return
+        now = time.time()
+        data = zlib.compress(json.dumps(info, separators=(',', ':')).encode('utf-8'), 6)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO info (video_id, fetched_at, accessed_at, size, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                "accessed_at = excluded.accessed_at, size = excluded.size, data = excluded.data",
+                (video_id, now, now, len(data), data))
+            self._evict()
+
+    def invalidate(self, video_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+
+    def total_size(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM info").fetchone()[0]
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM info").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until we're back under budget
+        doomed = []
+        for video_id, size in self.conn.execute("SELECT video_id, size FROM info ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((video_id,))
+            total -= size
+        self.conn.executemany("DELETE FROM info WHERE video_id = ?", doomed)
@@ -0,0 +1,285 @@
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from yt.content_store import ContentStore
+
+# --- POST-PROCESSING PIPELINE ---
+# Work on finished downloads (probing, remuxing, loudness, chapters) runs in worker
+# processes so ffmpeg and hashing never hold up the GUI or new downloads. Every
+# stage result is cached under the content hash of the file it ran on.
+
+POSTPROCESS_WORKERS = 2
+LOUDNESS_TARGET = -16.0 # LUFS, integrated; what most streaming services normalize to
+CHAPTERS_DIR = "videos/Chapters"
+
+# name -> (function(path, options) -> result dict, tools it needs, option keys it depends on)
+STAGES = {}
+
+def stage(name, tools=('ffmpeg',), uses=()):
+    """Register a pipeline stage. A result with 'path' hands a different (or rewritten) file to the next stage."""
+    def register(func):
+        STAGES[name] = (func, tools, uses)
+        return func
+    return register
+
+def missing_tools(name):
+    return [tool for tool in STAGES[name][1] if not shutil.which(tool)]
+
+def run_tool(args, timeout=None):
+    """Run ffmpeg/ffprobe without a console window; raises RuntimeError with its last error line."""
+    flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    result = subprocess.run(args, capture_output=True, text=True, encoding='utf-8', errors='replace',
+                            timeout=timeout, creationflags=flags)
+    if result.returncode != 0:
+        lines = [l for l in result.stderr.splitlines() if l.strip()]
+        raise RuntimeError(lines[-1] if lines else f"{os.path.basename(args[0])} exited with {result.returncode}")
+    return result
+
+def temp_path(path, ext=None):
+    base, old_ext = os.path.splitext(path)
+    return f"{base}.pp-tmp{ext or old_ext}"
+
+def process_pool(workers=POSTPROCESS_WORKERS):
+    """Worker processes for run_pipeline(). Always spawned: forking the threaded GUI could deadlock the child."""
+    return ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context('spawn'))
+
+# --- Stages ---
+def ffprobe(path):
+    result = run_tool(['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams',
+                       '-show_chapters', path], timeout=120)
+    return json.loads(result.stdout)
+
+def media_info(data):
+    """Diary-sized summary of ffprobe JSON: duration, bitrate, codecs, resolution, frame rate, chapter count."""
+    fmt = data.get('format') or {}
+    streams = data.get('streams') or []
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not (s.get('disposition') or {}).get('attached_pic')), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+
+    def number(value, kind=float):
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            return None
+
+    fps = None
+    if video.get('avg_frame_rate') and '/' in video['avg_frame_rate']:
+        num, den = (number(x) for x in video['avg_frame_rate'].split('/'))
+        fps = round(num / den, 3) if num and den else None
+    return {
+        'duration': number(fmt.get('duration')),
+        'bitrate': number(fmt.get('bit_rate'), int),
+        'container': fmt.get('format_name'),
+        'vcodec': video.get('codec_name'),
+        'width': video.get('width'),
+        'height': video.get('height'),
+        'fps': fps,
+        'acodec': audio.get('codec_name'),
+        'audio_bitrate': number(audio.get('bit_rate'), int),
+        'sample_rate': number(audio.get('sample_rate'), int),
+        'chapters': len(data.get('chapters') or []),
+    }
+
+@stage('probe', tools=('ffprobe',))
+def probe_stage(path, options):
+    return {'media': media_info(ffprobe(path))}
+
+REMUX_PROFILES = {
+    'mkv': {'label': "MKV (copy streams)", 'ext': '.mkv', 'args': ['-map', '0', '-c', 'copy']},
+    'h264': {'label': "H.264 / AAC MP4 (transcode)", 'ext': '.mp4',
+             'args': ['-map', '0:v:0', '-map', '0:a?', '-c:v', 'libx264', '-preset', 'medium', '-crf', '20',
+                      '-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart']},
+    'm4a': {'label': "Audio only (M4A)", 'ext': '.m4a', 'args': ['-map', '0:a:0', '-vn', '-c:a', 'aac', '-b:a', '192k']},
+}
+
+@stage('remux', uses=('remux',))
+def remux_stage(path, options):
+    """Convert to a remux profile; the converted file replaces the download."""
+    name = options.get('remux')
+    profile = REMUX_PROFILES[name]
+    out = os.path.splitext(path)[0] + profile['ext']
+    tmp = temp_path(out)
+    run_tool(['ffmpeg', '-y', '-v', 'error', '-i', path, *profile['args'], tmp])
+    os.replace(tmp, out)
+    if os.path.normcase(os.path.abspath(out)) != os.path.normcase(os.path.abspath(path)):
+        os.remove(path)
+    return {'path': out, 'profile': name}
+
+LOUDNORM_JSON_RE = re.compile(r'\{[^{}]*"input_i"[^{}]*\}', re.S)
+
+@stage('loudnorm', uses=('loudness',))
+def loudnorm_stage(path, options):
+    """Two-pass EBU R128 normalization of the audio; video is copied untouched."""
+    target = options.get('loudness') or LOUDNESS_TARGET
+    params = f"I={target}:TP=-1.5:LRA=11"
+    measure = run_tool(['ffmpeg', '-v', 'info', '-hide_banner', '-i', path, '-vn',
+                        '-af', f"loudnorm={params}:print_format=json", '-f', 'null', '-'])
+    m = LOUDNORM_JSON_RE.search(measure.stderr)
+    if not m:
+        raise RuntimeError("loudnorm printed no measurements")
+    stats = json.loads(m.group(0))
+    measured = (f":measured_I={stats['input_i']}:measured_TP={stats['input_tp']}:measured_LRA={stats['input_lra']}"
+                f":measured_thresh={stats['input_thresh']}:offset={stats['target_offset']}:linear=true")
+    tmp = temp_path(path)
+    run_tool(['ffmpeg', '-y', '-v', 'error', '-i', path, '-map', '0', '-c', 'copy', '-c:a', 'aac', '-b:a', '192k',
+              '-af', f"loudnorm={params}{measured}", tmp])
+    os.replace(tmp, path)
+    return {'path': path, 'input_lufs': float(stats['input_i']), 'target_lufs': target}
+
+@stage('chapters', uses=('chapters',))
+def chapters_stage(path, options):
+    """One file per chapter (stream copy) under videos/Chapters/<video name>/; the video itself is kept."""
+    chapters = options.get('chapters')
+    if not chapters:
+        # Chapters embedded in the file, when the download didn't bring yt-dlp's list
+        data = ffprobe(path) if shutil.which('ffprobe') else {}
+        chapters = [{'start_time': float(c['start_time']), 'end_time': float(c['end_time']),
+                     'title': (c.get('tags') or {}).get('title')} for c in data.get('chapters') or []]
+    if not chapters:
+        return {'files': []}
+    stem, ext = os.path.splitext(os.path.basename(path))
+    folder = os.path.join(options.get('chapters_dir') or CHAPTERS_DIR, stem)
+    os.makedirs(folder, exist_ok=True)
+    files = []
+    for i, chapter in enumerate(chapters, 1):
+        title = re.sub(r'[\\/:*?"<>|]+', '_', chapter.get('title') or f"Chapter {i}").strip()
+        out = os.path.join(folder, f"{i:02d} - {title}{ext}")
+        args = ['ffmpeg', '-y', '-v', 'error', '-ss', str(chapter['start_time'])]
+        if chapter.get('end_time'):
+            args += ['-to', str(chapter['end_time'])]
+        run_tool([*args, '-i', path, '-map', '0', '-c', 'copy', '-copyts', '-avoid_negative_ts', 'make_zero', out])
+        files.append(out)
+    return {'files': files}
+
+# --- Cache ---
+class PostprocessCache:
+    """`db/postprocess.db`: stage results by (content hash, stage, the options the stage depends on)."""
+
+    def __init__(self, storage_dir="db"):
+        os.makedirs(storage_dir, exist_ok=True)
+        self.db_path = os.path.join(storage_dir, "postprocess.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                hash TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                options TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (hash, stage, options)
+            )""")
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get(self, digest, name, options_key):
+        with self.lock:
+            row = self.conn.execute("SELECT result FROM results WHERE hash = ? AND stage = ? AND options = ?",
+                                    (digest, name, options_key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, digest, name, options_key, result):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO results (hash, stage, options, result, created_at) "
+                              "VALUES (?, ?, ?, ?, ?)", (digest, name, options_key, json.dumps(result), time.time()))
+
+def options_key(name, options):
+    _, _, uses = STAGES[name]
+    return json.dumps({k: options.get(k) for k in uses}, sort_keys=True)
+
+def still_valid(result):
+    paths = [result['path']] if result.get('path') else []
+    return all(os.path.exists(p) for p in paths + list(result.get('files') or []))
+
+# --- Pipeline ---
+def run_pipeline(path, stages, options=None, storage_dir="db"):
+    """Run `stages` in order on `path`; meant for a worker process.
+
+    Returns {'path': final file, 'results': {stage: result}, 'errors': {stage: message}, 'cached': [stages]}.
+    A failed stage is reported and skipped; the following stages still run.
+    """
+    options = options or {}
+    content = ContentStore(storage_dir)
+    cache = PostprocessCache(storage_dir)
+    outcome = {'path': path, 'results': {}, 'errors': {}, 'cached': []}
+    try:
+        for name in stages:
+            if name not in STAGES:
+                outcome['errors'][name] = "unknown stage"
+                continue
+            missing = missing_tools(name)
+            if missing:
+                outcome['errors'][name] = f"{', '.join(missing)} not found"
+                continue
+            key = options_key(name, options)
+            try:
+                digest = content.hash_of(path)
+                result = cache.get(digest, name, key)
+                if result is not None and still_valid(result):
+                    outcome['cached'].append(name)
+                else:
+                    result = STAGES[name][0](path, options)
+                    cache.put(digest, name, key, result)
+                    if result.get('path'):
+                        # Its own output counts as done too, or the stage would run again on it
+                        cache.put(content.hash_of(result['path']), name, key, result)
+            except Exception as e:
+                outcome['errors'][name] = str(e)
+                continue
+            outcome['results'][name] = result
+            path = result.get('path') or path
+        outcome['path'] = path
+    finally:
+        cache.close()
+        content.close()
+    return outcome
+
+def diary_fields(outcome):
+    """Fields to set on the diary entry after a pipeline run."""
+    fields = {'video_path': outcome['path']}
+    results = outcome['results']
+    if 'probe' in results:
+        fields['media'] = results['probe']['media']
+    if 'loudnorm' in results:
+        fields['loudness'] = results['loudnorm']['target_lufs']
+    if results.get('chapters', {}).get('files'):
+        fields['chapter_files'] = results['chapters']['files']
+    return fields
+
+def plan(remux=None, loudnorm=False, chapters=False):
+    """Stage list for the chosen options; probing goes last so the media info describes the final file."""
+    stages = []
+    if remux:
+        stages.append('remux')
+    if loudnorm:
+        stages.append('loudnorm')
+    if chapters:
+        stages.append('chapters')
+    return stages + ['probe']
+
+def describe_media(media):
+    """One line for tooltips and the CLI, e.g. "12:04 · 1920x1080 h264 30fps · aac · 2.4 Mb/s"."""
+    parts = []
+    if media.get('duration'):
+        minutes, seconds = divmod(int(media['duration']), 60)
+        parts.append(f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}" if minutes >= 60 else f"{minutes}:{seconds:02d}")
+    if media.get('vcodec'):
+        video = f"{media['width']}x{media['height']} {media['vcodec']}" if media.get('width') else media['vcodec']
+        parts.append(f"{video} {media['fps']:g}fps" if media.get('fps') else video)
+    if media.get('acodec'):
+        parts.append(media['acodec'])
+    if media.get('bitrate'):
+        parts.append(f"{media['bitrate'] / 1e6:.1f} Mb/s")
+    return " · ".join(parts)
@@ -0,0 +1,44 @@
+from PySide6.QtCore import QObject, Signal
+from yt.postprocess import POSTPROCESS_WORKERS, process_pool, run_pipeline
+
+# --- POST-PROCESSING SERVICE ---
+# Finished downloads go to a pool of worker processes; results come back to the
+# GUI thread as a signal. The pool starts on the first job, so launching the app
+# never spawns anything.
+
+class PostProcessService(QObject):
+    job_finished = Signal(str, dict) # entry id, run_pipeline() outcome (plus 'error' if the worker died)
+
+    def __init__(self, storage_dir="db", workers=POSTPROCESS_WORKERS, parent=None):
+        super().__init__(parent)
+        self.storage_dir = storage_dir
+        self.workers = workers
+        self.executor = None
+        self.pending = set()
+
+    def submit(self, entry_id, path, stages, options=None):
+        if self.executor is None:
+            self.executor = process_pool(self.workers)
+        future = self.executor.submit(run_pipeline, path, list(stages), options or {}, self.storage_dir)
+        self.pending.add(future)
+        # Runs on the executor's thread; the queued signal delivers it on the GUI thread
+        future.add_done_callback(lambda f: self._done(entry_id, path, f))
+
+    def _done(self, entry_id, path, future):
+        self.pending.discard(future)
+        if future.cancelled():
+            return
+        try:
+            outcome = future.result()
+        except Exception as e:
+            outcome = {'path': path, 'results': {}, 'errors': {}, 'cached': [], 'error': str(e)}
+        self.job_finished.emit(entry_id, outcome)
+
+    def busy(self):
+        return len(self.pending)
+
+    def shutdown(self):
+        """Drop queued jobs; the ones already running finish in their processes."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,157 @@
+import os
+import re
+import sqlite3
+import threading
+from yt.transcript_store import parse_srt_cues
+
+# --- FULL-TEXT SEARCH ---
+# SQLite FTS5 over diary metadata (title, creator, full description) and every
+# SRT cue, so hits inside transcripts come back with their timestamp.
+
+def parse_srt(text):
+    """[(start seconds, cue text)] from SRT text."""
+    return [(start, cue) for start, _, cue in parse_srt_cues(text)]
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    h, rest = divmod(seconds, 3600)
+    return f"{h}:{rest // 60:02d}:{rest % 60:02d}" if h else f"{rest // 60:02d}:{rest % 60:02d}"
+
+def fts_query(text):
+    """User text -> FTS5 query: every word must match, the last one as a prefix (search as you type)."""
+    words = re.findall(r'\w+', text, re.UNICODE)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if len(words[-1]) >= 2:
+        # One-letter prefixes have no prefix index and would scan every term
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+class SearchIndex:
+    """`db/search.db`: one FTS5 row per diary entry (kind 'meta') and per transcript cue (kind 'cue')."""
+
+    SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+            entry_id UNINDEXED, kind UNINDEXED, start UNINDEXED,
+            title, creator, body,
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        );
+        CREATE TABLE IF NOT EXISTS sources (
+            entry_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            signature TEXT NOT NULL,
+            PRIMARY KEY (entry_id, kind)
+        );
+    """
+    # bm25 column weights: entry_id, kind, start, title, creator, body
+    RANK = "bm25(docs, 0, 0, 0, 10.0, 4.0, 1.0)"
+
+    def __init__(self, storage_dir="db"):
+        os.makedirs(storage_dir, exist_ok=True)
+        self.db_path = os.path.join(storage_dir, "search.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Indexing ---
+    def _signature(self, entry_id, kind):
+        row = self.conn.execute("SELECT signature FROM sources WHERE entry_id = ? AND kind = ?",
+                                (entry_id, kind)).fetchone()
+        return row[0] if row else None
+
+    def _replace(self, entry_id, kind, signature, rows):
+        self.conn.execute("DELETE FROM docs WHERE entry_id = ? AND kind = ?", (entry_id, kind))
+        self.conn.executemany(
+            "INSERT INTO docs (entry_id, kind, start, title, creator, body) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO sources (entry_id, kind, signature) VALUES (?, ?, ?)",
+                          (entry_id, kind, signature))
+
+    def update_entry(self, entry, description=None, srt_path=None):
+        """(Re)index one diary entry if it changed; `description` overrides the diary's truncated one.
+
+        Returns True if anything was written.
+        """
+        entry_id = entry['id']
+        title = entry.get('title') or ''
+        creator = entry.get('creator') or ''
+        srt_path = srt_path or entry.get('srt_path')
+        srt_sig = None
+        if srt_path:
+            try:
+                st = os.stat(srt_path)
+                srt_sig = f"{os.path.abspath(srt_path)}|{st.st_size}|{st.st_mtime_ns}"
+            except OSError:
+                srt_path = None
+
+        changed = False
+        with self.lock, self.conn:
+            meta_sig = f"{title}\x1f{creator}"
+            old_sig = self._signature(entry_id, 'meta')
+            if description is not None or old_sig != meta_sig:
+                body = description
+                if body is None and old_sig is not None:
+                    # The diary only keeps 200 characters; keep the full text indexed at download time
+                    row = self.conn.execute("SELECT body FROM docs WHERE entry_id = ? AND kind = 'meta'",
+                                            (entry_id,)).fetchone()
+                    body = row[0] if row else None
+                if body is None:
+                    body = entry.get('description') or ''
+                self._replace(entry_id, 'meta', meta_sig, [(entry_id, 'meta', None, title, creator, body)])
+                changed = True
+            if srt_sig and self._signature(entry_id, 'cue') != srt_sig:
+                try:
+                    with open(srt_path, encoding='utf-8', errors='replace') as f:
+                        cues = parse_srt(f.read())
+                except OSError:
+                    cues = None
+                if cues is not None:
+                    self._replace(entry_id, 'cue', srt_sig,
+                                  [(entry_id, 'cue', start, None, None, text) for start, text in cues])
+                    changed = True
+        return changed
+
+    def remove_entry(self, entry_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM docs WHERE entry_id = ?", (entry_id,))
+            self.conn.execute("DELETE FROM sources WHERE entry_id = ?", (entry_id,))
+
+    def prune(self, keep_ids):
+        """Drop entries no longer in the diary."""
+        keep_ids = set(keep_ids)
+        with self.lock:
+            indexed = [r[0] for r in self.conn.execute("SELECT DISTINCT entry_id FROM sources")]
+        for entry_id in indexed:
+            if entry_id not in keep_ids:
+                self.remove_entry(entry_id)
+
+    # --- Queries ---
+    def search(self, text, limit=200):
+        """Best hits for `text`, best first: dicts with entry_id, kind, start (seconds or None) and snippet."""
+        query = fts_query(text)
+        if not query:
+            return []
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    f"SELECT entry_id, kind, start, snippet(docs, -1, '[', ']', '…', 12) FROM docs "
+                    f"WHERE docs MATCH ? ORDER BY {self.RANK} LIMIT ?", (query, limit)).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Search error for {text!r}: {e}")
+                return []
+        return [{'entry_id': r[0], 'kind': r[1], 'start': r[2], 'snippet': r[3]} for r in rows]
+
+    def search_entries(self, text, limit=200):
+        """search() grouped by entry: [(entry_id, best hit)], in rank order, at most `limit` entries."""
+        best = {}
+        # One video can have dozens of matching cues; over-fetch so the grouping still fills `limit`
+        for hit in self.search(text, limit * 5):
+            best.setdefault(hit['entry_id'], hit)
+        return list(best.items())[:limit]
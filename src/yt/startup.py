@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# --- STARTUP PROFILING ---
+# The GUI times its import and init phases on every start (a perf_counter call per
+# phase). `yt --profile-startup` or YT_PROFILE_STARTUP=1 prints them once the
+# window is up. For scripts and the startup-time test, YT_PROFILE_STARTUP=<file>.json
+# writes them to that file and closes the app again.
+
+STARTUP_LIBRARY_RATIO = 3.0 # Startup with a 3,000-entry library may take this many times as long as with an empty one (tests)
+PROFILE_FLAG = "--profile-startup"
+
+class StartupProfiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.phases = [] # (name, depth, start s, duration s), in start order
+        self.depth = 0
+
+    @contextmanager
+    def phase(self, name):
+        record = [name, self.depth, self.clock() - self.origin, None]
+        self.phases.append(record)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            record[3] = self.clock() - self.origin - record[2]
+
+    def mark(self, name):
+        """A point in time rather than a phase, e.g. the first event loop pass."""
+        self.phases.append([name, self.depth, self.clock() - self.origin, 0.0])
+
+    def elapsed(self):
+        return self.clock() - self.origin
+
+    def report(self):
+        lines = [f"{'phase':<40} {'start':>9} {'took':>9}"]
+        for name, depth, start, took in self.phases:
+            took = "" if took is None else f"{took * 1000:7.1f}ms"
+            lines.append(f"{'  ' * depth + name:<40} {start * 1000:7.1f}ms {took:>9}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {'total': self.elapsed(),
+                'phases': [{'name': n, 'depth': d, 'start': s, 'duration': t} for n, d, s, t in self.phases]}
+
+def profiling_requested(argv=None, environ=None):
+    """What was asked for: None, True (print) or a .json path."""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    value = environ.get("YT_PROFILE_STARTUP")
+    if value:
+        return value if value.endswith(".json") else True
+    return True if PROFILE_FLAG in argv else None
+
+def finish(profiler, argv=None, environ=None):
+    """Print or save the timings when profiling was asked for. Returns True if the app should exit now."""
+    target = profiling_requested(argv, environ)
+    if target is None:
+        return False
+    profiler.mark("first event loop pass")
+    if target is True:
+        print(profiler.report(), file=sys.stderr, flush=True)
+        return False
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(profiler.to_dict(), f, indent=1)
+    return True
+
+# Created on the first import of this module, which yt.main does before anything else
+profiler = StartupProfiler()
@@ -0,0 +1,110 @@
+import json
+import sqlite3
+import threading
+
+def unique_id(entry_id, is_taken):
+    # Old ids were second-resolution timestamps and could collide
+    entry_id = str(entry_id or '0')
+    while is_taken(entry_id):
+        entry_id = str(int(entry_id) + 1) if entry_id.isdigit() else entry_id + "_1"
+    return entry_id
+
+# --- SQLITE STORAGE ENGINE ---
+class SQLiteStore:
+    """Indexed SQLite (WAL mode) storage for diary entries.
+
+    Each entry is kept as a JSON document keyed by `id`. DiaryManager answers
+    lookups from its in-memory indexes, so the store is only read whole at
+    startup and every change goes through apply().
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_url ON entries(url);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @property
+    def paths(self):
+        """Files whose mtime/size change whenever the store is written."""
+        return [self.db_path, self.db_path + "-wal"]
+
+    # --- Reads ---
+    def has_id(self, entry_id):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM entries WHERE id = ?", (entry_id,)).fetchone() is not None
+
+    def all_entries(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT data FROM entries ORDER BY rowid").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    # --- Writes ---
+    def _upsert(self, entry):
+        self.conn.execute(
+            "INSERT INTO entries (id, url, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET url = excluded.url, data = excluded.data",
+            (entry['id'], entry.get('url') or '', json.dumps(entry, ensure_ascii=False)))
+
+    def apply(self, upserts=(), deletes=(), clear=False):
+        """Apply a batch of changes atomically: either all of them land or none do."""
+        with self.lock, self.conn:
+            if clear:
+                self.conn.execute("DELETE FROM entries")
+            self.conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in deletes])
+            for entry in upserts:
+                self._upsert(entry)
+
+    # --- Meta ---
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    # --- Legacy import ---
+    def import_json(self, json_path):
+        """One-shot import of the old `download_history.json` list. Returns the number of entries imported."""
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return 0
+        if not isinstance(history, list):
+            return 0
+
+        count = 0
+        with self.lock, self.conn:
+            for entry in history:
+                if not isinstance(entry, dict) or not entry.get('url'):
+                    continue
+                entry = dict(entry)
+                entry['id'] = unique_id(entry.get('id'), self.has_id)
+                self._upsert(entry)
+                count += 1
+        return count
@@ -0,0 +1,200 @@
+import os
+import time
+from collections import OrderedDict
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal, QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QImage, QPixmap
+from yt.thumbnails import ThumbnailStore, ThumbnailCache, sidecar_path, frame_grab
+
+# --- THUMBNAIL SERVICE ---
+# Fetching and decoding run on a small thread pool; the GUI thread only turns the
+# finished QImage into a QPixmap and keeps recently used sizes in an LRU.
+# A thumbnail that could not be made (offline, timeout, no source) is not asked
+# for again on every repaint: it is retried after a backoff, or as soon as the
+# files of its video change.
+
+RETRY_AFTER = 30       # Seconds before a failed thumbnail is tried again, doubled per failure...
+RETRY_AFTER_MAX = 1800 # ...up to this
+
+class ThumbnailSignals(QObject):
+    loaded = Signal(object, QImage) # (key, image), image is null on failure
+    skipped = Signal(object)        # key of a job dropped because nobody wants it any more
+    saved = Signal(str)             # path of a thumbnail written next to a video
+
+class ThumbnailJob(QRunnable):
+    def __init__(self, store, key, video_id, url, size, signals):
+        super().__init__()
+        self.store = store
+        self.key = key
+        self.video_id = video_id
+        self.url = url
+        self.size = size # (w, h) to scale into, or None
+        self.signals = signals
+
+    def run(self):
+        image = QImage()
+        try:
+            image.loadFromData(self.store.fetch(self.video_id, self.url))
+            if self.size and not image.isNull():
+                image = image.scaled(*self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        except Exception as e:
+            print(f"Thumbnail error for {self.video_id}: {e}")
+            image = QImage()
+        self.signals.loaded.emit(self.key, image)
+
+def encode_jpeg(image, quality=85):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPEG", quality)
+    return bytes(data)
+
+class LibraryThumbJob(QRunnable):
+    """Small thumbnail for an explorer row: compact cache, else sidecar file, thumbnail URL, ffmpeg."""
+
+    def __init__(self, service, key, video_id, url, video_path, size):
+        super().__init__()
+        self.service = service
+        self.key = key
+        self.video_id = video_id
+        self.url = url
+        self.video_path = video_path
+        self.size = size
+
+    def source_bytes(self):
+        side = sidecar_path(self.video_path) if self.video_path else None
+        if side:
+            with open(side, 'rb') as f:
+                return f.read()
+        if self.video_id:
+            try:
+                return self.service.store.fetch(self.video_id, self.url)
+            except Exception:
+                pass # Offline: try the video itself
+        if self.video_path:
+            return frame_grab(self.video_path)
+        return None
+
+    def run(self):
+        signals = self.service.signals
+        # Rows scrolled out of view since this was queued are dropped, not decoded
+        if self.key not in self.service.wanted:
+            signals.skipped.emit(self.key)
+            return
+        image = QImage()
+        try:
+            cache_key = f"{self.key[0]}@{self.size[0]}x{self.size[1]}"
+            data = self.service.small_cache.get(cache_key)
+            if data is not None:
+                image.loadFromData(data)
+            else:
+                raw = self.source_bytes()
+                if raw and image.loadFromData(raw):
+                    image = image.scaled(*self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    self.service.small_cache.put(cache_key, encode_jpeg(image))
+        except Exception as e:
+            print(f"Thumbnail error for {self.video_path or self.video_id}: {e}")
+            image = QImage()
+        signals.loaded.emit(self.key, image)
+
+class SaveBesideJob(QRunnable):
+    def __init__(self, store, video_path, video_id, url, signals):
+        super().__init__()
+        self.store = store
+        self.args = (video_path, video_id, url)
+        self.signals = signals
+
+    def run(self):
+        try:
+            self.signals.saved.emit(self.store.save_beside(*self.args))
+        except Exception as e:
+            print(f"Could not save thumbnail for {self.args[0]}: {e}")
+
+class ThumbnailService(QObject):
+    """request() answers from the pixmap LRU or schedules one job per (video, size)."""
+    thumbnail_ready = Signal(object, QPixmap) # key, pixmap
+
+    def __init__(self, store=None, small_cache=None, max_pixmaps=400, max_threads=4, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.store = store or ThumbnailStore()
+        self.small_cache = small_cache or ThumbnailCache(self.store_dir())
+        self.max_pixmaps = max_pixmaps
+        self.pixmaps = OrderedDict() # key -> QPixmap, least recently used first
+        self.in_flight = set()
+        self.wanted = set()  # library keys painted since the view last scrolled
+        self.failed = {}     # key -> (failures so far, clock time of the next try)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = ThumbnailSignals(self)
+        self.signals.loaded.connect(self.on_loaded)
+        self.signals.skipped.connect(self.in_flight.discard)
+
+    def store_dir(self):
+        return os.path.dirname(self.store.dir)
+
+    @staticmethod
+    def key(video_id, size=None):
+        return (video_id, tuple(size) if size else None)
+
+    def cached(self, key):
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+        return pixmap
+
+    def request(self, video_id, url=None, size=None):
+        """Cached QPixmap for `video_id` scaled to fit `size`, or None and thumbnail_ready(key, pixmap) later."""
+        key = self.key(video_id, size)
+        pixmap = self.cached(key)
+        if pixmap is not None:
+            return pixmap
+        if key not in self.in_flight:
+            # Several views asking for the same thumbnail share one download and decode
+            self.in_flight.add(key)
+            self.pool.start(ThumbnailJob(self.store, key, video_id, url, key[1], self.signals))
+        return None
+
+    def request_library(self, video_id, url, video_path, size):
+        """Like request(), for explorer rows: works offline from files next to the video."""
+        key = (video_id or video_path, tuple(size))
+        pixmap = self.cached(key)
+        if pixmap is not None or self.clock() < self.failed.get(key, (0, 0))[1]:
+            return pixmap
+        self.wanted.add(key)
+        if key not in self.in_flight:
+            self.in_flight.add(key)
+            self.pool.start(LibraryThumbJob(self, key, video_id, url, video_path, key[1]))
+        return None
+
+    def retry(self, source):
+        """Files of `source` (video id or path, as given to request_library) changed: try again at the next paint."""
+        for key in [k for k in self.failed if k[0] == source]:
+            del self.failed[key]
+
+    def forget_wanted(self):
+        """Call when the view scrolls: queued jobs for rows that are not painted again get dropped."""
+        self.wanted = set()
+
+    def on_loaded(self, key, image):
+        self.in_flight.discard(key)
+        self.wanted.discard(key)
+        if image.isNull():
+            failures = self.failed.get(key, (0, 0))[0] + 1
+            delay = min(RETRY_AFTER * 2 ** (failures - 1), RETRY_AFTER_MAX)
+            self.failed[key] = (failures, self.clock() + delay)
+            return
+        self.failed.pop(key, None)
+        pixmap = QPixmap.fromImage(image)
+        self.pixmaps[key] = pixmap
+        while len(self.pixmaps) > self.max_pixmaps:
+            self.pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(key, pixmap)
+
+    def save_beside(self, video_path, video_id, url=None):
+        self.pool.start(SaveBesideJob(self.store, video_path, video_id, url, self.signals))
+
+    def shutdown(self, msecs=3000):
+        self.pool.clear()
+        self.pool.waitForDone(msecs)
+        self.store.close()
+        self.small_cache.close()
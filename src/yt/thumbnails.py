@@ -0,0 +1,182 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+
+# --- THUMBNAIL STORE ---
+# Qt-free: raw image bytes cached on disk by video ID, fetched over one pooled session.
+
+THUMB_EXTS = ['.jpg', '.webp', '.png']
+
+def default_thumbnail_url(video_id):
+    # Exists for every YouTube video; used when no info dict is at hand (batch downloads)
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+def image_ext(data):
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return '.png'
+    return '.jpg'
+
+def sidecar_path(video_path):
+    """Thumbnail saved next to a video (same stem, like yt-dlp's --write-thumbnail), or None."""
+    base = os.path.splitext(video_path)[0]
+    for ext in THUMB_EXTS:
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+class ThumbnailStore:
+    """Thumbnail bytes in `db/thumbnails/<video id>`, downloaded at most once per video."""
+
+    def __init__(self, storage_dir="db", timeout=10):
+        self.dir = os.path.join(storage_dir, "thumbnails")
+        os.makedirs(self.dir, exist_ok=True)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.fetching = {} # video id -> lock held while it downloads
+        self.session = None # Made on the first download; a library browsed offline never imports requests
+
+    def http(self):
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self.session = requests.Session()
+                # Keep-alive connections to i.ytimg.com shared by every worker thread
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                self.session.mount('https://', adapter)
+                self.session.mount('http://', adapter)
+            return self.session
+
+    def path_for(self, video_id):
+        return os.path.join(self.dir, video_id)
+
+    def get(self, video_id):
+        """Cached bytes for `video_id`, or None."""
+        try:
+            with open(self.path_for(video_id), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, video_id, data):
+        path = self.path_for(video_id)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def fetch(self, video_id, url=None):
+        """Bytes for `video_id` from the disk cache, downloading `url` on a miss. Raises on network errors."""
+        data = self.get(video_id)
+        if data is not None:
+            return data
+        with self.lock:
+            fetch_lock = self.fetching.setdefault(video_id, threading.Lock())
+        # Concurrent misses for one video wait for the first download instead of repeating it
+        with fetch_lock:
+            try:
+                data = self.get(video_id)
+                if data is None:
+                    response = self.http().get(url or default_thumbnail_url(video_id), timeout=self.timeout)
+                    response.raise_for_status()
+                    data = response.content
+                    self.put(video_id, data)
+            finally:
+                with self.lock:
+                    self.fetching.pop(video_id, None)
+        return data
+
+    def save_beside(self, video_path, video_id, url=None):
+        """Write the thumbnail next to a downloaded video so the library works offline. Returns its path."""
+        existing = sidecar_path(video_path)
+        if existing:
+            return existing
+        data = self.fetch(video_id, url)
+        path = os.path.splitext(video_path)[0] + image_ext(data)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def close(self):
+        if self.session:
+            self.session.close()
+
+# --- SMALL THUMBNAIL CACHE ---
+class ThumbnailCache:
+    """Pre-scaled JPEG thumbnails for list views, in one memory-mapped SQLite file.
+
+    Thousands of ~3 KB blobs in `db/thumb_cache.db` instead of one file each; the
+    oldest are dropped once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, storage_dir="db", max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        os.makedirs(storage_dir, exist_ok=True)
+        self.db_path = os.path.join(storage_dir, "thumb_cache.db")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Reads come straight from the page cache mapping instead of read() copies
+        self.conn.execute(f"PRAGMA mmap_size={max_bytes * 2}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS thumbs (
+                key TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbs_created ON thumbs(created_at)")
+        self.conn.commit()
+        self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM thumbs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, data):
+        with self.lock, self.conn:
+            old = self.conn.execute("SELECT size FROM thumbs WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO thumbs (key, created_at, size, data) VALUES (?, ?, ?, ?)",
+                              (key, time.time(), len(data), data))
+            self.total += len(data) - (old[0] if old else 0)
+            if self.total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Oldest first, down to 90% so eviction doesn't run on every insert
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM thumbs ORDER BY created_at"):
+            if self.total <= self.max_bytes * 0.9:
+                break
+            doomed.append((key,))
+            self.total -= size
+        self.conn.executemany("DELETE FROM thumbs WHERE key = ?", doomed)
+
+# --- FRAME GRAB ---
+def frame_grab(video_path, width=320, at=10, timeout=30):
+    """JPEG bytes of one frame of a local video via ffmpeg, or None (no ffmpeg, unreadable file)."""
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg or not os.path.exists(video_path):
+        return None
+    # Seek a few seconds in to skip black intros; short clips fall back to the first frame
+    for seek in (at, 0):
+        try:
+            result = subprocess.run(
+                [ffmpeg, "-v", "error", "-ss", str(seek), "-i", video_path, "-frames:v", "1",
+                 "-vf", f"scale={width}:-2", "-f", "image2", "-c:v", "mjpeg", "pipe:1"],
+                capture_output=True, timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+    return None
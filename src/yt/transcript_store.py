@@ -0,0 +1,253 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# --- COLUMNAR TRANSCRIPT STORE ---
+# `db/transcripts.bin` holds every transcript of the library in one append-only,
+# memory-mapped file. A transcript is a record of three columns (start ms, end ms,
+# text ref); the text refs point at string records, written once per distinct
+# cue text ("[Music]" is stored once for the whole library). Readers slice the
+# columns straight out of the map, so nothing is loaded beyond the cues asked for.
+#
+# Layout, little-endian, every record 8-byte aligned:
+#   header      b"YTTS" u32 version
+#   record      u32 tag, u32 payload length, payload, zero padding
+#   STRING      utf-8 text
+#   TRANSCRIPT  u32 n, u32 longest cue (ms), u32 start[n], u32 end[n], u64 text ref[n]
+# (8 + 4n + 4n bytes keep the text refs 8-byte aligned without padding.) Columns
+# are read as native arrays, hence little-endian hosts only.
+#
+# The GUI and yt-cli may have the file open at the same time. Appends hold an OS
+# lock on it and first catch up on records the other process wrote; the file never
+# shrinks, so maps held by readers in either process stay valid.
+
+MAGIC = b"YTTS"
+VERSION = 1
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<II")
+COUNTS = struct.Struct("<II")
+STRING, TRANSCRIPT = 1, 2
+
+SRT_TIME_RE = re.compile(r'(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})')
+TAG_RE = re.compile(r'<[^>]+>|\{\\[^}]*\}')
+
+def parse_srt_cues(text):
+    """[(start s, end s, cue text)] from SRT text; tolerant of missing numbers and stray blank lines."""
+    cues = []
+    for block in re.split(r'\n\s*\n', text.replace('\r\n', '\n').replace('﻿', '')):
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            m = SRT_TIME_RE.match(line.strip())
+            if m:
+                h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(g) for g in m.groups())
+                cue = TAG_RE.sub('', ' '.join(l.strip() for l in lines[i + 1:])).strip()
+                if cue:
+                    cues.append((h1 * 3600 + m1 * 60 + s1 + ms1 / 1000, h2 * 3600 + m2 * 60 + s2 + ms2 / 1000, cue))
+                break
+    return cues
+
+LOCK_OFFSET = 1 << 40 # msvcrt locks a byte range; one far past the data doesn't block reads
+
+def padding(n):
+    return -n % 8
+
+@contextmanager
+def exclusive(file):
+    """Hold an OS lock on `file` across processes (flock, or msvcrt.locking on Windows)."""
+    if fcntl:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    file.seek(LOCK_OFFSET)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            break
+        except OSError:
+            pass # LK_LOCK gives up after 10 s; keep waiting like flock does
+    try:
+        yield
+    finally:
+        file.seek(LOCK_OFFSET)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class TranscriptStore:
+    """Transcripts by offset: add() returns the offset to keep in the diary entry, cues()/window() read it back."""
+
+    def __init__(self, storage_dir="db"):
+        if sys.byteorder != 'little':
+            raise RuntimeError("The transcript store needs a little-endian host")
+        os.makedirs(storage_dir, exist_ok=True)
+        self.path = os.path.join(storage_dir, "transcripts.bin")
+        self.lock = threading.Lock()
+        # Not 'a+b': appends go to the end of the valid data, which may be before the end of the file
+        self.file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)), 'r+b')
+        with exclusive(self.file):
+            if self.file.seek(0, os.SEEK_END) == 0:
+                self.file.write(HEADER.pack(MAGIC, VERSION))
+                self.file.flush()
+        self.file.seek(0)
+        magic, version = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} transcript store")
+        self.map = None
+        self.pool = None # text -> ref; built on the first write by scanning the string records
+        self.end = HEADER.size # End of the records this process has seen (and where it appends)
+
+    def close(self):
+        with self.lock:
+            self.map = None # Dropped, not closed: cue generators may still hold views into it
+            self.file.close()
+
+    # --- Writing ---
+    def sync(self):
+        """Index the strings written since self.end, by this process before or by another one.
+
+        A record left half-written by a crash ends the data; its bytes are zeroed
+        rather than truncated so that maps of the file, here or elsewhere, stay valid.
+        Called with the file locked.
+        """
+        if self.pool is None:
+            self.pool = {}
+        size = os.fstat(self.file.fileno()).st_size
+        if size == self.end:
+            return
+        view = self.view()
+        pos = self.end
+        while pos + RECORD.size <= size:
+            tag, length = RECORD.unpack_from(view, pos)
+            end = pos + RECORD.size + length
+            if tag not in (STRING, TRANSCRIPT) or end > size:
+                break
+            if tag == STRING:
+                self.pool.setdefault(bytes(view[pos + RECORD.size:end]).decode('utf-8'), pos)
+            pos = end + padding(length)
+        self.end = pos
+        if pos < size and any(view[pos:size]):
+            print(f"Clearing damaged tail of {self.path} at {pos}")
+            self.file.seek(pos)
+            self.file.write(bytes(size - pos))
+            self.file.flush()
+
+    def add(self, cues):
+        """Append a transcript given as (start s, end s, text) tuples. Returns its offset."""
+        cues = sorted(cues, key=lambda c: c[0])
+        with self.lock, exclusive(self.file):
+            self.sync()
+            offset = self.end
+            out = bytearray()
+            refs = array('Q')
+            for _, _, text in cues:
+                ref = self.pool.get(text)
+                if ref is None:
+                    data = text.encode('utf-8')
+                    ref = offset + len(out)
+                    self.pool[text] = ref
+                    out += RECORD.pack(STRING, len(data)) + data + bytes(padding(len(data)))
+                refs.append(ref)
+            starts = array('I', (round(c[0] * 1000) for c in cues))
+            ends = array('I', (max(round(c[1] * 1000), s) for c, s in zip(cues, starts)))
+            longest = max((e - s for s, e in zip(starts, ends)), default=0)
+            payload = COUNTS.pack(len(cues), longest) + starts.tobytes() + ends.tobytes() + refs.tobytes()
+            record = len(out) + offset
+            out += RECORD.pack(TRANSCRIPT, len(payload)) + payload
+            try:
+                self.file.seek(offset)
+                self.file.write(out)
+                self.file.flush()
+            except OSError:
+                self.pool, self.end = None, HEADER.size # The pool may name strings that never made it; rescan
+                raise
+            self.end = offset + len(out)
+        return record
+
+    def add_srt(self, path):
+        """add() from an .srt file; None if it can't be read."""
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                return self.add(parse_srt_cues(f.read()))
+        except OSError as e:
+            print(f"Could not read transcript {path}: {e}")
+            return None
+
+    # --- Reading ---
+    def view(self):
+        """Map covering the whole file, remapped when the file has grown since the last call."""
+        size = os.fstat(self.file.fileno()).st_size
+        if self.map is None or len(self.map) < size:
+            self.map = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ)
+        return self.map
+
+    def columns(self, offset):
+        """(starts ms, ends ms, text refs, longest cue ms, map) for the transcript at `offset`; no copying."""
+        with self.lock:
+            view = memoryview(self.view())
+        tag, length = RECORD.unpack_from(view, offset)
+        if tag != TRANSCRIPT:
+            raise ValueError(f"No transcript at offset {offset}")
+        base = offset + RECORD.size
+        n, longest = COUNTS.unpack_from(view, base)
+        starts_at = base + COUNTS.size
+        ends_at = starts_at + 4 * n
+        refs_at = ends_at + 4 * n
+        return (view[starts_at:ends_at].cast('I'), view[ends_at:refs_at].cast('I'),
+                view[refs_at:refs_at + 8 * n].cast('Q'), longest, view)
+
+    def text(self, ref, view):
+        _, length = RECORD.unpack_from(view, ref)
+        return str(view[ref + RECORD.size:ref + RECORD.size + length], 'utf-8')
+
+    def count(self, offset):
+        return len(self.columns(offset)[0])
+
+    def cues(self, offset, first=0, last=None):
+        """Yield (start s, end s, text) for cues first..last of the transcript at `offset`."""
+        starts, ends, refs, _, view = self.columns(offset)
+        for i in range(first, len(starts) if last is None else min(last, len(starts))):
+            yield starts[i] / 1000, ends[i] / 1000, self.text(refs[i], view)
+
+    def window(self, offset, start, end):
+        """Yield the cues on screen at any point between `start` and `end` seconds."""
+        starts, ends, refs, longest, view = self.columns(offset)
+        lo_ms, hi_ms = start * 1000, end * 1000
+        # Cues are sorted by start; none starting before this can still be showing
+        i = bisect_left(starts, lo_ms - longest)
+        while i < len(starts) and starts[i] < hi_ms:
+            if ends[i] > lo_ms:
+                yield starts[i] / 1000, ends[i] / 1000, self.text(refs[i], view)
+            i += 1
+
+def store_missing_transcripts(store, diary, cancelled=lambda: False, batch=200):
+    """Copy the .srt of every diary entry not linked to the store yet into it. Returns how many were added."""
+    added = 0
+    updates = {}
+    for entry in diary.get_all_entries():
+        if cancelled(): break
+        if entry.get('transcript_offset') is not None or not entry.get('srt_path'):
+            continue
+        path = diary.resolve_path(entry['srt_path'])
+        if not path or not os.path.exists(path):
+            continue
+        offset = store.add_srt(path)
+        if offset is not None:
+            updates[entry['id']] = {'transcript_offset': offset}
+            added += 1
+        if len(updates) >= batch:
+            diary.update_entries(updates)
+            updates = {}
+    diary.update_entries(updates)
+    return added
@@ -0,0 +1,229 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from yt_dlp.utils import sanitize_filename
+from youtube_transcript_api import (YouTubeTranscriptApi, TranscriptsDisabled,
+                                    NoTranscriptFound, VideoUnavailable, InvalidVideoId, RequestBlocked,
+                                    YouTubeRequestFailed)
+from youtube_transcript_api.formatters import SRTFormatter
+from yt.downloader import fetch_info, run_download
+from yt.formats import choose_subtitle, subtitle_opts
+from yt.urls import extract_video_id, normalize_url
+
+# --- BULK TRANSCRIPTS ---
+# Captions straight from YouTube's timedtext endpoint via youtube-transcript-api:
+# three small requests per video instead of a full yt-dlp extraction, spread over
+# a bounded pool of workers that each keep their HTTP connections alive.
+
+TRANSCRIPT_WORKERS = 8
+MAX_ATTEMPTS = 4       # Per video, for 429s, blocks and 5xx that outlast the adapter's own retries
+BACKOFF_BASE = 2.0     # Seconds; doubles per attempt, with jitter
+SRT_DIR = "videos/SRT"
+OEMBED_URL = "https://www.youtube.com/oembed"
+
+# The video has no usable captions; yt-dlp would not find any either
+NO_CAPTIONS = (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, InvalidVideoId)
+
+def make_session(pool_size=4):
+    """requests.Session with keep-alive pooling and retries for connection errors and 5xx."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=None, raise_on_status=False) # The innertube call is a POST
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def transcript_paths(title, code, out_dir=SRT_DIR):
+    """(srt, json) paths, named like yt-dlp's subtitle downloads so the library finds them either way."""
+    base = os.path.join(out_dir, f"{sanitize_filename(title)} (Subtitle).{code}")
+    return base + ".srt", base + ".json"
+
+def pick_transcript(transcript_list, lang):
+    """The Transcript for `lang`, same preference as choose_subtitle: manual first, exact code before prefix."""
+    manual = {t.language_code: t for t in transcript_list if not t.is_generated}
+    auto = {t.language_code: t for t in transcript_list if t.is_generated}
+    choice = choose_subtitle({'subtitles': manual, 'automatic_captions': auto}, lang)
+    if not choice:
+        return None
+    code, is_auto = choice
+    return (auto if is_auto else manual)[code]
+
+class TranscriptEngine:
+    """Fetches transcripts for many videos concurrently and writes `.srt` + `.json` next to each other.
+
+    `fallback(entry, code)` -> (srt path, info) is called when the API can't serve a
+    video that may still have captions (blocked, PO token required, unparsable
+    page). All workers pause together after a 429/block. With a TranscriptStore
+    every transcript is also appended to it (`transcript_offset` in the result).
+    """
+
+    def __init__(self, lang="en", workers=TRANSCRIPT_WORKERS, out_dir=SRT_DIR, fallback=None, store=None,
+                 clock=time.time, sleep=time.sleep):
+        self.lang = lang
+        self.store = store
+        self.workers = max(1, workers)
+        self.out_dir = out_dir
+        self.fallback = fallback
+        self.clock = clock
+        self.sleep = sleep
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.paused_until = 0
+
+    # --- HTTP ---
+    def api(self):
+        """One YouTubeTranscriptApi per worker thread (it is not thread-safe), each on a pooled session."""
+        if getattr(self.local, 'api', None) is None:
+            self.local.session = make_session()
+            self.local.api = YouTubeTranscriptApi(http_client=self.local.session)
+        return self.local.api
+
+    def wait_if_paused(self):
+        delay = self.paused_until - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def pause_all(self, attempt):
+        delay = BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_BASE)
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + delay)
+
+    def fetch_title(self, video_id):
+        """Title and channel from oEmbed (one small request) for entries that came without metadata."""
+        try:
+            self.api() # Make sure this thread has its session
+            r = self.local.session.get(OEMBED_URL, params={'url': normalize_url(video_id), 'format': 'json'},
+                                       timeout=10)
+            if r.ok:
+                data = r.json()
+                return data.get('title'), data.get('author_name')
+        except (requests.RequestException, ValueError):
+            pass
+        return None, None
+
+    # --- One video ---
+    def fetch(self, video_id, code=None):
+        """FetchedTranscript for `video_id` (`code` forces a language); retries blocks and HTTP errors."""
+        for attempt in range(MAX_ATTEMPTS):
+            self.wait_if_paused()
+            try:
+                transcripts = self.api().list(video_id)
+                if code:
+                    transcript = transcripts.find_transcript([code])
+                else:
+                    transcript = pick_transcript(transcripts, self.lang)
+                    if transcript is None:
+                        raise NoTranscriptFound(video_id, [self.lang], transcripts)
+                return transcript.fetch()
+            except (RequestBlocked, YouTubeRequestFailed, requests.RequestException):
+                if attempt + 1 == MAX_ATTEMPTS:
+                    raise
+                self.pause_all(attempt)
+
+    def write(self, fetched, title):
+        srt_path, json_path = transcript_paths(title, fetched.language_code, self.out_dir)
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write(SRTFormatter().format_transcript(fetched))
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'video_id': fetched.video_id, 'language': fetched.language,
+                       'language_code': fetched.language_code, 'is_generated': fetched.is_generated,
+                       'snippets': fetched.to_raw_data()}, f, ensure_ascii=False)
+        return srt_path, json_path
+
+    def process(self, entry, code=None):
+        """Result dict for one {'id', 'url', 'title', 'creator'} entry; never raises."""
+        video_id = entry.get('id') or extract_video_id(entry.get('url'))
+        result = {'id': video_id, 'url': entry.get('url') or normalize_url(video_id), 'title': entry.get('title'),
+                  'creator': entry.get('creator'), 'srt_path': None, 'json_path': None, 'language': None,
+                  'is_generated': None, 'source': None, 'transcript_offset': None, 'error': None}
+        try:
+            fetched = self.fetch(video_id, code)
+        except NO_CAPTIONS as e:
+            result['error'] = f"No transcript: {type(e).__name__}"
+            return result
+        except Exception as e:
+            # Blocked, PO token, page layout changes, network: yt-dlp may still get there
+            return self.fall_back(entry, code, result, e)
+        try:
+            if not result['title']:
+                result['title'], creator = self.fetch_title(video_id)
+                result['creator'] = result['creator'] or creator
+            result['srt_path'], result['json_path'] = self.write(fetched, result['title'] or video_id)
+            if self.store:
+                result['transcript_offset'] = self.store.add((s.start, s.start + s.duration, s.text) for s in fetched)
+        except OSError as e:
+            result['error'] = str(e)
+            return result
+        result.update(language=fetched.language_code, is_generated=fetched.is_generated, source='api')
+        return result
+
+    def fall_back(self, entry, code, result, error):
+        if not self.fallback:
+            result['error'] = f"{type(error).__name__}: {str(error).strip().splitlines()[0]}"
+            return result
+        try:
+            srt_path, info = self.fallback(entry, code)
+        except Exception as e:
+            result['error'] = f"yt-dlp fallback failed: {e}"
+            return result
+        if self.store:
+            result['transcript_offset'] = self.store.add_srt(srt_path)
+        result.update(srt_path=srt_path, source='yt-dlp', title=result['title'] or info.get('title'),
+                      creator=result['creator'] or info.get('uploader'))
+        return result
+
+    # --- Many videos ---
+    def run(self, entries, code=None, cancelled=lambda: False):
+        """Yield a result per entry as they complete; `entries` may be a lazy generator (e.g. expand_sources).
+
+        At most twice the worker count is in flight, so a 1,000-video channel
+        doesn't get enumerated into memory before the first transcript arrives.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="transcripts") as pool:
+            pending = set()
+            for entry in entries:
+                if cancelled(): break
+                pending.add(pool.submit(self.process, entry, code))
+                if len(pending) >= self.workers * 2:
+                    done = next(as_completed(pending))
+                    pending.discard(done)
+                    yield done.result()
+            if cancelled():
+                for future in pending:
+                    future.cancel()
+            for future in as_completed(pending):
+                if not future.cancelled():
+                    yield future.result()
+
+def result_record(result):
+    """Diary save_entries() record for a successful result."""
+    code = result['language']
+    kind = f"{code}{' auto' if result['is_generated'] else ''}" if code else result['source']
+    return {'title': result['title'] or result['id'], 'url': result['url'], 'creator': result['creator'] or 'Unknown',
+            'description': "Subtitle File", 'format_info': f"Subtitle ({kind})", 'srt_path': result['srt_path'],
+            'transcript_offset': result['transcript_offset']}
+
+def ytdlp_fallback(lang="en", cache=None, bandwidth=None):
+    """`fallback` for TranscriptEngine: the old full yt-dlp subtitle download."""
+    def download(entry, code=None):
+        url = entry.get('url') or normalize_url(entry['id'])
+        info = fetch_info(url, cache)
+        if code:
+            choice = (code, code not in (info.get('subtitles') or {}))
+        else:
+            choice = choose_subtitle(info, lang)
+        if not choice:
+            raise ValueError("no matching subtitles")
+        filepath, info = run_download(url, subtitle_opts(*choice), info=info, bandwidth=bandwidth)
+        if not filepath:
+            raise ValueError("no subtitle file written")
+        return filepath, info
+    return download
@@ -1,20 +1,163 @@
 import os
 import webbrowser
-import qtawesome as qta
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                                QFrame, QTableWidget, QTableWidgetItem, 
+                                QFrame, QTableView, QStyledItemDelegate, QStyle,
                                 QAbstractItemView, QHeaderView, QPushButton,
-                                QMessageBox)
-from PySide6.QtCore import Qt, Signal
+                                QMessageBox, QToolTip, QLineEdit)
+from PySide6.QtCore import Qt, Signal, QEvent, QRect, QTimer
+from PySide6.QtGui import QColor
+from yt.ui.icons import icon_pixmap
+from yt.ui.theme import themes
+from yt.ui.library_model import LibraryModel, THUMB, TITLE, ACTIONS
+from yt.library_index import LibraryIndex, library_row, placeholder_row, library_stats
+from yt.search_index import format_timestamp
+from yt.workers import LibraryScanThread
+
+class LibraryDelegate(QStyledItemDelegate):
+    """Paints thumbnails, the title as a link and the action icons; turns clicks into signals."""
+    title_clicked = Signal(int)          # row
+    action_clicked = Signal(int, str)    # row, action name
+
+    ACTIONS = [
+        ('open_url', 'fa5s.external-link-alt', "Open YouTube Link"),
+        ('delete', 'fa5s.trash-alt', "Delete Video & Entry"),
+    ]
+    ICON_SIZE = 16
+    ICON_GAP = 12
+    THUMB_SIZE = (64, 36)
+
+    def __init__(self, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.placeholder_color = QColor(128, 128, 128, 60)
+        self.set_colors()
+
+    def set_colors(self):
+        """Pens from the theme palette, made once per theme rather than per painted cell."""
+        self.link_color = QColor(themes.color('link'))
+        self.match_color = QColor(themes.color('muted'))
+        self.icon_color = themes.color('accent') # Red action icons on both themes
+
+    def action_rects(self, rect):
+        n = len(self.ACTIONS)
+        width = n * self.ICON_SIZE + (n - 1) * self.ICON_GAP
+        x = rect.x() + (rect.width() - width) // 2
+        y = rect.y() + (rect.height() - self.ICON_SIZE) // 2
+        return [(name, QRect(x + i * (self.ICON_SIZE + self.ICON_GAP), y, self.ICON_SIZE, self.ICON_SIZE))
+                for i, (name, _, _) in enumerate(self.ACTIONS)]
+
+    def paint(self, painter, option, index):
+        col = index.column()
+        if col not in (THUMB, TITLE, ACTIONS):
+            return super().paint(painter, option, index)
+
+        # Selection/hover background from the current style, then our own content. No
+        # initStyleOption: it would query the model for every role of every painted cell.
+        style = option.widget.style() if option.widget else None
+        if style:
+            style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        painter.save()
+        if col == THUMB:
+            self.paint_thumbnail(painter, option.rect, index.data(Qt.UserRole))
+        elif col == TITLE:
+            font = option.font
+            font.setUnderline(True)
+            painter.setFont(font)
+            selected = option.state & QStyle.State_Selected
+            painter.setPen(option.palette.highlightedText().color() if selected else self.link_color)
+            text_rect = option.rect.adjusted(4, 0, -4, 0)
+            match = index.data(Qt.UserRole).get('match')
+            if match:
+                # Search results: title on top, the matching passage under it
+                text_rect.setHeight(text_rect.height() // 2)
+            text = option.fontMetrics.elidedText(index.data(), Qt.ElideRight, text_rect.width())
+            painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+            if match:
+                font.setUnderline(False)
+                painter.setFont(font)
+                painter.setPen(option.palette.highlightedText().color() if selected else self.match_color)
+                text_rect.translate(0, text_rect.height())
+                text = option.fontMetrics.elidedText(match, Qt.ElideRight, text_rect.width())
+                painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+        else:
+            icons = {name: icon_name for name, icon_name, _ in self.ACTIONS}
+            for name, rect in self.action_rects(option.rect):
+                painter.drawPixmap(rect, icon_pixmap(icons[name], self.icon_color, self.ICON_SIZE))
+        painter.restore()
+
+    def paint_thumbnail(self, painter, rect, row):
+        w, h = self.THUMB_SIZE
+        target = QRect(rect.x() + (rect.width() - w) // 2, rect.y() + (rect.height() - h) // 2, w, h)
+        # Only rows being painted ask for a thumbnail; cache hits are a dict lookup
+        pixmap = None
+        if self.thumbnails:
+            pixmap = self.thumbnails.request_library(row.get('video_id'), row.get('thumbnail'),
+                                                     row.get('video_path'), self.THUMB_SIZE)
+        if pixmap is None:
+            painter.fillRect(target, self.placeholder_color)
+            return
+        x = target.x() + (w - pixmap.width()) // 2
+        y = target.y() + (h - pixmap.height()) // 2
+        painter.drawPixmap(x, y, pixmap)
+
+    def action_at(self, rect, pos):
+        for name, r in self.action_rects(rect):
+            if r.contains(pos):
+                return name
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if index.column() == TITLE:
+                self.title_clicked.emit(index.row())
+                return True
+            if index.column() == ACTIONS:
+                name = self.action_at(option.rect, event.position().toPoint())
+                if name:
+                    self.action_clicked.emit(index.row(), name)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if index.column() == ACTIONS:
+            name = self.action_at(option.rect, event.pos())
+            tips = {n: tip for n, _, tip in self.ACTIONS}
+            if name:
+                QToolTip.showText(event.globalPos(), tips[name], view)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().helpEvent(event, view, option, index)
 
 class ExplorerTab(QWidget):
     status_message_signal = Signal(str)
 
-    def __init__(self, diary_manager, parent=None):
+    SEARCH_DELAY = 200 # ms after the last keystroke
+
+    def __init__(self, diary_manager, library_index=None, thumbnails=None, search_index=None, parent=None):
         super().__init__(parent)
         self.diary = diary_manager
-        self.setup_ui()
-        self.refresh_explorer()
+        self.thumbnails = thumbnails # ThumbnailService; without one the thumbnail column stays hidden
+        self.search_index = search_index # SearchIndex; without one the search box stays hidden
+        if library_index is None:
+            library_index = LibraryIndex()
+            self.diary.path_index = library_index
+        self.index = library_index
+        self.scan_thread = None
+        self.rescan_pending = False
+        self.rows_by_key = {} # (dir key, stem key) -> ids of rows whose files live there
+        self.all_rows = []
+        self.search_hits = None # entry id -> matching passage, in rank order, while searching
+        self.built = False # Widgets and rows are made the first time the tab is shown
+
+    def showEvent(self, event):
+        if not self.built:
+            self.built = True
+            self.setup_ui()
+            # Let the empty tab paint first; rows come from the diary, sizes from the background scan
+            QTimer.singleShot(0, self.refresh_explorer)
+        super().showEvent(event)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -34,99 +177,207 @@ class ExplorerTab(QWidget):
         
         layout.addWidget(self.stats_frame)
 
-        # Table for videos
-        self.explorer_table = QTableWidget(0, 4)
-        self.explorer_table.setHorizontalHeaderLabels(["Video Title", "Size", "SRT", "Actions"])
-        self.explorer_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search titles, descriptions and transcripts...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.setVisible(self.search_index is not None)
+        layout.addWidget(self.search_input)
+
+        # Table for videos: rows are painted on demand, no per-row widgets
+        self.model = LibraryModel(self)
+        self.delegate = LibraryDelegate(self.thumbnails, self)
+        self.delegate.title_clicked.connect(self.on_title_clicked)
+        self.delegate.action_clicked.connect(self.on_action_clicked)
+
+        self.explorer_table = QTableView()
+        self.explorer_table.setModel(self.model)
+        self.explorer_table.setItemDelegate(self.delegate)
+        header = self.explorer_table.horizontalHeader()
+        header.setSectionResizeMode(TITLE, QHeaderView.Stretch)
+        header.setSectionResizeMode(ACTIONS, QHeaderView.Fixed)
+        header.resizeSection(ACTIONS, 90)
+        header.setSectionResizeMode(THUMB, QHeaderView.Fixed)
+        header.resizeSection(THUMB, self.delegate.THUMB_SIZE[0] + 8)
+        # Fixed row heights: the view never measures rows it is not showing
+        self.explorer_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.explorer_table.verticalHeader().setDefaultSectionSize(self.delegate.THUMB_SIZE[1] + 6)
+        if self.thumbnails:
+            self.thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+            # Thumbnails queued for rows that scrolled away are dropped unless repainted
+            self.explorer_table.verticalScrollBar().valueChanged.connect(self.thumbnails.forget_wanted)
+        else:
+            self.explorer_table.setColumnHidden(THUMB, True)
         self.explorer_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.explorer_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.explorer_table.setShowGrid(False)
+        self.explorer_table.setMouseTracking(True)
+        self.explorer_table.entered.connect(self.update_cursor)
         
         layout.addWidget(self.explorer_table)
         
         self.refresh_btn = QPushButton(" Refresh Library")
         self.refresh_btn.setObjectName("refresh_btn")
-        self.refresh_theme_icons("white")
-        self.refresh_btn.clicked.connect(self.refresh_explorer)
+        themes.set_icon(self.refresh_btn, 'fa5s.sync')
+        self.refresh_btn.clicked.connect(lambda: self.refresh_explorer())
         layout.addWidget(self.refresh_btn)
+        themes.theme_changed.connect(self.on_theme_changed)
+
+    def on_theme_changed(self, theme):
+        # Rows are painted from the model: new pens and one repaint, the diary is not touched
+        self.delegate.set_colors()
+        self.explorer_table.viewport().update()
 
-    def set_theme_style(self, theme):
-        icon_color = "white" if theme == "dark" else "#1D1D1F"
-        self.refresh_theme_icons(icon_color)
-        self.refresh_explorer() # Redraw with new icon colors
+    def on_thumbnail_ready(self, key, pixmap):
+        if key[1] == self.delegate.THUMB_SIZE:
+            # Coalesced by Qt into one repaint of the visible rows
+            self.explorer_table.viewport().update()
 
-    def refresh_theme_icons(self, color):
-        self.refresh_btn.setIcon(qta.icon('fa5s.sync', color=color))
+    def update_cursor(self, index):
+        link = index.column() in (TITLE, ACTIONS)
+        self.explorer_table.viewport().setCursor(Qt.PointingHandCursor if link else Qt.ArrowCursor)
 
-    def refresh_explorer(self):
+    def refresh_explorer(self, rescan=True):
+        """Rebuild rows from the diary; `rescan` also re-reads the folders in the background."""
+        if not self.built: return # Everything is loaded when the tab is first shown
+        # Instant pass from what the index already knows (no disk access)
         entries = self.diary.get_all_entries()
-        self.explorer_table.setRowCount(0)
-        
-        total_size = 0
-        srt_count = 0
-        video_count = 0
-        
-        is_dark = self.refresh_btn.palette().buttonText().color().lightness() > 128
-        # Simple detection might not work if stylesheet is active, but we can pass the theme state if needed.
-        # Let's just use the current icon color logic.
-        icon_color = "#CC0000" # Red icons for actions look good on both
-        
-        for entry in entries:
-            row = self.explorer_table.rowCount()
-            self.explorer_table.insertRow(row)
-            
-            # 1. Title (Clickable)
-            title = entry.get('title', 'Unknown')
-            # Use robust resolution from diary
-            v_path = self.diary.resolve_path(entry.get('video_path'))
-            
-            title_btn = QPushButton(title)
-            title_btn.setStyleSheet("text-align: left; border: none; color: #3498db; text-decoration: underline; background: transparent;")
-            title_btn.setCursor(Qt.PointingHandCursor)
-            title_btn.clicked.connect(lambda checked, p=v_path: self.play_video(p))
-            self.explorer_table.setCellWidget(row, 0, title_btn)
-            
-            # 2. Size
-            size_str = "N/A"
-            if v_path and os.path.exists(v_path):
-                video_count += 1
-                s = os.path.getsize(v_path)
-                total_size += s
-                size_str = f"{s/1024/1024:.1f} MB"
-            
-            self.explorer_table.setItem(row, 1, QTableWidgetItem(size_str))
-            
-            # 3. SRT Status
-            srt_path = self.diary.resolve_path(entry.get('srt_path'))
-            has_srt = srt_path and os.path.exists(srt_path)
-            if has_srt: srt_count += 1
-            srt_icon = "✅" if has_srt else "❌"
-            self.explorer_table.setItem(row, 2, QTableWidgetItem(srt_icon))
-            
-            # 4. Actions (URL + Delete)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            
-            url_btn = QPushButton()
-            url_btn.setIcon(qta.icon('fa5s.external-link-alt', color=icon_color))
-            url_btn.setToolTip("Open YouTube Link")
-            url_btn.setStyleSheet("border: none; background: transparent;")
-            url_btn.clicked.connect(lambda checked, u=entry.get('url'): webbrowser.open(u))
-            
-            del_btn = QPushButton()
-            del_btn.setIcon(qta.icon('fa5s.trash-alt', color=icon_color))
-            del_btn.setToolTip("Delete Video & Entry")
-            del_btn.setStyleSheet("border: none; background: transparent;")
-            del_btn.clicked.connect(lambda checked, eid=entry.get('id'): self.delete_video(eid))
-            
-            actions_layout.addWidget(url_btn)
-            actions_layout.addWidget(del_btn)
-            self.explorer_table.setCellWidget(row, 3, actions_widget)
-            
-        self.stat_videos.setText(f"Videos: {video_count}")
-        self.stat_size.setText(f"Size: {total_size/1024/1024:.1f} MB")
-        self.stat_srts.setText(f"SRTs: {srt_count}")
+        if self.index.ready:
+            rows = [library_row(self.diary, entry) for entry in entries]
+            self.show_stats(library_stats(rows))
+        else:
+            rows = [placeholder_row(entry) for entry in entries]
+        self.set_rows(rows)
+        if rescan or not self.index.ready:
+            self.start_scan()
+
+    def set_rows(self, rows):
+        self.all_rows = rows
+        self.show_rows()
+        self.rows_by_key = {}
+        self.index_rows(rows)
+
+    def index_rows(self, rows):
+        for row in rows:
+            for path in row['paths']:
+                for key in self.index.keys_for(path):
+                    self.rows_by_key.setdefault(key, set()).add(row['id'])
+
+    def update_entries(self, ids):
+        """Re-read only these diary entries (saved, edited or deleted) instead of rebuilding every row."""
+        if not self.built: return
+        changed = {}
+        for entry_id in ids:
+            entry = self.diary.get_entry(entry_id)
+            if entry is None:
+                changed[entry_id] = None
+            else:
+                changed[entry_id] = library_row(self.diary, entry) if self.index.ready else placeholder_row(entry)
+        if not changed: return
+        known = {r['id'] for r in self.all_rows}
+        rows = [changed.get(r['id'], r) for r in self.all_rows]
+        # New entries come last, as they do in the diary
+        rows = [r for r in rows if r is not None] + [r for i, r in changed.items() if r and i not in known]
+        self.all_rows = rows
+        self.show_rows()
+        self.index_rows(r for r in changed.values() if r)
+        if self.index.ready:
+            self.show_stats(library_stats(rows))
+
+    def show_rows(self):
+        """Put all rows in the table, or only the search hits (best first) while a search is active."""
+        if self.search_hits is None:
+            rows = self.all_rows
+        else:
+            by_id = {r['id']: r for r in self.all_rows}
+            rows = [dict(by_id[i], match=match) for i, match in self.search_hits.items() if i in by_id]
+        self.model.set_rows(rows)
+
+    def apply_file_events(self, events):
+        """Recompute only the rows whose files were added, removed or resized."""
+        if not self.built or not self.index.ready: return
+        ids = set()
+        for kind, path in events:
+            for key in self.index.keys_for(path):
+                ids |= self.rows_by_key.get(key, set())
+        rows = {}
+        for entry_id in ids:
+            entry = self.diary.get_entry(entry_id)
+            if entry:
+                row = rows[entry_id] = library_row(self.diary, entry)
+                if self.thumbnails:
+                    # A thumbnail that failed earlier may have a source now (sidecar image, finished video)
+                    self.thumbnails.retry(row.get('video_id') or row.get('video_path'))
+        self.all_rows = [rows.get(r['id'], r) for r in self.all_rows]
+        if self.search_hits is not None:
+            rows = {i: dict(r, match=self.search_hits[i]) for i, r in rows.items() if i in self.search_hits}
+        self.model.update_rows(list(rows.values()))
+        self.show_stats(library_stats(self.all_rows))
+
+    def start_scan(self):
+        if self.scan_thread:
+            # One scan at a time; the latest request runs when the current one ends
+            self.rescan_pending = True
+            return
+        self.rescan_pending = False
+        self.scan_thread = LibraryScanThread(self.index, self.diary)
+        self.scan_thread.progress_signal.connect(self.status_message_signal.emit)
+        self.scan_thread.stats_signal.connect(self.show_stats)
+        self.scan_thread.finished_signal.connect(self.set_rows)
+        self.scan_thread.finished.connect(self.on_scan_thread_done)
+        self.scan_thread.start()
+
+    def on_scan_thread_done(self):
+        self.scan_thread = None
+        if self.rescan_pending:
+            self.start_scan()
+
+    def stop_scan(self):
+        self.rescan_pending = False
+        if self.scan_thread:
+            self.scan_thread.cancel()
+            self.scan_thread.wait(2000)
+
+    def run_search(self):
+        text = self.search_input.text().strip()
+        if not text or not self.search_index:
+            self.search_hits = None
+        else:
+            self.search_hits = {}
+            for entry_id, hit in self.search_index.search_entries(text):
+                match = hit['snippet']
+                if hit['start'] is not None:
+                    match = f"[{format_timestamp(hit['start'])}] {match}"
+                self.search_hits[entry_id] = match
+            self.status_message_signal.emit(f"{len(self.search_hits)} videos match \"{text}\"")
+        self.show_rows()
+
+    def refresh_search(self):
+        """Re-run the active search after the index changed."""
+        if self.search_hits is not None:
+            self.run_search()
+
+    def show_stats(self, stats):
+        self.stat_videos.setText(f"Videos: {stats['videos']}")
+        self.stat_size.setText(f"Size: {stats['size']/1024/1024:.1f} MB")
+        self.stat_srts.setText(f"SRTs: {stats['srts']}")
+
+    def on_title_clicked(self, row_index):
+        row = self.model.row_at(row_index)
+        if row:
+            self.play_video(row['video_path'])
+
+    def on_action_clicked(self, row_index, action):
+        row = self.model.row_at(row_index)
+        if not row: return
+        if action == 'open_url':
+            webbrowser.open(row['url'])
+        elif action == 'delete':
+            self.delete_video(row['id'])
 
     def play_video(self, path):
         if path and os.path.exists(path):
@@ -144,7 +395,9 @@ class ExplorerTab(QWidget):
         
         if reply == QMessageBox.Yes:
             if self.diary.delete_entry(entry_id):
-                self.refresh_explorer()
+                if self.search_index:
+                    self.search_index.remove_entry(entry_id)
+                self.update_entries([entry_id]) # delete_entry already updated the index
                 self.status_message_signal.emit("Entry deleted")
             else:
                 self.status_message_signal.emit("Failed to delete entry")
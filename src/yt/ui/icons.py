@@ -0,0 +1,37 @@
+from functools import lru_cache
+
+# --- ICON CACHE ---
+# qta.icon renders a font glyph into a new QIcon on every call; views that paint
+# hundreds of rows ask for the same few (name, color) pairs over and over.
+# qtawesome itself takes longer to import and load its fonts than the rest of the
+# window takes to build, so widgets made at startup get their icons through
+# set_icon(), which holds them until load_icons() runs after the first paint.
+
+pending = [] # (widget or action, name, color) waiting for load_icons()
+loaded = False
+
+@lru_cache(maxsize=256)
+def icon(name, color=None):
+    import qtawesome as qta
+    return qta.icon(name, color=color) if color else qta.icon(name)
+
+@lru_cache(maxsize=256)
+def icon_pixmap(name, color, size):
+    """Rendered once; QIcon.paint on a qtawesome icon re-draws the font glyph every time."""
+    return icon(name, color).pixmap(size, size)
+
+def set_icon(target, name, color=None):
+    if loaded:
+        target.setIcon(icon(name, color))
+    else:
+        pending.append((target, name, color))
+
+def load_icons():
+    global loaded
+    loaded = True
+    while pending:
+        target, name, color = pending.pop(0)
+        try:
+            target.setIcon(icon(name, color))
+        except RuntimeError:
+            pass # Deleted before the icons were loaded
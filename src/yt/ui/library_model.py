@@ -0,0 +1,110 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from yt.postprocess import describe_media
+
+# --- LIBRARY MODEL ---
+# One plain dict per diary entry; the view only asks for the rows it is painting.
+
+COLUMNS = ["", "Video Title", "Size", "SRT", "Actions"]
+THUMB, TITLE, SIZE, SRT, ACTIONS = range(len(COLUMNS))
+
+class LibraryModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Views ask for a dozen roles per cell; answer the ones we don't serve first
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole, Qt.UserRole) or not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == TITLE:
+                return row['title']
+            if col in (SIZE, SRT) and not row.get('scanned', True):
+                return "…"
+            if col == SIZE:
+                return "N/A" if row['size'] is None else f"{row['size']/1024/1024:.1f} MB"
+            if col == SRT:
+                return "✅" if row['has_srt'] else "❌"
+        elif role == Qt.ToolTipRole:
+            if col == TITLE:
+                tip = row['video_path'] or row['url']
+                if row.get('media'):
+                    tip = f"{tip}\n{describe_media(row['media'])}"
+                # The search passage is elided in the cell; show it whole here
+                return f"{tip}\n{row['match']}" if row.get('match') else tip
+        else:
+            return row
+        return None
+
+    def update_rows(self, rows):
+        """Replace the given rows in place (matched by 'id'); ids not in the model are ignored."""
+        positions = {r['id']: i for i, r in enumerate(self.rows)}
+        for row in rows:
+            pos = positions.get(row['id'])
+            if pos is not None and self.rows[pos] != row:
+                self.rows[pos] = row
+                self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(COLUMNS) - 1))
+
+    def row_at(self, i):
+        return self.rows[i] if 0 <= i < len(self.rows) else None
+
+    def set_rows(self, rows):
+        """Replace the contents with `rows`, emitting only the removals, insertions and changes.
+
+        Rows are matched by 'id'. Entries keep their relative order in the diary, so a
+        refresh is a handful of removed/inserted runs plus dataChanged for edited rows;
+        anything else (a reordering) falls back to a model reset.
+        """
+        new_ids = [r['id'] for r in rows]
+        keep = set(new_ids)
+
+        # 1. Removals, bottom-up in contiguous runs
+        i = len(self.rows) - 1
+        while i >= 0:
+            if self.rows[i]['id'] in keep:
+                i -= 1
+                continue
+            end = i
+            while i >= 0 and self.rows[i]['id'] not in keep:
+                i -= 1
+            self.beginRemoveRows(QModelIndex(), i + 1, end)
+            del self.rows[i + 1:end + 1]
+            self.endRemoveRows()
+
+        old_ids = {r['id'] for r in self.rows}
+        if [r['id'] for r in self.rows] != [i for i in new_ids if i in old_ids]:
+            self.beginResetModel()
+            self.rows = list(rows)
+            self.endResetModel()
+            return
+
+        # 2. Insertions and in-place updates, top-down
+        pos = 0
+        while pos < len(rows):
+            row = rows[pos]
+            if row['id'] in old_ids:
+                if self.rows[pos] != row:
+                    self.rows[pos] = row
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, len(COLUMNS) - 1))
+                pos += 1
+                continue
+            end = pos
+            while end + 1 < len(rows) and rows[end + 1]['id'] not in old_ids:
+                end += 1
+            self.beginInsertRows(QModelIndex(), pos, end)
+            self.rows[pos:pos] = rows[pos:end + 1]
+            self.endInsertRows()
+            pos = end + 1
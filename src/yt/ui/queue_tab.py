@@ -0,0 +1,215 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                                QTableWidget, QTableWidgetItem, QAbstractItemView,
+                                QHeaderView, QPushButton, QSpinBox, QDoubleSpinBox)
+from PySide6.QtCore import Signal
+from yt.ui.icons import set_icon
+from yt.ui.theme import themes
+from yt.download_queue import QUEUED, RUNNING, PAUSED, DONE, FAILED
+
+# --- PROGRESS FORMATTING ---
+# Workers report numbers; text is only built here, for the rows being shown.
+
+def format_bytes(n):
+    if n is None:
+        return "N/A"
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+def format_eta(seconds):
+    if seconds is None:
+        return "N/A"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+def format_progress(stats):
+    total = stats.get('total')
+    percent = f"{stats['downloaded'] / total * 100:.1f}%" if total else format_bytes(stats['downloaded'])
+    speed = stats.get('speed')
+    speed = f"{format_bytes(speed)}/s" if speed is not None else "N/A"
+    return f"Downloading: {percent} of {format_bytes(total)} | Speed: {speed} | ETA: {format_eta(stats.get('eta'))}"
+
+class QueueTab(QWidget):
+    status_message_signal = Signal(str)
+
+    def __init__(self, download_queue, parent=None):
+        super().__init__(parent)
+        self.queue = download_queue
+        self.rows = {} # job id -> table row
+        self.last_status = {}
+        self.icon_color = themes.color('accent') # Same red on every theme
+        self.setup_ui()
+
+        self.queue.job_added.connect(self.add_job)
+        self.queue.job_updated.connect(self.update_job)
+        self.queue.job_removed.connect(self.rebuild)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+
+        # Concurrency settings
+        limits_layout = QHBoxLayout()
+        limits_layout.addWidget(QLabel("Parallel downloads:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 16)
+        self.workers_spin.setValue(self.queue.max_workers)
+        self.workers_spin.valueChanged.connect(lambda v: self.queue.set_limits(max_workers=v))
+        limits_layout.addWidget(self.workers_spin)
+
+        limits_layout.addWidget(QLabel("Per host:"))
+        self.host_spin = QSpinBox()
+        self.host_spin.setRange(1, 16)
+        self.host_spin.setValue(self.queue.per_host_limit)
+        self.host_spin.valueChanged.connect(lambda v: self.queue.set_limits(per_host_limit=v))
+        limits_layout.addWidget(self.host_spin)
+        limits_layout.addStretch()
+        layout.addLayout(limits_layout)
+
+        if self.queue.bandwidth:
+            layout.addLayout(self.setup_bandwidth())
+
+        self.queue_table = QTableWidget(0, 3)
+        self.queue_table.setHorizontalHeaderLabels(["Title", "Status", "Actions"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.queue_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.setShowGrid(False)
+        layout.addWidget(self.queue_table)
+
+        self.clear_btn = QPushButton(" Clear Finished")
+        self.clear_btn.setObjectName("refresh_btn")
+        self.clear_btn.clicked.connect(self.queue.remove_finished)
+        layout.addWidget(self.clear_btn)
+        themes.set_icon(self.clear_btn, 'fa5s.broom')
+
+    def setup_bandwidth(self):
+        # Total rate shared by all running downloads; off-peak hours can allow more (e.g. bulk jobs at night)
+        bandwidth = self.queue.bandwidth
+        row = QHBoxLayout()
+
+        def rate_spin(value):
+            spin = QDoubleSpinBox()
+            spin.setRange(0, 1000)
+            spin.setDecimals(1)
+            spin.setSuffix(" MB/s")
+            spin.setSpecialValueText("Unlimited")
+            spin.setValue((value or 0) / 1024 / 1024)
+            spin.valueChanged.connect(self.apply_bandwidth)
+            return spin
+
+        def hour_spin(value):
+            spin = QSpinBox()
+            spin.setRange(0, 23)
+            spin.setSuffix(":00")
+            spin.setValue(value)
+            spin.valueChanged.connect(self.apply_bandwidth)
+            return spin
+
+        row.addWidget(QLabel("Limit:"))
+        self.limit_spin = rate_spin(bandwidth.limit)
+        row.addWidget(self.limit_spin)
+        row.addWidget(QLabel("Off-peak:"))
+        self.off_peak_spin = rate_spin(bandwidth.off_peak_limit)
+        row.addWidget(self.off_peak_spin)
+        row.addWidget(QLabel("from"))
+        self.off_peak_start = hour_spin(bandwidth.off_peak_hours[0])
+        row.addWidget(self.off_peak_start)
+        row.addWidget(QLabel("to"))
+        self.off_peak_end = hour_spin(bandwidth.off_peak_hours[1])
+        row.addWidget(self.off_peak_end)
+        row.addStretch()
+        return row
+
+    def apply_bandwidth(self):
+        to_rate = lambda spin: int(spin.value() * 1024 * 1024) or None
+        self.queue.bandwidth.configure(to_rate(self.limit_spin), to_rate(self.off_peak_spin),
+                                       (self.off_peak_start.value(), self.off_peak_end.value()))
+
+    def rebuild(self, *args):
+        self.queue_table.setRowCount(0)
+        self.rows = {}
+        self.last_status = {}
+        for job in self.queue.jobs.values():
+            self.add_job(job)
+
+    def add_job(self, job):
+        row = self.queue_table.rowCount()
+        self.queue_table.insertRow(row)
+        self.rows[job.id] = row
+
+        title_item = QTableWidgetItem(job.title)
+        title_item.setToolTip(job.url)
+        self.queue_table.setItem(row, 0, title_item)
+        self.queue_table.setItem(row, 1, QTableWidgetItem(""))
+
+        # Actions: pause/resume, prioritize, cancel
+        actions_widget = QWidget()
+        actions_layout = QHBoxLayout(actions_widget)
+        actions_layout.setContentsMargins(0, 0, 0, 0)
+
+        toggle_btn = QPushButton()
+        toggle_btn.setObjectName("row_action")
+        toggle_btn.clicked.connect(lambda checked, jid=job.id: self.toggle_pause(jid))
+
+        top_btn = QPushButton()
+        set_icon(top_btn, 'fa5s.arrow-up', self.icon_color)
+        top_btn.setToolTip("Download Next")
+        top_btn.setObjectName("row_action")
+        top_btn.clicked.connect(lambda checked, jid=job.id: self.queue.prioritize(jid))
+
+        cancel_btn = QPushButton()
+        set_icon(cancel_btn, 'fa5s.times', self.icon_color)
+        cancel_btn.setToolTip("Cancel")
+        cancel_btn.setObjectName("row_action")
+        cancel_btn.clicked.connect(lambda checked, jid=job.id: self.queue.cancel(jid))
+
+        actions_layout.addWidget(toggle_btn)
+        actions_layout.addWidget(top_btn)
+        actions_layout.addWidget(cancel_btn)
+        self.queue_table.setCellWidget(row, 2, actions_widget)
+        self.update_job(job)
+
+    def update_job(self, job):
+        row = self.rows.get(job.id)
+        if row is None: return
+
+        detail = job.message
+        if not detail and job.status == RUNNING and job.progress:
+            detail = format_progress(job.progress)
+        elif job.status == DONE and job.transfer and job.transfer['bytes']:
+            detail = f"{detail} ({format_bytes(job.transfer['throughput'])}/s)"
+        status = f"{job.status}: {detail}" if detail else job.status
+        self.queue_table.item(row, 1).setText(status)
+        self.queue_table.item(row, 1).setToolTip(status)
+
+        # Progress ticks only change the text; buttons follow status changes
+        if self.last_status.get(job.id) == job.status: return
+        self.last_status[job.id] = job.status
+
+        actions = self.queue_table.cellWidget(row, 2)
+        toggle_btn, top_btn, cancel_btn = [actions.layout().itemAt(i).widget() for i in range(3)]
+        if job.status in (PAUSED, FAILED):
+            set_icon(toggle_btn, 'fa5s.play', self.icon_color)
+            toggle_btn.setToolTip("Resume" if job.status == PAUSED else "Retry")
+        else:
+            set_icon(toggle_btn, 'fa5s.pause', self.icon_color)
+            toggle_btn.setToolTip("Pause")
+        toggle_btn.setEnabled(job.status in (QUEUED, RUNNING, PAUSED, FAILED))
+        top_btn.setEnabled(job.status == QUEUED)
+        cancel_btn.setEnabled(job.status in (QUEUED, RUNNING, PAUSED, FAILED))
+
+        running = len(self.queue.running_jobs())
+        self.status_message_signal.emit(f"Downloads: {running} running, {self.queue.pending_count()} queued")
+
+    def toggle_pause(self, job_id):
+        job = self.queue.jobs.get(job_id)
+        if not job: return
+        if job.status in (PAUSED, FAILED):
+            self.queue.resume(job_id)
+        else:
+            self.queue.pause(job_id)
@@ -0,0 +1,180 @@
+import re
+from string import Template
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QWidget
+from yt.ui import icons
+
+# --- THEMES ---
+# A theme is a palette of named colours. The stylesheet is written once against
+# those names and compiled into a single sheet holding every theme, each rule
+# scoped to the window's `theme` property. The sheet is parsed once at startup;
+# switching theme changes the property and re-polishes the widgets (no parsing, no
+# per-widget setStyleSheet, no data reloads). Views that paint themselves read
+# their colours from the same palette and repaint on theme_changed.
+
+PALETTES = {
+    'dark': {
+        'window': "#121212", 'text': "#E0E0E0", 'strong': "white", 'muted': "#888",
+        'card': "#1E1E1E", 'border': "#333", 'input': "#181818", 'input_border': "#333",
+        'accent': "#CC0000", 'accent_hover': "#E60000", 'disabled': "#444", 'disabled_text': "#888",
+        'info': "#0077CC", 'info_hover': "#0088EE",
+        'button': "#333", 'button_hover': "#444", 'selection': "#333",
+        'header': "#1E1E1E", 'tab': "#181818", 'bar': "#181818", 'thumbnail': "#000",
+        'link': "#3498DB", 'icon': "white",
+    },
+    'light': {
+        'window': "#F5F5F7", 'text': "#1D1D1F", 'strong': "#1D1D1F", 'muted': "#555",
+        'card': "#FFFFFF", 'border': "#E1E1E1", 'input': "#FFFFFF", 'input_border': "#D2D2D7",
+        'accent': "#CC0000", 'accent_hover': "#B20000", 'disabled': "#E8E8ED", 'disabled_text': "#999",
+        'info': "#0077CC", 'info_hover': "#0066B3",
+        'button': "#E8E8ED", 'button_hover': "#D1D1D6", 'selection': "#E8E8ED",
+        'header': "#F5F5F7", 'tab': "#E8E8ED", 'bar': "#FFFFFF", 'thumbnail': "#E1E1E1",
+        'link': "#3498DB", 'icon': "#1D1D1F",
+    },
+}
+
+TEMPLATE = """
+QMainWindow { background-color: $window; color: $text; font-family: 'Segoe UI', Roboto, Helvetica; }
+
+QFrame#card, QFrame#stats_card { background-color: $card; border-radius: 12px; border: 1px solid $border; }
+
+QLineEdit, QComboBox, QTextEdit {
+    padding: 10px; border-radius: 8px; border: 1px solid $input_border;
+    background-color: $input; color: $strong;
+}
+QComboBox::drop-down { border: none; }
+
+QPushButton#primary, QPushButton#subs_btn {
+    padding: 12px; border-radius: 8px; background-color: $accent;
+    color: white; font-weight: bold; border: none;
+}
+QPushButton#primary:hover { background-color: $accent_hover; }
+QPushButton#subs_btn { background-color: $info; }
+QPushButton#subs_btn:hover { background-color: $info_hover; }
+QPushButton#primary:disabled, QPushButton#subs_btn:disabled { background-color: $disabled; color: $disabled_text; }
+
+QPushButton#secondary, QPushButton#refresh_btn {
+    padding: 8px; border-radius: 6px; background-color: $button;
+    color: $strong; border: none;
+}
+QPushButton#secondary:hover, QPushButton#refresh_btn:hover { background-color: $button_hover; }
+QPushButton#row_action { border: none; background: transparent; }
+
+QTableView { background-color: $input; color: $text; gridline-color: $border; border: none; border-radius: 8px; }
+QHeaderView::section { background-color: $header; color: $muted; padding: 5px; border: none; font-weight: bold; }
+QTableView::item:selected { background-color: $selection; color: $text; }
+
+QTabWidget::pane { border: 1px solid $border; border-radius: 8px; background: $card; top: -1px; }
+QTabBar::tab {
+    background: $tab; color: $muted; padding: 10px 20px;
+    border-top-left-radius: 8px; border-top-right-radius: 8px; margin-right: 2px;
+}
+QTabBar::tab:selected { background: $card; color: $strong; border-bottom: 2px solid $accent; }
+
+QLabel, QTabBar { color: $text; }
+QLabel#title { font-size: 24px; font-weight: bold; color: $strong; }
+QLabel#subtitle { color: $muted; font-size: 14px; }
+QLabel#subtitle a { color: $accent; text-decoration: none; font-weight: bold; }
+QLabel#description { color: $text; }
+QLabel#stat_label { color: $accent; font-weight: bold; }
+QLabel#thumbnail { background-color: $thumbnail; border-radius: 8px; }
+QScrollArea#desc_scroll, QScrollArea#desc_scroll QWidget { background: transparent; }
+
+QStatusBar { background-color: $bar; color: $muted; border-top: 1px solid $border; }
+
+QMenuBar { background-color: $window; color: $text; }
+QMenuBar::item:selected { background-color: $selection; }
+QMenu { background-color: $card; color: $text; border: 1px solid $border; }
+QMenu::item:selected { background-color: $selection; }
+
+QMessageBox { background-color: $card; border: 1px solid $border; }
+QMessageBox QLabel { color: $text; }
+QMessageBox QPushButton { background-color: $button; color: $strong; border-radius: 4px; padding: 5px 15px; }
+QMessageBox QPushButton:hover { background-color: $button_hover; }
+"""
+
+def scope(sheet, theme):
+    """Every rule of `sheet` only for windows whose `theme` property is `theme`."""
+    scoped = []
+    for rule in sheet.split("}"):
+        if "{" not in rule:
+            continue
+        selectors, body = rule.split("{", 1)
+        prefixed = []
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            if re.match(r"QMainWindow\b", selector):
+                prefixed.append(f'QMainWindow[theme="{theme}"]{selector[len("QMainWindow"):]}')
+            else:
+                prefixed.append(f'QMainWindow[theme="{theme}"] {selector}')
+        scoped.append(f"{', '.join(prefixed)} {{{body}}}")
+    return "\n".join(scoped)
+
+def compile_stylesheet(template=TEMPLATE, palettes=PALETTES):
+    return "\n".join(scope(Template(template).substitute(colors), theme) for theme, colors in palettes.items())
+
+class ThemeManager(QObject):
+    theme_changed = Signal(str)
+
+    def __init__(self, palettes=PALETTES, theme="dark"):
+        super().__init__()
+        self.palettes = palettes
+        self.theme = theme
+        self.window = None
+        self.stylesheet = None # Compiled on attach, once per process
+        self.themed_icons = [] # (widget or action, {theme: icon name}, palette colour) re-set on every switch
+
+    def color(self, name, theme=None):
+        return self.palettes[theme or self.theme][name]
+
+    def names(self):
+        return list(self.palettes)
+
+    def attach(self, window):
+        """Give `window` the stylesheet of all themes; only its `theme` property changes from now on."""
+        if self.stylesheet is None:
+            self.stylesheet = compile_stylesheet(palettes=self.palettes)
+        self.window = window
+        window.setProperty("theme", self.theme)
+        window.setStyleSheet(self.stylesheet)
+
+    def set_icon(self, target, name, color='icon'):
+        """An icon drawn in the theme's `color`; `name` may differ per theme ({'dark': ..., 'light': ...})."""
+        names = name if isinstance(name, dict) else dict.fromkeys(self.palettes, name)
+        self.themed_icons.append((target, names, color))
+        icons.set_icon(target, names[self.theme], self.color(color))
+
+    def prepare_icons(self):
+        """Make every theme's icons ahead of the first switch; afterwards a switch only looks them up."""
+        for theme in self.palettes:
+            for _, names, color in self.themed_icons:
+                icons.icon(names[theme], self.color(color, theme))
+
+    def apply(self, theme):
+        if theme == self.theme:
+            return
+        self.theme = theme
+        if self.window is not None:
+            self.window.setProperty("theme", theme)
+            # Selectors on the window's property are only re-matched when widgets are polished again
+            style = self.window.style()
+            for widget in [self.window] + self.window.findChildren(QWidget):
+                style.unpolish(widget)
+                style.polish(widget)
+        alive = []
+        for target, names, color in self.themed_icons:
+            try:
+                icons.set_icon(target, names[theme], self.color(color))
+            except RuntimeError:
+                continue # Widget deleted since it was registered
+            alive.append((target, names, color))
+        self.themed_icons = alive
+        self.theme_changed.emit(theme)
+
+    def toggle(self):
+        themes = self.names()
+        self.apply(themes[(themes.index(self.theme) + 1) % len(themes)])
+        return self.theme
+
+# Shared by the window and its tabs
+themes = ThemeManager()
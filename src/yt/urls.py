@@ -0,0 +1,44 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+VIDEO_ID_RE = re.compile(r"^[a-zA-Z0-9_-]{11}$")
+
+def normalize_url(text):
+    """Turn a bare 11-character video ID into a watch URL; leave anything else as is."""
+    text = text.strip()
+    if VIDEO_ID_RE.match(text):
+        return f"https://www.youtube.com/watch?v={text}"
+    return text
+
+def extract_video_id(url):
+    """Return the YouTube video ID for watch/youtu.be/shorts/embed/live URLs (or a bare ID), else None."""
+    if not url:
+        return None
+    url = url.strip()
+    if VIDEO_ID_RE.match(url):
+        return url
+
+    parsed = urlparse(url if "://" in url else "https://" + url)
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."): host = host[4:]
+    if host.startswith("m."): host = host[2:]
+
+    candidate = None
+    if host == "youtu.be":
+        candidate = parsed.path.strip("/").split("/")[0]
+    elif host.endswith("youtube.com") or host == "youtube-nocookie.com":
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+
+    if candidate and VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+def canonical_url(url):
+    """One URL per YouTube video (watch?v=ID) whatever form it came in; other URLs are left as is."""
+    video_id = extract_video_id(url)
+    return f"https://www.youtube.com/watch?v={video_id}" if video_id else (url or "").strip()
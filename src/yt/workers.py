@@ -1,100 +1,283 @@
-import re
-import os
-import yt_dlp
-import requests
 from PySide6.QtCore import QThread, Signal
-from PySide6.QtGui import QPixmap
+from yt.batch import expand_sources
+from yt.downloader import run_download, fetch_info, progress_stats, ProgressThrottle, TransferMeter
+from yt.library_index import library_row, library_stats
+from yt.job_store import clean_fragments
+from yt.transcript_store import store_missing_transcripts
 
 # --- WORKER THREAD FOR DOWNLOADING ---
 class DownloadThread(QThread):
-    progress_signal = Signal(str) # To update status label
+    progress_signal = Signal(str) # Status text: starting, complete, errors
+    stats_signal = Signal(dict) # progress_stats() numbers, throttled; formatted by the UI
+    file_signal = Signal(str) # Each file yt-dlp starts writing (video, audio stream, ...)
     finished_signal = Signal(dict) # To re-enable buttons & save diary. Returns info dict on success.
     
-    def __init__(self, url, ydl_opts, context_info):
+    def __init__(self, url, ydl_opts, context_info, info=None, bandwidth=None, content=None):
         super().__init__()
         self.url = url
         self.ydl_opts = ydl_opts
         self.context_info = context_info # Info passed for diary (title, creator etc)
+        self.info = info # Already-fetched info dict, saves a second page extraction
+        self.bandwidth = bandwidth # Shared BandwidthScheduler, or None for no limit
+        self.content = content # ContentStore: skips repeat downloads, hardlinks identical files
         self.final_filename = None
+        self.cancelled = False
+        self.throttle = ProgressThrottle()
+        self.current_file = None
 
-    def run(self):
-        # Hook into progress to emit signals
-        params = self.ydl_opts.copy()
-        params['progress_hooks'] = [self.my_hook]
-        params['quiet'] = True
-        params['no_color'] = True
-        
-        # Output template - ensure it goes to 'videos/' if not set
-        if 'outtmpl' not in params:
-             params['outtmpl'] = 'videos/%(title)s [%(height)sp].%(ext)s'
+    def cancel(self):
+        # Checked from the progress hook; yt-dlp keeps the .part file so the job can resume later
+        self.cancelled = True
 
+    def run(self):
+        import yt_dlp # Imported by the first download, not at startup
         try:
             self.progress_signal.emit("Starting download...")
-            with yt_dlp.YoutubeDL(params) as ydl:
-                # Run download
-                info = ydl.extract_info(self.url, download=True)
-                
-                # Determine the filename (if not already set by hook)
-                # prioritizing info.get('_filename') or info.get('filepath') if download finished
-                if info.get('_filename') and os.path.exists(info['_filename']):
-                    self.final_filename = info['_filename']
-                elif info.get('requested_downloads') and os.path.exists(info['requested_downloads'][0].get('filepath', '')):
-                    self.final_filename = info['requested_downloads'][0]['filepath']
-                elif not self.final_filename:
-                    # 1. Fallback 
-                    if info.get('requested_downloads'):
-                        self.final_filename = info['requested_downloads'][0].get('filepath')
-                    # 2. Check info dict for requested_subtitles
-                    elif info.get('requested_subtitles'):
-                        first_lang = next(iter(info['requested_subtitles']))
-                        self.final_filename = info['requested_subtitles'][first_lang].get('filepath')
-                    # 3. Fallback
-                    else:
-                        self.final_filename = ydl.prepare_filename(info)
+            # Hook into progress to emit signals
+            meter = TransferMeter()
+            self.final_filename, _ = run_download(self.url, self.ydl_opts, self.info, [self.my_hook, meter],
+                                                  self.bandwidth, self.content)
 
             self.progress_signal.emit("Download Complete!")
             # Pass back success info
             result = self.context_info.copy()
             result['filepath'] = self.final_filename
+            result['transfer'] = meter.summary() # bytes, elapsed, throughput (bytes/s)
             self.finished_signal.emit(result)
-            
+
+        except yt_dlp.utils.DownloadCancelled:
+            self.progress_signal.emit("Cancelled")
+            self.finished_signal.emit({})
         except Exception as e:
             self.progress_signal.emit(f"Error: {str(e)}")
             self.finished_signal.emit({}) # Emit empty dict to signal failure/end
         
     def my_hook(self, d):
+        if self.cancelled:
+            from yt_dlp.utils import DownloadCancelled
+            raise DownloadCancelled()
         if d['status'] == 'downloading':
-            p = d.get('_percent_str', '0%')
-            s = d.get('_speed_str', 'N/A')
-            eta = d.get('_eta_str', 'N/A')
-            size = d.get('_total_bytes_str') or d.get('_total_bytes_estimate_str', 'N/A')
-            
-            # Comprehensive ANSI stripping
-            def clean(t):
-                return re.sub(r'\x1b\[[0-9;]*[a-zA-Z]', '', t).strip() if t else 'N/A'
-            
-            msg = f"Downloading: {clean(p)} of {clean(size)} | Speed: {clean(s)} | ETA: {clean(eta)}"
-            self.progress_signal.emit(msg)
-            
+            if d.get('filename') and d['filename'] != self.current_file:
+                self.current_file = d['filename']
+                self.file_signal.emit(self.current_file)
+            # Called for every chunk; most calls return here without touching Qt
+            if self.throttle.ready():
+                self.stats_signal.emit(progress_stats(d))
+
         elif d['status'] == 'finished':
             if 'filename' in d:
                 self.final_filename = d['filename']
+            self.throttle.ready(final=True)
+            self.stats_signal.emit(progress_stats(d))
             self.progress_signal.emit("Download complete. Processing...")
 
-# --- WORKER FOR THUMBNAIL FETCHING ---
-class ThumbnailThread(QThread):
-    loaded_signal = Signal(QPixmap)
+# --- WORKER FOR METADATA FETCHING ---
+class MetadataThread(QThread):
+    info_signal = Signal(dict) # Full yt-dlp info dict
+    error_signal = Signal(str)
 
-    def __init__(self, url):
+    def __init__(self, url, cache=None, force_refresh=False):
         super().__init__()
         self.url = url
+        self.cache = cache # Optional MetadataCache
+        self.force_refresh = force_refresh
+        self.cancelled = False
+
+    def cancel(self):
+        # extract_info can't be interrupted, so a superseded fetch just never reports back
+        self.cancelled = True
+
+    def run(self):
+        try:
+            info = fetch_info(self.url, self.cache, self.force_refresh)
+            if not self.cancelled:
+                self.info_signal.emit(info)
+        except Exception as e:
+            if not self.cancelled:
+                self.error_signal.emit(str(e))
+
+# --- WORKER FOR BATCH / PLAYLIST / CHANNEL EXPANSION ---
+class BatchThread(QThread):
+    entry_signal = Signal(dict) # One new video: id, url, title, creator
+    progress_signal = Signal(str)
+    finished_signal = Signal(int) # Number of videos found
+
+    def __init__(self, sources, known_ids=()):
+        super().__init__()
+        self.sources = sources # Iterable of URLs, consumed lazily
+        self.known_ids = set(known_ids)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        count = 0
+        try:
+            for entry in expand_sources(self.sources, self.known_ids, lambda: self.cancelled):
+                count += 1
+                self.entry_signal.emit(entry)
+                self.progress_signal.emit(f"Batch: queued {count} videos...")
+        except Exception as e:
+            self.progress_signal.emit(f"Batch error: {str(e)}")
+        self.finished_signal.emit(count)
+
+# --- WORKER FOR TRANSCRIPTS ---
+class TranscriptThread(QThread):
+    progress_signal = Signal(str)
+    saved_signal = Signal(list)    # Diary entries written by one batch
+    finished_signal = Signal(int, int) # Transcripts saved, failures
+
+    SAVE_BATCH = 25
+
+    def __init__(self, engine, diary, sources=None, entries=None, code=None, known_ids=()):
+        super().__init__()
+        self.engine = engine
+        self.diary = diary
+        self.sources = sources # URLs expanded lazily (playlists, channels) ...
+        self.entries = entries # ... or ready-made {'id', 'url', 'title', 'creator'} entries
+        self.code = code
+        self.known_ids = set(known_ids)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
 
     def run(self):
+        from yt.transcripts import result_record # Pulls in yt-dlp and youtube-transcript-api
+        saved = failed = 0
+        batch = []
         try:
-            response = requests.get(self.url, timeout=10)
-            if response.status_code == 200:
-                pixmap = QPixmap()
-                pixmap.loadFromData(response.content)
-                self.loaded_signal.emit(pixmap)
-        except Exception:
-            pass
+            entries = self.entries
+            if entries is None:
+                entries = expand_sources(self.sources, self.known_ids, lambda: self.cancelled)
+            for result in self.engine.run(entries, self.code, lambda: self.cancelled):
+                if result['error']:
+                    failed += 1
+                    print(f"Transcript failed for {result['url']}: {result['error']}")
+                else:
+                    saved += 1
+                    batch.append(result_record(result))
+                if len(batch) >= self.SAVE_BATCH:
+                    self.saved_signal.emit(self.diary.save_entries(batch))
+                    batch = []
+                self.progress_signal.emit(f"Transcripts: {saved} saved, {failed} unavailable...")
+        except Exception as e:
+            self.progress_signal.emit(f"Transcript error: {str(e)}")
+        if batch:
+            self.saved_signal.emit(self.diary.save_entries(batch))
+        self.finished_signal.emit(saved, failed)
+
+class TranscriptImportThread(QThread):
+    finished_signal = Signal(int) # Transcripts copied into the store
+
+    def __init__(self, store, diary):
+        super().__init__()
+        self.store = store
+        self.diary = diary
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            count = store_missing_transcripts(self.store, self.diary, lambda: self.cancelled)
+        except Exception as e:
+            print(f"Transcript store error: {e}")
+            count = 0
+        self.finished_signal.emit(count)
+
+# --- WORKER FOR LIBRARY SCANS ---
+class LibraryScanThread(QThread):
+    progress_signal = Signal(str)
+    stats_signal = Signal(dict)   # Running Videos/Size/SRTs totals while entries are resolved
+    finished_signal = Signal(list) # Explorer rows for every diary entry
+
+    CHUNK = 250
+
+    def __init__(self, index, diary):
+        super().__init__()
+        self.index = index
+        self.diary = diary
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if not self.index.scan(lambda n: self.progress_signal.emit(f"Scanning library: {n} files..."),
+                                   lambda: self.cancelled):
+                return
+            rows = []
+            for entry in self.diary.get_all_entries():
+                if self.cancelled: return
+                rows.append(library_row(self.diary, entry))
+                if len(rows) % self.CHUNK == 0:
+                    self.stats_signal.emit(library_stats(rows))
+            self.stats_signal.emit(library_stats(rows))
+            self.finished_signal.emit(rows)
+        except Exception as e:
+            self.progress_signal.emit(f"Library scan error: {str(e)}")
+
+class LibrarySyncThread(QThread):
+    events_signal = Signal(list) # [(kind, path)] for files added/removed/changed
+
+    def __init__(self, index, roots, check_sizes=False):
+        super().__init__()
+        self.index = index
+        self.roots = list(roots)
+        self.check_sizes = check_sizes
+
+    def run(self):
+        events = []
+        for root in self.roots:
+            events.extend(self.index.sync_dir(root, self.check_sizes))
+        if events:
+            self.events_signal.emit(events)
+
+# --- WORKER FOR LEFTOVER DOWNLOAD FRAGMENTS ---
+class FragmentCleanupThread(QThread):
+    finished_signal = Signal(list) # Paths removed
+
+    def __init__(self, store, keep_paths, older_than):
+        super().__init__()
+        self.store = store
+        self.keep_paths = list(keep_paths)
+        self.older_than = older_than
+
+    def run(self):
+        finished = self.store.finished()
+        removed = clean_fragments([r['filename'] for r in finished], self.keep_paths, self.older_than)
+        for record in finished:
+            self.store.remove(record['id'])
+        self.finished_signal.emit(removed)
+
+# --- WORKER FOR THE SEARCH INDEX ---
+class SearchIndexThread(QThread):
+    finished_signal = Signal(int) # Entries (re)indexed
+
+    def __init__(self, index, entries, descriptions=None, prune=False):
+        super().__init__()
+        self.index = index
+        self.entries = list(entries)
+        self.descriptions = descriptions or {} # entry id -> full description, when known
+        self.prune = prune
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        count = 0
+        try:
+            for entry in self.entries:
+                if self.cancelled: return
+                if self.index.update_entry(entry, self.descriptions.get(entry['id'])):
+                    count += 1
+            if self.prune:
+                self.index.prune(e['id'] for e in self.entries)
+        except Exception as e:
+            print(f"Search index error: {e}")
+        self.finished_signal.emit(count)
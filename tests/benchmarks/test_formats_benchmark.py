@@ -0,0 +1,21 @@
+import pytest
+from yt.formats import format_choices, subtitle_choices, video_audio_choices
+
+pytest.importorskip("pytest_benchmark")
+
+# Not part of the default run: `uv run pytest -m benchmark` to compare timings.
+pytestmark = pytest.mark.benchmark
+
+def test_bench_regular_video(benchmark, regular_info):
+    result = benchmark(format_choices, regular_info)
+    assert result['video'][0][1] == "best_1080"
+
+def test_bench_live_stream_formats(benchmark, live_info):
+    assert len(live_info['formats']) > 400
+    video, audio = benchmark(video_audio_choices, live_info['formats'])
+    assert len(video) > 1 and len(audio) > 1
+
+def test_bench_many_auto_captions(benchmark, many_captions_info):
+    assert len(many_captions_info['automatic_captions']) > 150
+    subs = benchmark(subtitle_choices, many_captions_info)
+    assert any(d['is_auto'] for _, d in subs)
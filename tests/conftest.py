@@ -3,3 +3,66 @@ import os
 
 # Add the project source directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+
+# --- RECORDED-SHAPE INFO DICTS ---
+# Trimmed to the keys yt.formats reads; shapes follow real yt-dlp output for YouTube.
+
+AUDIO_LANGS = ['en', 'en-US', 'es', 'fr', 'de', 'ja', 'ko', 'hi', 'pt-BR', 'und', None]
+CAPTION_CODES = ['af', 'ak', 'sq', 'am', 'ar', 'hy', 'as', 'ay', 'az', 'bn', 'eu', 'be', 'bho', 'bs', 'bg',
+                 'my', 'ca', 'ceb', 'zh-Hans', 'zh-Hant', 'co', 'hr', 'cs', 'da', 'dv', 'nl', 'en', 'eo', 'et',
+                 'ee', 'fil', 'fi', 'fr', 'gl', 'lg', 'ka', 'de', 'el', 'gn', 'gu', 'ht', 'ha', 'haw', 'iw', 'hi',
+                 'hmn', 'hu', 'is', 'ig', 'id', 'ga', 'it', 'ja', 'jv', 'kn', 'kk', 'km', 'rw', 'ko', 'kri', 'ku',
+                 'ky', 'lo', 'la', 'lv', 'ln', 'lt', 'lb', 'mk', 'mg', 'ms', 'ml', 'mt', 'mi', 'mr', 'mn', 'ne',
+                 'nso', 'no', 'ny', 'or', 'om', 'ps', 'fa', 'pl', 'pt', 'pa', 'qu', 'ro', 'ru', 'sm', 'sa', 'gd',
+                 'sr', 'sn', 'sd', 'si', 'sk', 'sl', 'so', 'st', 'es', 'su', 'sw', 'sv', 'tg', 'ta', 'tt', 'te',
+                 'th', 'ti', 'ts', 'tr', 'tk', 'uk', 'ur', 'ug', 'uz', 'vi', 'cy', 'fy', 'xh', 'yi', 'yo', 'zu']
+
+def make_info(n_video=24, n_audio=12, manual=('en', 'es-419'), n_auto=40, live=False):
+    heights = [144, 240, 360, 480, 720, 1080, 1440, 2160]
+    formats = []
+    for i in range(n_video):
+        h = heights[i % len(heights)]
+        formats.append({
+            'format_id': f"{'hls-' if live else ''}{100 + i}", 'height': h, 'width': h * 16 // 9,
+            'ext': 'mp4' if i % 2 else 'webm', 'vcodec': 'avc1.4d401f' if i % 2 else 'vp9',
+            'acodec': 'mp4a.40.2' if live else 'none', 'format_note': f"{h}p", 'tbr': 100.0 + i,
+        })
+    notes = ['low', 'medium', 'original (default), high', 'dubbed-auto, medium', 'ultra-low', None]
+    for i in range(n_audio):
+        formats.append({
+            'format_id': f"{249 + i}-{i % 5}", 'vcodec': 'none', 'acodec': 'opus' if i % 2 else 'mp4a.40.2',
+            'ext': 'webm' if i % 2 else 'm4a', 'language': AUDIO_LANGS[i % len(AUDIO_LANGS)],
+            'format_note': notes[i % len(notes)], 'abr': [48.0, 70.0, 129.5, 160.2, None][i % 5],
+        })
+    formats.append({'format_id': 'sb0', 'vcodec': 'none', 'acodec': 'none', 'ext': 'mhtml', 'format_note': 'storyboard'})
+
+    def tracks(code, kind):
+        name = f"{code} - {code}" if kind == 'manual' else f"{code} ({kind})"
+        return [{'ext': ext, 'name': name, 'url': f"https://example.invalid/{code}.{ext}"}
+                for ext in ('json3', 'srv1', 'vtt', 'ttml')]
+
+    codes = (CAPTION_CODES * (n_auto // len(CAPTION_CODES) + 1))[:n_auto]
+    auto = {c if i < len(CAPTION_CODES) else f"{c}-x{i}": tracks(c, 'auto') for i, c in enumerate(codes)}
+    auto['live_chat'] = [{'ext': 'json'}]
+    return {
+        'id': 'dQw4w9WgXcQ', 'title': 'Mock Video', 'uploader': 'Mock Creator', 'is_live': live,
+        'formats': formats,
+        'subtitles': {c: tracks(c, 'manual') for c in manual},
+        'automatic_captions': auto,
+    }
+
+@pytest.fixture
+def regular_info():
+    return make_info()
+
+@pytest.fixture
+def live_info():
+    # Live streams list hundreds of HLS variants (one per bitrate/codec/CDN)
+    return make_info(n_video=420, n_audio=60, manual=(), n_auto=0, live=True)
+
+@pytest.fixture
+def many_captions_info():
+    # Auto-translated captions: 150+ languages
+    return make_info(manual=('en', 'en-GB', 'de', 'pt-BR', 'zh-Hans'), n_auto=180)
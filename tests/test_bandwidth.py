@@ -0,0 +1,142 @@
+import functools
+import http.server
+import threading
+import time
+import pytest
+from yt.bandwidth import BandwidthScheduler, fair_shares, in_window, BACKOFF_COOLDOWN
+from yt.profiles import profile_opts
+
+MB = 1024 * 1024
+
+class Clock:
+    def __init__(self, hour=12):
+        # Local noon (or `hour`) today, so the day/night window is predictable
+        t = time.localtime()
+        self.now = time.mktime((t.tm_year, t.tm_mon, t.tm_mday, hour, 0, 0, 0, 0, -1))
+
+    def __call__(self):
+        return self.now
+
+def test_fair_shares():
+    assert fair_shares(None, [1, 2]) == [None, None]
+    assert fair_shares(9 * MB, [None, None, None]) == [3 * MB] * 3
+    # A download using far less than its share leaves the rest to the others
+    assert fair_shares(9 * MB, [0.8 * MB, None, 5 * MB]) == [1 * MB, 4 * MB, 4 * MB]
+    # All slow: nothing is held back
+    assert fair_shares(9 * MB, [1, 1]) == [4.5 * MB, 4.5 * MB]
+
+def test_windows_wrap_past_midnight():
+    assert in_window(3, (1, 7)) and not in_window(7, (1, 7))
+    assert in_window(23, (22, 6)) and in_window(2, (22, 6)) and not in_window(12, (22, 6))
+
+def test_limit_is_split_between_running_downloads():
+    clock = Clock(hour=12)
+    bandwidth = BandwidthScheduler(limit=4 * MB, off_peak_limit=None, off_peak_hours=(1, 7), clock=clock)
+    a, b = {}, {}
+    bandwidth.join(a)
+    assert a['ratelimit'] == 4 * MB
+    bandwidth.join(b)
+    assert a['ratelimit'] == b['ratelimit'] == 2 * MB
+    bandwidth.leave(b)
+    assert a['ratelimit'] == 4 * MB
+
+    # Off-peak: no limit at all
+    clock.now += 16 * 3600 # 04:00 the next day
+    hook = bandwidth.hook(a)
+    hook({'status': 'downloading', 'speed': 4 * MB})
+    assert a['ratelimit'] is None
+
+@pytest.fixture
+def fragment_server(tmp_path):
+    served = tmp_path / "served"
+    served.mkdir()
+    for i in range(6):
+        (served / f"frag{i}").write_bytes(b"x" * 1000)
+    class Quiet(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Quiet, directory=str(served)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+def test_fragmented_download_stays_under_its_share(fragment_server, tmp_path, monkeypatch):
+    import yt_dlp
+    from yt_dlp.downloader import fragment
+    from yt_dlp.downloader.dash import DashSegmentsFD
+    # What each fragment connection is built with: a copy of the params at stream start
+    copies = []
+    init = fragment.HttpQuietDownloader.__init__
+    def spy(self, ydl, params):
+        copies.append(dict(params))
+        init(self, ydl, params)
+    monkeypatch.setattr(fragment.HttpQuietDownloader, '__init__', spy)
+
+    bandwidth = BandwidthScheduler(limit=4 * MB, clock=Clock(hour=12))
+    params = {**profile_opts('fast'), 'quiet': True, 'noprogress': True}
+    other = {}
+    bandwidth.join(params)
+    bandwidth.join(other)
+    info = {'id': 'frag', 'ext': 'mp4', 'format_id': '1', 'protocol': 'http_dash_segments', 'url': fragment_server,
+            'fragment_base_url': fragment_server, 'fragments': [{'path': f"frag{i}"} for i in range(6)]}
+    with yt_dlp.YoutubeDL(params) as ydl:
+        assert DashSegmentsFD(ydl, ydl.params).download(str(tmp_path / "out.mp4"), info)[0]
+    assert (tmp_path / "out.mp4").stat().st_size == 6000
+    # Every connection enforces ratelimit on its own: one connection at the download's share
+    assert [(c['ratelimit'], c['concurrent_fragment_downloads']) for c in copies] == [(2 * MB, 1)]
+
+    # Without a limit the profile's connections come back
+    bandwidth.configure(limit=None)
+    assert params['ratelimit'] is None and params['concurrent_fragment_downloads'] == 8
+
+def test_429_backs_off_then_recovers():
+    clock = Clock(hour=12)
+    bandwidth = BandwidthScheduler(clock=clock)
+    params = {}
+    bandwidth.join(params)
+    hook = bandwidth.hook(params)
+    hook({'status': 'downloading', 'speed': 8 * MB})
+    assert params['ratelimit'] is None
+
+    bandwidth.logger().warning("Got error: HTTP Error 429: Too Many Requests. Retrying fragment 3 (1/10)...")
+    assert params['ratelimit'] == 4 * MB
+    clock.now += 1
+    bandwidth.throttled() # same burst
+    assert params['ratelimit'] == 4 * MB
+
+    clock.now += BACKOFF_COOLDOWN
+    hook({'status': 'downloading', 'speed': 4 * MB})
+    assert params['ratelimit'] is None
+
+def test_sustained_429s_keep_backing_off():
+    clock = Clock(hour=12)
+    bandwidth = BandwidthScheduler(limit=16 * MB, clock=clock)
+    params = {}
+    bandwidth.join(params)
+    hook = bandwidth.hook(params)
+    limits = []
+    for _ in range(10): # a 429 every 3 s for 30 s
+        bandwidth.throttled()
+        limits.append(params['ratelimit'])
+        clock.now += 3
+        hook({'status': 'downloading', 'speed': 1 * MB})
+    # Halved every other 429 (the one in between is inside the grace window), down to the floor
+    assert limits == [8 * MB, 8 * MB, 4 * MB, 4 * MB, 2 * MB, 2 * MB, 1 * MB, 1 * MB, 1 * MB, 1 * MB]
+
+    # Recovers only after a cooldown without any 429
+    clock.now += BACKOFF_COOLDOWN - 4
+    hook({'status': 'downloading', 'speed': 1 * MB})
+    assert params['ratelimit'] == 1 * MB
+    clock.now += 1
+    hook({'status': 'downloading', 'speed': 1 * MB})
+    assert params['ratelimit'] == 2 * MB
+
+def test_profile_opts():
+    assert profile_opts('standard') == {}
+    assert profile_opts('nonexistent') == {}
+    fast = profile_opts('fast')
+    assert fast['concurrent_fragment_downloads'] == 8 and fast['http_chunk_size'] == 10 * 1024 * 1024
+    assert 'external_downloader' not in fast
+    # 'max' hands off to aria2c only when it is installed
+    assert profile_opts('max', aria2c=True)['external_downloader'] == {'default': 'aria2c'}
+    assert 'external_downloader' not in profile_opts('max', aria2c=False)
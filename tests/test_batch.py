@@ -0,0 +1,54 @@
+from unittest.mock import patch
+from yt.batch import expand_sources, read_url_file
+
+def video(vid, title=None):
+    return {'_type': 'url', 'id': vid, 'url': f"https://www.youtube.com/watch?v={vid}", 'title': title}
+
+CHANNEL = "https://www.youtube.com/@mock"
+def pages():
+    return {
+        CHANNEL: {'_type': 'playlist', 'entries': [
+            {'_type': 'url', 'id': 'UCmock-videos', 'url': CHANNEL + "/videos"},
+            {'_type': 'url', 'id': 'UCmock-shorts', 'url': CHANNEL + "/shorts"},
+        ]},
+        CHANNEL + "/videos": {'_type': 'playlist', 'entries': iter([video('aaaaaaaaaaa', 'A'), video('bbbbbbbbbbb', 'B')])},
+        CHANNEL + "/shorts": {'_type': 'playlist', 'entries': iter([video('ccccccccccc', 'C'), video('aaaaaaaaaaa', 'A')])},
+    }
+
+@patch('yt_dlp.YoutubeDL')
+def test_channel_expansion_skips_known_and_duplicates(mock_yt_dlp):
+    ydl = mock_yt_dlp.return_value.__enter__.return_value
+    site = pages()
+    ydl.extract_info.side_effect = lambda url, download, process: site[url]
+
+    entries = list(expand_sources([CHANNEL], known_ids={'bbbbbbbbbbb'}))
+    assert [e['id'] for e in entries] == ['aaaaaaaaaaa', 'ccccccccccc']
+    assert entries[0]['url'] == "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+    # Flat extraction only, never a full per-video extraction
+    assert all(call.kwargs['process'] is False for call in ydl.extract_info.call_args_list)
+
+@patch('yt_dlp.YoutubeDL')
+def test_single_videos_need_no_extraction(mock_yt_dlp):
+    ydl = mock_yt_dlp.return_value.__enter__.return_value
+    entries = list(expand_sources(["https://youtu.be/aaaaaaaaaaa", "aaaaaaaaaaa", "bbbbbbbbbbb"]))
+    assert [e['id'] for e in entries] == ['aaaaaaaaaaa', 'bbbbbbbbbbb']
+    ydl.extract_info.assert_not_called()
+
+@patch('yt_dlp.YoutubeDL')
+def test_expansion_is_lazy_and_cancellable(mock_yt_dlp):
+    ydl = mock_yt_dlp.return_value.__enter__.return_value
+    site = pages()
+    ydl.extract_info.side_effect = lambda url, download, process: site[url]
+    stop = []
+    entries = expand_sources([CHANNEL], cancelled=lambda: bool(stop))
+    assert next(entries)['id'] == 'aaaaaaaaaaa'
+    stop.append(True)
+    assert list(entries) == []
+
+def test_read_url_file(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("# my list\n\naaaaaaaaaaa\n  https://youtu.be/bbbbbbbbbbb  \n", encoding='utf-8')
+    assert list(read_url_file(str(path))) == [
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://youtu.be/bbbbbbbbbbb",
+    ]
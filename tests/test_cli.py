@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from yt import cli
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def test_cli_does_not_import_pyside6():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    code = "import sys, yt.cli; print(any(m.startswith('PySide6') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": src})
+    assert result.stdout.strip() == "False"
+
+def test_download_list_delete(workdir, monkeypatch, capsys):
+    calls = []
+
+    def fake_run_download(url, opts, info=None, progress_hooks=(), bandwidth=None, content=None):
+        calls.append((url, opts['format']))
+        assert opts['concurrent_fragment_downloads'] == 8 # default 'fast' profile
+        for hook in progress_hooks:
+            hook({'status': 'finished', 'filename': f"videos/{url[-11:]}.mp4", 'total_bytes': 4096})
+        return f"videos/{url[-11:]}.mp4", {'title': f"Title {url[-11:]}", 'uploader': 'Creator', 'description': 'Desc'}
+
+    monkeypatch.setattr(cli, "run_download", fake_run_download)
+    monkeypatch.setattr(cli.ThumbnailStore, "fetch", lambda self, video_id, url=None: b"\xff\xd8jpeg")
+    assert cli.main(["--json", "download", "-j", "2", "-q", "720", "aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"]) == 0
+    results = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert sorted(r['id'] for r in results) == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+    assert all(r['ok'] and r['bytes'] == 4096 and r['throughput'] > 0 for r in results)
+    assert {fmt for _, fmt in calls} == {"bestvideo[height<=720]+bestaudio/best[height<=720]"}
+    assert os.path.exists("videos/aaaaaaaaaaa.jpg")
+
+    # Already-downloaded videos are skipped
+    calls.clear()
+    assert cli.main(["download", "aaaaaaaaaaa"]) == 0
+    assert calls == []
+
+    assert cli.main(["--json", "list"]) == 0
+    entries = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert {e['title'] for e in entries} == {"Title aaaaaaaaaaa", "Title bbbbbbbbbbb"}
+
+    assert cli.main(["--json", "search", "title", "bbb"]) == 0
+    hits = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert [h['title'] for h in hits] == ["Title bbbbbbbbbbb"]
+
+    assert cli.main(["delete", entries[0]['id'], "missing"]) == 1
+    assert cli.main(["--json", "list"]) == 0
+    capsys.readouterr()
+
+def test_failures_set_exit_code(workdir, monkeypatch, capsys):
+    def failing(url, opts, info=None, progress_hooks=(), bandwidth=None, content=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(cli, "run_download", failing)
+    assert cli.main(["--json", "download", "--no-thumbnail", "aaaaaaaaaaa"]) == 1
+    assert json.loads(capsys.readouterr().out) == {'ok': False, 'id': 'aaaaaaaaaaa',
+                                                   'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa', 'error': 'boom'}
@@ -0,0 +1,54 @@
+import os
+import pytest
+from unittest.mock import patch
+from yt.content_store import ContentStore
+from yt.downloader import run_download
+
+@pytest.fixture
+def store(tmp_path):
+    store = ContentStore(str(tmp_path / "db"))
+    yield store
+    store.close()
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+def test_identical_files_are_hardlinked(store, tmp_path):
+    first = write(tmp_path / "videos" / "Clip [1080p].mp4", b"video" * 1000)
+    second = write(tmp_path / "videos" / "Clip (reupload) [1080p].mp4", b"video" * 1000)
+    other = write(tmp_path / "videos" / "Other [1080p].mp4", b"other" * 1000)
+    assert store.add(first, "aaaaaaaaaaa", "137+251") == 0
+    assert store.add(second, "bbbbbbbbbbb", "137+251") == 5000
+    assert store.add(other, "ccccccccccc", "137+251") == 0
+    assert os.path.samefile(first, second) and not os.path.samefile(first, other)
+    assert open(second, 'rb').read() == b"video" * 1000
+
+def test_find_by_id_and_format(store, tmp_path):
+    path = write(tmp_path / "videos" / "Clip [720p].mp4", b"x" * 10)
+    store.add(path, "aaaaaaaaaaa", "best")
+    assert os.path.samefile(store.find("aaaaaaaaaaa", "best"), path)
+    assert store.find("aaaaaaaaaaa", "137+251") is None
+    assert store.find(None, "best") is None
+
+    # Edited or deleted files are not reused
+    with open(path, 'ab') as f:
+        f.write(b"changed")
+    assert store.find("aaaaaaaaaaa", "best") is None
+
+def test_dedup_folder(store, tmp_path):
+    for name in ("a.mp4", "b.mp4", "c.mkv"):
+        write(tmp_path / "videos" / name, b"same" * 100)
+    write(tmp_path / "videos" / "d.mp4", b"different")
+    write(tmp_path / "videos" / "notes.txt", b"same" * 100)
+    assert store.dedup([str(tmp_path / "videos")]) == (4, 800)
+    assert os.stat(tmp_path / "videos" / "a.mp4").st_nlink == 3
+
+def test_download_is_skipped_when_the_file_exists(store, tmp_path):
+    path = write(tmp_path / "videos" / "Clip [1080p].mp4", b"x")
+    store.add(path, "dQw4w9WgXcQ", "bestvideo+bestaudio")
+    with patch("yt_dlp.YoutubeDL") as ydl:
+        filepath, info = run_download("https://youtu.be/dQw4w9WgXcQ", {'format': 'bestvideo+bestaudio'}, content=store)
+    ydl.assert_not_called()
+    assert os.path.samefile(filepath, path) and info == {'id': 'dQw4w9WgXcQ'}
@@ -1,5 +1,7 @@
 import os
 import json
+import gc
+import weakref
 import pytest
 from yt.diary import DiaryManager
 
@@ -12,8 +14,7 @@ def temp_db(tmp_path):
 def test_diary_initialization(temp_db):
     manager = DiaryManager(storage_dir=str(temp_db))
     assert os.path.exists(manager.file_path)
-    with open(manager.file_path, 'r') as f:
-        assert json.load(f) == []
+    assert manager.get_all_entries() == []
 
 def test_save_entry(temp_db):
     manager = DiaryManager(storage_dir=str(temp_db))
@@ -29,13 +30,117 @@ def test_save_entry(temp_db):
     urls = manager.get_history_urls()
     assert "https://youtube.com/watch?v=123" in urls
     
-    with open(manager.file_path, 'r') as f:
-        history = json.load(f)
-        assert len(history) == 1
-        assert history[0]['title'] == "Test Video"
+    history = manager.get_all_entries()
+    assert len(history) == 1
+    assert history[0]['title'] == "Test Video"
+
+def test_url_forms_of_one_video_share_an_entry(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db))
+    manager.save_entry("T", "https://youtu.be/dQw4w9WgXcQ?si=abc", "C", "D", "F", video_path="videos/a.mp4")
+    manager.save_entry("Retitled", "https://www.youtube.com/shorts/dQw4w9WgXcQ", "C", "D", "F",
+                       srt_path="videos/SRT/a.srt")
+    [entry] = manager.get_all_entries()
+    assert entry['url'] == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    assert (entry['video_path'], entry['srt_path']) == ("videos/a.mp4", "videos/SRT/a.srt")
+    assert manager.find_by_url("https://m.youtube.com/watch?v=dQw4w9WgXcQ")['id'] == entry['id']
+
+    manager.delete_entry(entry['id'])
+    assert manager.find_by_url("https://youtu.be/dQw4w9WgXcQ") is None
+
+def test_save_entry_updates_existing_url(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db))
+    manager.save_entry("T", "U", "C", "D", "F", video_path="videos/a.mp4")
+    manager.save_entry("T", "U", "C", "D", "F", srt_path="videos/SRT/a.srt")
+
+    history = manager.get_all_entries()
+    assert len(history) == 1
+    assert history[0]['video_path'] == "videos/a.mp4"
+    assert history[0]['srt_path'] == "videos/SRT/a.srt"
+
+def test_entry_ids_are_unique(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db))
+    for i in range(5):
+        manager.save_entry("T", f"U{i}", "C", "D", "F")
+    ids = [e['id'] for e in manager.get_all_entries()]
+    assert len(set(ids)) == 5
+
+def test_delete_entry(temp_db, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"data")
+    manager = DiaryManager(storage_dir=str(temp_db))
+    manager.save_entry("T", "U", "C", "D", "F", video_path=str(video))
+    entry_id = manager.get_all_entries()[0]['id']
+
+    assert manager.delete_entry(entry_id)
+    assert not video.exists()
+    assert manager.get_all_entries() == []
+    assert not manager.delete_entry(entry_id)
+
+def test_legacy_json_import(temp_db):
+    legacy = [
+        {"id": "100", "title": "A", "url": "UA", "video_path": None, "srt_path": None},
+        {"id": "100", "title": "B", "url": "UB", "video_path": None, "srt_path": None},
+    ]
+    with open(temp_db / "download_history.json", 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+
+    manager = DiaryManager(storage_dir=str(temp_db))
+    entries = manager.get_all_entries()
+    assert [e['title'] for e in entries] == ["A", "B"]
+    assert len({e['id'] for e in entries}) == 2
+    manager.close()
+
+    # Import is one-shot: reopening must not duplicate entries
+    manager = DiaryManager(storage_dir=str(temp_db))
+    assert len(manager.get_all_entries()) == 2
+
+def test_writes_are_buffered_until_flush(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db), flush_delay=60)
+    manager.save_entry("T", "U", "C", "D", "F")
+    assert manager.find_by_url("U")['title'] == "T"
+    assert manager.store.all_entries() == []
+
+    manager.flush()
+    assert [e['url'] for e in manager.store.all_entries()] == ["U"]
+
+def test_debounced_flush(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db), flush_delay=0.05)
+    manager.save_entry("T", "U", "C", "D", "F")
+    manager.flush_timer.join()
+    assert len(manager.store.all_entries()) == 1
+
+def test_external_change_invalidates_cache(temp_db):
+    first = DiaryManager(storage_dir=str(temp_db), flush_delay=0)
+    second = DiaryManager(storage_dir=str(temp_db), flush_delay=0)
+    assert second.get_all_entries() == []
+
+    first.save_entry("T", "U", "C", "D", "F")
+    assert second.get_history_urls() == ["U"]
+
+def test_close_flushes(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db), flush_delay=60)
+    manager.save_entry("T", "U", "C", "D", "F")
+    manager.close()
+    assert DiaryManager(storage_dir=str(temp_db)).get_history_urls() == ["U"]
+
+def test_closed_diaries_are_not_kept_alive(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db))
+    manager.close()
+    ref = weakref.ref(manager)
+    del manager
+    gc.collect()
+    assert ref() is None # Nothing left for atexit to flush
 
 def test_clear_history(temp_db):
     manager = DiaryManager(storage_dir=str(temp_db))
     manager.save_entry("T", "U", "C", "D", "F")
     manager.clear_history()
     assert manager.get_history_urls() == []
+
+def test_history_video_ids(temp_db):
+    manager = DiaryManager(storage_dir=str(temp_db))
+    manager.save_entry("A", "https://youtu.be/aaaaaaaaaaa", "C", "D", "F", video_path="a.mp4")
+    manager.save_entry("B", "https://youtu.be/bbbbbbbbbbb", "C", "D", "F", srt_path="b.srt")
+    manager.save_entry("X", "https://example.com/video", "C", "D", "F")
+    assert manager.get_history_video_ids() == {"aaaaaaaaaaa", "bbbbbbbbbbb"}
+    assert manager.get_history_video_ids('video_path') == {"aaaaaaaaaaa"}
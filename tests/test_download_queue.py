@@ -0,0 +1,125 @@
+import pytest
+from PySide6.QtCore import QObject, Signal
+import yt.download_queue as dq
+from yt.download_queue import DownloadQueue, QUEUED, RUNNING, PAUSED, DONE, FAILED, CANCELLED
+
+class FakeThread(QObject):
+    progress_signal = Signal(str)
+    stats_signal = Signal(dict)
+    file_signal = Signal(str)
+    finished_signal = Signal(dict)
+    finished = Signal()
+
+    def __init__(self, url, opts, context, info=None, bandwidth=None, content=None):
+        super().__init__()
+        self.url = url
+        self.context = context
+        self.cancelled = False
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+    def complete(self, result):
+        self.finished_signal.emit(result)
+        self.finished.emit()
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(dq, "DownloadThread", FakeThread)
+    return DownloadQueue(max_workers=2, per_host_limit=2)
+
+def statuses(queue):
+    return [j.status for j in queue.jobs.values()]
+
+def test_respects_max_workers(queue):
+    jobs = [queue.enqueue(f"https://youtube.com/watch?v={i}", {}, {}) for i in range(3)]
+    assert statuses(queue) == [RUNNING, RUNNING, QUEUED]
+
+    jobs[0].thread.complete({'filepath': 'videos/a.mp4'})
+    assert statuses(queue) == [DONE, RUNNING, RUNNING]
+
+def test_per_host_limit(queue):
+    queue.set_limits(per_host_limit=1)
+    queue.enqueue("https://youtube.com/watch?v=1", {}, {})
+    queue.enqueue("https://youtube.com/watch?v=2", {}, {})
+    queue.enqueue("https://vimeo.com/3", {}, {})
+    assert statuses(queue) == [RUNNING, QUEUED, RUNNING]
+
+def test_priority_order(queue):
+    queue.set_limits(max_workers=1)
+    first = queue.enqueue("https://youtube.com/watch?v=1", {}, {})
+    low = queue.enqueue("https://youtube.com/watch?v=2", {}, {})
+    high = queue.enqueue("https://youtube.com/watch?v=3", {}, {}, priority=5)
+
+    first.thread.complete({'filepath': 'x'})
+    assert high.status == RUNNING and low.status == QUEUED
+
+def test_pause_resume_cancel(queue):
+    finished = []
+    queue.job_finished.connect(finished.append)
+    job = queue.enqueue("https://youtube.com/watch?v=1", {}, {})
+
+    thread = job.thread
+    queue.pause(job.id)
+    assert thread.cancelled
+    thread.complete({})
+    assert job.status == PAUSED
+
+    queue.resume(job.id)
+    assert job.status == RUNNING
+    queue.cancel(job.id)
+    job.thread.complete({})
+    assert job.status == CANCELLED
+    # Paused/cancelled jobs never reach the diary
+    assert finished == []
+
+def test_failure_is_reported_and_retryable(queue):
+    finished = []
+    queue.job_finished.connect(finished.append)
+    job = queue.enqueue("https://youtube.com/watch?v=1", {}, {})
+    job.thread.complete({})
+    assert job.status == FAILED and finished == [{}]
+
+    queue.resume(job.id)
+    assert job.status == RUNNING
+    queue.remove_finished()
+    assert job.id in queue.jobs
+
+def test_progress_stats_are_kept_as_numbers(queue):
+    from yt.ui.queue_tab import format_progress
+    job = queue.enqueue("https://youtube.com/watch?v=1", {}, {})
+    stats = {'downloaded': 5 * 1024 * 1024, 'total': 20 * 1024 * 1024, 'speed': 1.5 * 1024 * 1024, 'eta': 75}
+    job.thread.stats_signal.emit(stats)
+    assert job.progress == stats and job.message == ""
+    assert format_progress(job.progress) == "Downloading: 25.0% of 20.0 MB | Speed: 1.5 MB/s | ETA: 01:15"
+    assert format_progress({'downloaded': 2048, 'total': None, 'speed': None, 'eta': None}) == \
+        "Downloading: 2.0 KB of N/A | Speed: N/A | ETA: N/A"
+
+def test_jobs_persist_until_done(monkeypatch, tmp_path):
+    from yt.job_store import JobStore
+    monkeypatch.setattr(dq, "DownloadThread", FakeThread)
+    store = JobStore(str(tmp_path))
+    queue = DownloadQueue(max_workers=1, store=store)
+    opts = {'format': '137+251', 'outtmpl': 'videos/%(title)s.%(ext)s'}
+    done = queue.enqueue("https://youtube.com/watch?v=1", opts, {'title': 'One'})
+    running = queue.enqueue("https://youtube.com/watch?v=2", opts, {'title': 'Two'})
+    done.thread.complete({'filepath': 'videos/One.mp4'})
+    running.thread.file_signal.emit("videos/Two.f137.mp4")
+
+    # The app dies here; a new queue offers the unfinished job as paused
+    [record] = store.unfinished()
+    assert record['url'].endswith("v=2") and record['status'] == RUNNING
+    assert record['opts'] == opts and record['filename'] == "videos/Two.f137.mp4"
+    restored_queue = DownloadQueue(store=store)
+    restored = restored_queue.restore(record)
+    assert restored.status == PAUSED and restored.context == {'title': 'Two'}
+    assert store.unfinished()[0]['status'] == PAUSED
+    # Done without leaving files: gone. Cancelled after writing some: kept for the next start's cleanup
+    assert store.finished() == []
+    restored_queue.cancel(restored.id)
+    assert store.unfinished() == []
+    assert store.finished() == [{'id': record['id'], 'filename': "videos/Two.f137.mp4"}]
+    store.close()
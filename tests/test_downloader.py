@@ -0,0 +1,34 @@
+import time
+from unittest.mock import MagicMock
+from yt.downloader import ProgressThrottle, extract, progress_stats
+
+def test_download_reuses_fresh_info():
+    url = "https://youtu.be/dQw4w9WgXcQ"
+    info = {'id': 'dQw4w9WgXcQ', 'title': 'Mock Video', '_fetched_at': time.time()}
+    ydl = MagicMock()
+    ydl.sanitize_info.side_effect = lambda i, remove_private_keys=False: i
+
+    extract(ydl, url, info)
+    ydl.process_ie_result.assert_called_once()
+    ydl.extract_info.assert_not_called()
+
+    # Stale info, or info for another video, goes through a full extraction
+    for stale in ({**info, '_fetched_at': 0}, {**info, 'id': 'other_video'}):
+        ydl.reset_mock()
+        extract(ydl, url, stale)
+        ydl.extract_info.assert_called_once()
+
+def test_progress_hook_is_throttled():
+    now = [0.0]
+    throttle = ProgressThrottle(interval=0.1, clock=lambda: now[0])
+    sent = []
+    for i in range(100): # 100 chunks in 0.5 s
+        now[0] = i * 0.005
+        if throttle.ready():
+            sent.append(now[0])
+    assert len(sent) == 5
+    assert throttle.ready(final=True) # the last update is never dropped
+
+    d = {'status': 'downloading', 'downloaded_bytes': 10, 'total_bytes_estimate': 100, 'speed': 2.5, 'eta': 36,
+         '_percent_str': '\x1b[0;94m 10.0%\x1b[0m'}
+    assert progress_stats(d) == {'downloaded': 10, 'total': 100, 'speed': 2.5, 'eta': 36}
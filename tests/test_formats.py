@@ -0,0 +1,125 @@
+import pytest
+from yt.formats import format_choices, clean_note, audio_language, video_format_selector, choose_subtitle
+
+# The selection logic as it used to run inline in YouTubeApp.load_video_data,
+# kept here as the reference the extracted module must agree with.
+LANG_MAP = {
+    'en': 'English', 'ko': 'Korean', 'es': 'Spanish', 'ja': 'Japanese',
+    'zh': 'Chinese', 'fr': 'French', 'de': 'German', 'hi': 'Hindi',
+    'ru': 'Russian', 'pt': 'Portuguese', 'it': 'Italian', 'ar': 'Arabic'
+}
+
+def legacy_choices(info):
+    formats = info.get('formats', [])
+    video_options = [(f['height'], f) for f in formats
+                     if f.get('vcodec') != 'none' and f.get('height') and f['height'] <= 1080]
+    video_options.sort(key=lambda x: x[0], reverse=True)
+    video = [(f"Best Available ({video_options[0][0]}p)" if video_options else "Best Available (Max 1080p)", "best_1080")]
+    seen_res = set()
+    for h, f in video_options:
+        if f"{h}p" not in seen_res:
+            video.append((f"{h}p - {f.get('ext')}", f['format_id']))
+            seen_res.add(f"{h}p")
+
+    def clean_note(note):
+        if not note: return ""
+        n = note.lower()
+        for term in ["low", "medium", "ultra-low", "high"]:
+            n = n.replace(term, "")
+        n = n.strip(", ").strip()
+        return n.title() if n else ""
+
+    def lang_of(code):
+        lang = LANG_MAP.get(code.split('-')[0]) if code else None
+        return lang or ('Original Audio' if not code or code == 'und' else code)
+
+    audio_tracks = {}
+    for f in formats:
+        if f.get('acodec') != 'none' and f.get('vcodec') == 'none':
+            key = (lang_of(f.get('language')), clean_note(f.get('format_note')))
+            abr = f.get('abr') or 0
+            if key not in audio_tracks or abr > (audio_tracks[key].get('abr') or 0):
+                audio_tracks[key] = f
+    sorted_audio = sorted(audio_tracks.values(), key=lambda x: (x.get('language') or 'und', x.get('abr') or 0), reverse=True)
+    audio = [("Default / Best Audio", "bestaudio")]
+    if sorted_audio:
+        f = sorted_audio[0]
+        audio = [(f"Default / Best Audio ({lang_of(f.get('language'))} - {int(f.get('abr') or 0)} kbps)", "bestaudio")]
+    for f in sorted_audio:
+        label = lang_of(f.get('language'))
+        note = clean_note(f.get('format_note'))
+        abr = int(f.get('abr') or 0)
+        if note: label += f" ({note})"
+        if abr: label += f" - {abr} kbps"
+        audio.append((label, f['format_id']))
+
+    def en_score(code, label):
+        c, l = code.lower(), label.lower()
+        if c == 'en' or l == 'english': return -2
+        if 'en' in c or 'english' in l: return -1
+        return 0
+
+    def get_sub_label(code, formats):
+        if formats and formats[0].get('name'):
+            name = formats[0].get('name')
+            if " - " in name:
+                parts = name.split(" - ")
+                if parts[0].strip() == parts[1].strip():
+                    return parts[0].strip()
+            return name
+        return code
+
+    subs = []
+    manual_subs = info.get('subtitles') or {}
+    for code, fmts in manual_subs.items():
+        if code == 'live_chat': continue
+        subs.append((get_sub_label(code, fmts), {"code": code, "is_auto": False}))
+    for code, fmts in (info.get('automatic_captions') or {}).items():
+        if code == 'live_chat': continue
+        if not any(code in m or m in code for m in manual_subs.keys()):
+            subs.append((f"{get_sub_label(code, fmts)} (auto-generated)", {"code": code, "is_auto": True}))
+    subs.sort(key=lambda x: (en_score(x[1]["code"], x[0]), x[0]))
+    return {'video': video, 'audio': audio, 'subtitles': subs}
+
+@pytest.mark.parametrize("fixture", ["regular_info", "live_info", "many_captions_info"])
+def test_matches_legacy_selection(fixture, request):
+    info = request.getfixturevalue(fixture)
+    assert format_choices(info) == legacy_choices(info)
+
+def test_video_choices(regular_info):
+    video = format_choices(regular_info)['video']
+    assert video[0] == ("Best Available (1080p)", "best_1080")
+    assert [label.split(' ')[0] for label, _ in video[1:]] == ["1080p", "720p", "480p", "360p", "240p", "144p"]
+
+def test_auto_captions_hidden_when_manual_exists(many_captions_info):
+    subs = format_choices(many_captions_info)['subtitles']
+    auto_codes = {d['code'] for _, d in subs if d['is_auto']}
+    assert 'en' not in auto_codes and 'de' not in auto_codes and 'zh-Hans' not in auto_codes
+    assert 'zh-Hant' in auto_codes
+    assert subs[0][1] == {"code": "en", "is_auto": False}
+
+def test_empty_info():
+    assert format_choices({}) == {
+        'video': [("Best Available (Max 1080p)", "best_1080")],
+        'audio': [("Default / Best Audio", "bestaudio")],
+        'subtitles': [],
+    }
+
+def test_helpers():
+    assert clean_note("original (default), high") == "Original (Default)"
+    assert clean_note("low") == ""
+    assert audio_language("en-US") == "English"
+    assert audio_language("und") == "Original Audio"
+    assert audio_language("sv") == "sv"
+
+def test_format_selection():
+    assert video_format_selector() == "bestvideo[height<=1080]+bestaudio/best[height<=1080]"
+    assert video_format_selector("137", "251-1") == "137+251-1"
+    # The height caps the single-file fallback too
+    assert video_format_selector(height=480) == "bestvideo[height<=480]+bestaudio/best[height<=480]"
+    assert video_format_selector("137", "251-1", height=480) == "137+251-1"
+
+    info = {'subtitles': {'en-US': [{}]}, 'automatic_captions': {'en': [{}], 'fr': [{}]}}
+    assert choose_subtitle(info, "en") == ("en-US", False)
+    assert choose_subtitle(info, "fr") == ("fr", True)
+    assert choose_subtitle(info, "de") is None
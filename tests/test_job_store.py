@@ -0,0 +1,60 @@
+import os
+import time
+import pytest
+from yt.job_store import JobStore, download_stem, is_fragment, clean_fragments
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "db"))
+    yield store
+    store.close()
+
+def test_roundtrip(store):
+    opts = {'format': 'bestvideo+bestaudio', 'merge_output_format': 'mp4'}
+    job_id = store.add("https://youtu.be/dQw4w9WgXcQ", opts, {'title': 'Mock Video'}, priority=2)
+    store.update(job_id, status="Paused", filename="videos/Mock Video.f137.mp4")
+    [record] = store.unfinished()
+    assert record == {'id': job_id, 'url': "https://youtu.be/dQw4w9WgXcQ", 'opts': opts,
+                      'context': {'title': 'Mock Video'}, 'priority': 2, 'status': "Paused",
+                      'filename': "videos/Mock Video.f137.mp4"}
+    store.remove(job_id)
+    assert store.unfinished() == []
+
+@pytest.mark.parametrize("name", [
+    "Clip [1080p].mp4.part", "Clip [1080p].f137.mp4", "Clip [1080p].f251-1.webm.part",
+    "Clip [1080p].mp4.part-Frag12", "Clip [1080p].mp4.part-Frag12.part", "Clip [1080p].mp4.ytdl",
+    "Clip [1080p].f137.mp4.part.aria2"])
+def test_fragment_names(name):
+    assert is_fragment(name)
+    assert download_stem(name) == os.path.normcase("Clip [1080p]")
+
+def test_finished_files_are_not_fragments():
+    assert not is_fragment("Clip [1080p].mp4")
+    assert not is_fragment("Clip (Subtitle).en.srt")
+    assert not is_fragment("Clip [1080p].jpg")
+
+def test_finished_jobs_are_kept_until_cleaned(store):
+    wrote = store.add("https://youtu.be/a", {}, {})
+    store.update(wrote, filename="videos/A.f137.mp4")
+    never_started = store.add("https://youtu.be/b", {}, {})
+    store.finish(wrote, "Cancelled")
+    store.finish(never_started, "Cancelled")
+    assert store.unfinished() == []
+    assert store.finished() == [{'id': wrote, 'filename': "videos/A.f137.mp4"}]
+
+def test_cleanup_only_touches_recorded_downloads(tmp_path):
+    names = ["Old [720p].mp4.part", "Old [720p].f136.mp4", "Keep [1080p].f137.mp4", "Keep [1080p].f251.webm.part",
+             "Done [720p].mp4", "Mine [720p].f137.mp4", "Other [720p].mp4.part", "New [720p].mp4.part"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"x")
+    cutoff = time.time() - 60
+    for name in names[:-1]:
+        os.utime(tmp_path / name, (cutoff - 60, cutoff - 60))
+
+    # Jobs this app recorded as ended: Old, Done and New (restarted since); Keep can still be resumed
+    ended = [str(tmp_path / n) for n in ("Old [720p].f136.mp4", "Done [720p].mp4", "New [720p].mp4", "Keep [1080p].mp4")]
+    removed = clean_fragments(ended + [str(tmp_path / "missing" / "Gone.mp4"), None],
+                              keep_paths=[str(tmp_path / "Keep [1080p].f137.mp4")], older_than=cutoff)
+    assert sorted(os.path.basename(p) for p in removed) == ["Old [720p].f136.mp4", "Old [720p].mp4.part"]
+    # Pieces of downloads the app knows nothing about are never swept
+    assert sorted(os.listdir(tmp_path)) == sorted(names[2:])
@@ -0,0 +1,162 @@
+import os
+import pytest
+from yt.diary import DiaryManager
+from yt.library_index import LibraryIndex, library_row, library_stats
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("videos/SRT")
+    for name, size in [("A [1080p].mkv", 3000), ("B [720p].mp4", 1000), ("C [720p].webm", 500)]:
+        with open(os.path.join("videos", name), "wb") as f:
+            f.write(b"x" * size)
+    with open(os.path.join("videos", "SRT", "A (Subtitle).en.srt"), "w") as f:
+        f.write("1\n00:00:00,000 --> 00:00:01,000\nhi\n")
+    index = LibraryIndex()
+    assert index.scan()
+    diary = DiaryManager("db", flush_delay=0)
+    diary.path_index = index
+    yield diary, index
+    diary.close()
+
+def test_scan_answers_without_touching_disk(library, monkeypatch):
+    diary, index = library
+    def no_disk(path):
+        raise AssertionError(f"probed {path}")
+    monkeypatch.setattr(os.path, "exists", no_disk)
+    monkeypatch.setattr(os.path, "getsize", no_disk)
+
+    # Same fallbacks as before: other extension, then .fNNN stream suffix stripped
+    assert diary.resolve_path("videos/A [1080p].mp4") == os.path.join("videos", "A [1080p].mkv")
+    assert diary.resolve_path("videos/C [720p].f251.webm") == os.path.join("videos", "C [720p].webm")
+    assert diary.resolve_path("videos/Missing.mp4") == "videos/Missing.mp4"
+    assert index.size("videos/B [720p].mp4") == 1000
+    assert index.size("videos/Missing.mp4") is None
+
+def test_matches_disk_resolution(library):
+    diary, index = library
+    paths = ["videos/A [1080p].mp4", "videos/B [720p].mp4", "videos/C [720p].f251.webm",
+             "videos/SRT/A (Subtitle).en.srt", "videos/Nope.mkv"]
+    with_index = [diary.resolve_path(p) for p in paths]
+    diary.path_index = None
+    assert with_index == [diary.resolve_path(p) for p in paths]
+
+def test_uncovered_folders_fall_back_to_disk(library, tmp_path):
+    diary, index = library
+    other = tmp_path / "elsewhere.mp4"
+    other.write_bytes(b"1234")
+    assert not index.covers(str(other))
+    assert index.exists(str(other)) and index.size(str(other)) == 4
+
+def test_save_and_delete_keep_index_current(library):
+    diary, index = library
+    with open("videos/D [480p].mp4", "wb") as f:
+        f.write(b"x" * 42)
+    diary.save_entry("D", "https://youtu.be/d", "C", "", "fmt", video_path="videos/D [480p].mp4")
+    entry = diary.find_by_url("https://youtu.be/d")
+    assert library_row(diary, entry)['size'] == 42
+
+    diary.delete_entry(entry['id'])
+    assert not index.exists("videos/D [480p].mp4")
+
+def test_library_stats(library):
+    diary, index = library
+    diary.save_entry("A", "https://youtu.be/a", "C", "", "fmt", video_path="videos/A [1080p].mp4")
+    diary.save_entry("A", "https://youtu.be/a", "C", "", "fmt", srt_path="videos/SRT/A (Subtitle).en.srt")
+    diary.save_entry("B", "https://youtu.be/b", "C", "", "fmt", video_path="videos/B [720p].mp4")
+    diary.save_entry("Gone", "https://youtu.be/g", "C", "", "fmt", video_path="videos/Gone.mp4")
+    rows = [library_row(diary, e) for e in diary.get_all_entries()]
+    assert library_stats(rows) == {'videos': 2, 'size': 4000, 'srts': 1}
+
+def test_cancelled_scan_keeps_previous_index(library):
+    diary, index = library
+    os.remove("videos/B [720p].mp4")
+    assert index.scan(cancelled=lambda: True) is False
+    assert index.exists("videos/B [720p].mp4")
+
+def test_sync_dir_reports_only_what_changed(library):
+    diary, index = library
+    os.remove("videos/B [720p].mp4")
+    with open("videos/E [360p].mp4", "wb") as f:
+        f.write(b"x" * 7)
+    with open("videos/C [720p].webm", "ab") as f:
+        f.write(b"more")
+
+    events = index.sync_dir("videos")
+    # Without check_sizes the resize is not noticed (no stat of known files)
+    assert sorted(events) == [('added', os.path.join("videos", "E [360p].mp4")),
+                              ('removed', os.path.join("videos", "B [720p].mp4"))]
+    assert not index.exists("videos/B [720p].mp4")
+    assert index.size("videos/E [360p].mp4") == 7
+
+    os.utime("videos/C [720p].webm", ns=(1, 1))
+    assert index.sync_dir("videos", check_sizes=True) == [('changed', os.path.join("videos", "C [720p].webm"))]
+    assert index.size("videos/C [720p].webm") == 504
+    assert index.sync_dir("videos", check_sizes=True) == []
+
+def test_keys_for_covers_stream_suffixes(library):
+    diary, index = library
+    (key, stem), (_, cleaned) = index.keys_for("videos/C [720p].f251.webm")
+    assert (stem, cleaned) == (os.path.normcase("C [720p].f251"), os.path.normcase("C [720p]"))
+    assert index.keys_for("videos/C [720p].mp4") == [(key, os.path.normcase("C [720p]"))]
+
+@pytest.fixture
+def app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+def wait_for(app, condition, timeout=5):
+    import time
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        app.processEvents()
+    return condition()
+
+def test_watcher_catches_changes_without_notifications(library, app):
+    from yt.library_watcher import LibraryWatcher
+    diary, index = library
+    watcher = LibraryWatcher(index)
+    # Like a network mount: the watch is accepted but nothing is ever reported
+    watcher.watcher.directoryChanged.disconnect()
+    watcher.debounce_timer.setInterval(0)
+    events = []
+    watcher.files_changed.connect(events.extend)
+    watcher.start()
+    assert not watcher.unwatched_roots()
+
+    watcher.poll()
+    assert not wait_for(app, lambda: events, timeout=0.3) # Nothing changed, nothing listed
+
+    with open(os.path.join("videos", "D [720p].mp4"), "wb") as f:
+        f.write(b"x")
+    future = os.stat("videos").st_mtime + 5 # Coarse mtimes: make sure the folder's moves
+    os.utime("videos", (future, future))
+    watcher.poll()
+    assert wait_for(app, lambda: events)
+    assert events == [('added', os.path.join("videos", "D [720p].mp4"))]
+    watcher.stop()
+
+def test_explorer_updates_single_entries(library, app, monkeypatch):
+    from yt.ui.explorer_tab import ExplorerTab
+    diary, index = library
+    for name in ("A [1080p]", "B [720p]"):
+        diary.save_entry(name, f"https://youtu.be/{name[0] * 11}", "C", "", "F", video_path=f"videos/{name}.mp4")
+    tab = ExplorerTab(diary, index)
+    tab.show()
+    assert wait_for(app, lambda: tab.model.rowCount() == 2 and not tab.scan_thread)
+
+    # A download of a new video, an edit and a deletion touch only their rows
+    import yt.ui.explorer_tab as explorer
+    built = []
+    monkeypatch.setattr(explorer, "library_row", lambda d, e: built.append(e['id']) or library_row(d, e))
+    new = diary.save_entry("C [720p]", "https://youtu.be/CCCCCCCCCCC", "C", "", "F", video_path="videos/C [720p].webm")
+    [a, b] = [r['id'] for r in tab.all_rows]
+    diary.update_entries({a: {'title': "A, renamed"}})
+    diary.delete_entry(b)
+    tab.update_entries([new['id'], a, b])
+    assert sorted(built) == sorted([new['id'], a])
+    assert [r['title'] for r in tab.model.rows] == ["A, renamed", "C [720p]"]
+    assert tab.model.rows[1]['size'] == 500 and tab.stat_videos.text() == "Videos: 2"
+    tab.stop_scan()
+    tab.close()
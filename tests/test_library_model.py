@@ -0,0 +1,69 @@
+import pytest
+from PySide6.QtCore import Qt
+from yt.ui.library_model import LibraryModel, TITLE, SIZE, SRT
+
+def row(i, title=None, size=None):
+    return {'id': str(i), 'title': title or f"Video {i}", 'url': f"https://youtu.be/{i}",
+            'video_path': None, 'size': size, 'has_srt': False}
+
+@pytest.fixture
+def model():
+    model = LibraryModel()
+    model.events = []
+    model.rowsInserted.connect(lambda parent, first, last: model.events.append(('insert', first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: model.events.append(('remove', first, last)))
+    model.dataChanged.connect(lambda tl, br, roles: model.events.append(('change', tl.row())))
+    model.modelReset.connect(lambda: model.events.append(('reset',)))
+    return model
+
+def ids(model):
+    return [r['id'] for r in model.rows]
+
+def test_initial_load_is_one_insert(model):
+    model.set_rows([row(i) for i in range(1000)])
+    assert model.rowCount() == 1000
+    assert model.events == [('insert', 0, 999)]
+
+def test_unchanged_refresh_emits_nothing(model):
+    model.set_rows([row(i) for i in range(5)])
+    model.events.clear()
+    model.set_rows([row(i) for i in range(5)])
+    assert model.events == []
+
+def test_incremental_diff(model):
+    model.set_rows([row(i) for i in range(6)])
+    model.events.clear()
+
+    # Delete 1-2 and 5, edit 3, append 6-7
+    model.set_rows([row(0), row(3, size=10 * 1024 * 1024), row(4), row(6), row(7)])
+    assert ids(model) == ['0', '3', '4', '6', '7']
+    assert model.events == [('remove', 5, 5), ('remove', 1, 2), ('change', 1), ('insert', 3, 4)]
+    assert model.data(model.index(1, SIZE)) == "10.0 MB"
+
+def test_insert_in_the_middle(model):
+    model.set_rows([row(0), row(2)])
+    model.events.clear()
+    model.set_rows([row(0), row(1), row(2)])
+    assert ids(model) == ['0', '1', '2']
+    assert model.events == [('insert', 1, 1)]
+
+def test_reorder_falls_back_to_reset(model):
+    model.set_rows([row(0), row(1)])
+    model.events.clear()
+    model.set_rows([row(1), row(0)])
+    assert ids(model) == ['1', '0']
+    assert model.events == [('reset',)]
+
+def test_display_data(model):
+    model.set_rows([row(0, title="Hello", size=None)])
+    assert model.data(model.index(0, TITLE)) == "Hello"
+    assert model.data(model.index(0, SIZE)) == "N/A"
+    assert model.data(model.index(0, SRT)) == "❌"
+    assert model.data(model.index(0, TITLE), Qt.UserRole)['id'] == '0'
+
+def test_update_rows_touches_only_changed_rows(model):
+    model.set_rows([row(i) for i in range(4)])
+    model.events.clear()
+    model.update_rows([row(2, size=1024 * 1024), row(3), row(99)])
+    assert model.events == [('change', 2)]
+    assert model.data(model.index(2, SIZE)) == "1.0 MB"
@@ -0,0 +1,63 @@
+import time
+import pytest
+from yt.metadata_cache import MetadataCache
+from yt.urls import extract_video_id
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MetadataCache(storage_dir=str(tmp_path / "db"))
+    yield cache
+    cache.close()
+
+def test_roundtrip(cache):
+    info = {'id': 'abcdefghijk', 'title': 'Mock Video', 'formats': [{'format_id': '137', 'height': 1080}]}
+    cache.put('abcdefghijk', info)
+
+    cached = cache.get('abcdefghijk')
+    assert cached['title'] == 'Mock Video'
+    assert cached['formats'] == info['formats']
+    assert cached['_fetched_at'] <= time.time()
+
+def test_missing_and_invalidated(cache):
+    assert cache.get('abcdefghijk') is None
+    assert cache.get(None) is None
+    cache.put('abcdefghijk', {'id': 'abcdefghijk'})
+    cache.invalidate('abcdefghijk')
+    assert cache.get('abcdefghijk') is None
+
+def test_ttl_expiry(cache):
+    cache.ttl = 0
+    cache.put('abcdefghijk', {'id': 'abcdefghijk'})
+    time.sleep(0.01)
+    assert cache.get('abcdefghijk') is None
+
+def test_lru_eviction(cache):
+    payload = 'x' * 1000
+    cache.put('aaaaaaaaaaa', {'d': payload})
+    cache.put('bbbbbbbbbbb', {'d': payload})
+    cache.max_bytes = cache.total_size()
+
+    # Touch 'a' so 'b' becomes the least recently used
+    time.sleep(0.01)
+    cache.get('aaaaaaaaaaa')
+    cache.put('ccccccccccc', {'d': payload})
+
+    assert cache.get('bbbbbbbbbbb') is None
+    assert cache.get('aaaaaaaaaaa') is not None
+    assert cache.get('ccccccccccc') is not None
+
+# Cache keys are video IDs, whatever form the URL came in
+@pytest.mark.parametrize("url", [
+    "dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "youtube.com/embed/dQw4w9WgXcQ",
+])
+def test_extract_video_id(url):
+    assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+def test_extract_video_id_rejects_other_urls():
+    assert extract_video_id("https://example.com/watch?v=dQw4w9WgXcQ") is None
+    assert extract_video_id("https://www.youtube.com/@channel") is None
@@ -0,0 +1,101 @@
+import os
+import shutil
+import pytest
+from yt.postprocess import (STAGES, PostprocessCache, run_pipeline, media_info, describe_media, diary_fields,
+                            plan, options_key, process_pool)
+
+PROBE = {
+    'format': {'duration': "754.2", 'bit_rate': "2456000", 'format_name': "mov,mp4,m4a,3gp,3g2,mj2"},
+    'streams': [
+        {'codec_type': 'video', 'codec_name': 'png', 'disposition': {'attached_pic': 1}},
+        {'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080, 'avg_frame_rate': "30000/1001"},
+        {'codec_type': 'audio', 'codec_name': 'aac', 'bit_rate': "128000", 'sample_rate': "44100"},
+    ],
+    'chapters': [{'start_time': "0.0", 'end_time': "60.0", 'tags': {'title': "Intro"}}],
+}
+
+def test_media_info():
+    media = media_info(PROBE)
+    assert media == {'duration': 754.2, 'bitrate': 2456000, 'container': "mov,mp4,m4a,3gp,3g2,mj2",
+                     'vcodec': 'h264', 'width': 1920, 'height': 1080, 'fps': 29.97, 'acodec': 'aac',
+                     'audio_bitrate': 128000, 'sample_rate': 44100, 'chapters': 1}
+    assert describe_media(media) == "12:34 · 1920x1080 h264 29.97fps · aac · 2.5 Mb/s"
+    assert media_info({})['vcodec'] is None
+
+def test_plan_probes_the_final_file():
+    assert plan() == ['probe']
+    assert plan('mkv', True, True) == ['remux', 'loudnorm', 'chapters', 'probe']
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+@pytest.fixture
+def fake_stages(monkeypatch):
+    calls = []
+
+    def convert(path, options):
+        calls.append(('convert', path))
+        out = os.path.splitext(path)[0] + options.get('ext', '.mkv')
+        with open(path, 'rb') as src, open(out, 'wb') as dst:
+            dst.write(src.read().upper())
+        os.remove(path)
+        return {'path': out}
+
+    def measure(path, options):
+        calls.append(('measure', path))
+        return {'media': {'size': os.path.getsize(path)}}
+
+    def broken(path, options):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(STAGES, 'convert', (convert, (), ('ext',)))
+    monkeypatch.setitem(STAGES, 'probe', (measure, (), ()))
+    monkeypatch.setitem(STAGES, 'broken', (broken, (), ()))
+    return calls
+
+def test_stages_run_once_per_content(video, tmp_path, fake_stages):
+    db = str(tmp_path / "db")
+    outcome = run_pipeline(video, ['convert', 'probe'], {}, db)
+    mkv = str(tmp_path / "clip.mkv")
+    assert outcome['path'] == mkv and not outcome['errors'] and outcome['cached'] == []
+    assert outcome['results']['probe'] == {'media': {'size': 18}}
+    assert diary_fields(outcome) == {'video_path': mkv, 'media': {'size': 18}}
+
+    # Running again on the converted file recomputes nothing
+    again = run_pipeline(mkv, ['convert', 'probe'], {}, db)
+    assert again['path'] == mkv and again['cached'] == ['convert', 'probe']
+    assert len(fake_stages) == 2
+
+    # Other options are another result
+    run_pipeline(mkv, ['convert'], {'ext': '.mka'}, db)
+    assert fake_stages[-1] == ('convert', mkv)
+
+def test_changed_file_is_recomputed(video, tmp_path, fake_stages):
+    db = str(tmp_path / "db")
+    run_pipeline(video, ['probe'], {}, db)
+    with open(video, 'ab') as f:
+        f.write(b" more")
+    assert run_pipeline(video, ['probe'], {}, db)['results']['probe'] == {'media': {'size': 23}}
+    assert len(fake_stages) == 2
+
+def test_failures_are_reported_and_not_cached(video, tmp_path, fake_stages, monkeypatch):
+    db = str(tmp_path / "db")
+    outcome = run_pipeline(video, ['broken', 'nope', 'probe'], {}, db)
+    assert outcome['errors'] == {'broken': "boom", 'nope': "unknown stage"}
+    assert 'probe' in outcome['results']
+
+    monkeypatch.setattr(shutil, 'which', lambda tool: None)
+    outcome = run_pipeline(video, ['chapters', 'remux'], {'remux': 'mkv'}, db)
+    assert outcome['errors'] == {'chapters': "ffmpeg not found", 'remux': "ffmpeg not found"}
+    cache = PostprocessCache(db)
+    assert cache.get("anything", 'broken', options_key('broken', {})) is None
+    cache.close()
+
+def test_runs_in_a_worker_process(video, tmp_path):
+    with process_pool(1) as pool:
+        outcome = pool.submit(run_pipeline, video, ['probe'], {}, str(tmp_path / "db")).result()
+    # Either way the worker answered: no ffprobe here, or it rejected the fake file
+    assert set(outcome['errors']) | set(outcome['results']) == {'probe'}
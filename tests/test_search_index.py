@@ -0,0 +1,66 @@
+import os
+import pytest
+from yt.search_index import SearchIndex, parse_srt, fts_query, format_timestamp
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "db"))
+    yield index
+    index.close()
+
+SRT = """﻿1
+00:00:01,000 --> 00:00:03,500
+Welcome back to the <i>channel</i>
+
+2
+00:01:05,250 --> 00:01:08,000
+today we calibrate the
+espresso grinder
+
+3
+01:02:03,000 --> 01:02:04,000
+bye
+"""
+
+def write_srt(tmp_path, name, text=SRT):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def entry(entry_id, title, description="", srt_path=None):
+    return {'id': entry_id, 'title': title, 'creator': "Someone", 'description': description, 'srt_path': srt_path}
+
+def test_parse_srt():
+    assert parse_srt(SRT) == [(1.0, "Welcome back to the channel"),
+                              (65.25, "today we calibrate the espresso grinder"),
+                              (3723.0, "bye")]
+    assert format_timestamp(65.25) == "01:05" and format_timestamp(3723) == "1:02:03"
+    assert fts_query('café "grinder') == '"café" "grinder"*'
+    assert fts_query("a") == '"a"' and fts_query("?!") is None
+
+def test_title_ranks_above_transcript(index, tmp_path):
+    index.update_entry(entry("1", "Cooking pasta", srt_path=write_srt(tmp_path, "a.srt")))
+    index.update_entry(entry("2", "Espresso grinder review", "A long look at one grinder"))
+    hits = index.search_entries("grinder")
+    assert [entry_id for entry_id, _ in hits] == ["2", "1"]
+    cue = hits[1][1]
+    assert cue['kind'] == 'cue' and cue['start'] == 65.25 and "[grinder]" in cue['snippet']
+
+def test_prefix_and_accents(index):
+    index.update_entry(entry("1", "Crème brûlée at home"))
+    assert [i for i, _ in index.search_entries("creme bru")] == ["1"]
+    assert index.search_entries("creme bx") == []
+
+def test_unchanged_entries_are_skipped(index, tmp_path):
+    srt = write_srt(tmp_path, "a.srt")
+    assert index.update_entry(entry("1", "Video", srt_path=srt), description="Full text " * 50 + "hidden tail")
+    assert not index.update_entry(entry("1", "Video", "Full text...", srt_path=srt))
+    # A renamed entry keeps the full description indexed at download time
+    assert index.update_entry(entry("1", "Renamed video", "Full text...", srt_path=srt))
+    assert [i for i, _ in index.search_entries("hidden tail")] == ["1"]
+
+    os.utime(srt, ns=(0, 0))
+    assert index.update_entry(entry("1", "Renamed video", srt_path=srt))
+
+    index.prune(["2"])
+    assert index.search_entries("espresso") == []
@@ -0,0 +1,120 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import pytest
+from yt.diary import DiaryManager
+from yt.startup import StartupProfiler, STARTUP_LIBRARY_RATIO, profiling_requested
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+HEAVY = ('yt_dlp', 'requests', 'qtawesome', 'youtube_transcript_api')
+
+def run_python(code, cwd, **env):
+    env = {**os.environ, 'PYTHONPATH': SRC, 'QT_QPA_PLATFORM': 'offscreen', **env}
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+
+def seed_diary(path, n):
+    diary = DiaryManager(str(path / "db"))
+    diary.save_entries([{'title': f"Video {i}", 'url': f"https://youtu.be/{i:011d}", 'creator': "Someone",
+                         'description': "", 'format_info': "Video", 'video_path': f"videos/Video {i}.mp4"}
+                        for i in range(n)])
+    diary.close()
+
+def test_profiler_report():
+    ticks = iter([0.0, 0.010, 0.015, 0.020, 0.040, 0.050, 0.060, 0.100])
+    profiler = StartupProfiler(clock=lambda: next(ticks))
+    with profiler.phase("window"):
+        with profiler.phase("stores"):
+            pass
+    with profiler.phase("show"):
+        pass
+    data = profiler.to_dict()
+    assert [(p['name'], p['depth']) for p in data['phases']] == [("window", 0), ("stores", 1), ("show", 0)]
+    assert data['phases'][0]['duration'] == pytest.approx(0.030)
+    assert "  stores" in profiler.report()
+
+def test_profiling_requested():
+    assert profiling_requested(['yt'], {}) is None
+    assert profiling_requested(['yt', '--profile-startup'], {}) is True
+    assert profiling_requested(['yt'], {'YT_PROFILE_STARTUP': '1'}) is True
+    assert profiling_requested(['yt'], {'YT_PROFILE_STARTUP': 'out.json'}) == 'out.json'
+
+def test_main_does_not_import_heavy_modules(tmp_path):
+    code = f"import sys, yt.main; print([m for m in {HEAVY!r} if m in sys.modules])"
+    result = run_python(code, tmp_path)
+    assert result.stdout.strip() == "[]", result.stderr
+
+STARTUP_PHASES = [
+    ("import PySide6", 0), ("import app modules", 0), ("QApplication", 0), ("main window", 0),
+    ("open stores", 1), ("build window", 1), ("menu and theme", 1), ("start background jobs", 1),
+    ("show", 0), ("load icons", 0), ("first event loop pass", 0),
+]
+
+# Starts the app with profiling on and prints the phases already begun whenever the Explorer
+# builds its widgets or a library row, or the library folders are scanned
+START_APP = """
+import json, sys
+sys.argv = ['yt']
+from yt.startup import profiler
+from yt.library_index import LibraryIndex
+from yt.ui import explorer_tab
+loads = []
+def probe(function):
+    def wrapper(*args, **kwargs):
+        loads.append([p[0] for p in profiler.phases])
+        return function(*args, **kwargs)
+    return wrapper
+explorer_tab.library_row = probe(explorer_tab.library_row)
+explorer_tab.ExplorerTab.setup_ui = probe(explorer_tab.ExplorerTab.setup_ui)
+LibraryIndex.scan = probe(LibraryIndex.scan)
+from yt.main import main
+try:
+    main()
+finally:
+    print(json.dumps(loads))
+"""
+
+def start_app(path):
+    profile = path / "startup.json"
+    result = run_python(START_APP, path, YT_PROFILE_STARTUP=str(profile))
+    assert result.returncode == 0, result.stderr
+    return json.loads(profile.read_text()), json.loads(result.stdout.splitlines()[-1])
+
+def test_startup_phases_and_lazy_library(tmp_path):
+    # Startup must not grow with the library: the Explorer loads it only once the window is shown
+    seed_diary(tmp_path, 3000)
+    data, loads = start_app(tmp_path)
+    assert [(p['name'], p['depth']) for p in data['phases']] == STARTUP_PHASES
+    assert all("show" in begun for begun in loads)
+
+def test_library_size_does_not_slow_startup(tmp_path):
+    # Relative to the same machine's empty-library startup, and loose, so a busy machine doesn't fail it
+    totals = {}
+    for n in (0, 3000):
+        path = tmp_path / str(n)
+        path.mkdir()
+        seed_diary(path, n)
+        totals[n] = min(start_app(path)[0]['total'] for _ in range(2))
+    assert totals[3000] < totals[0] * STARTUP_LIBRARY_RATIO, totals
+
+def test_explorer_is_built_on_first_show(tmp_path):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from yt.ui.explorer_tab import ExplorerTab
+    app = QApplication.instance() or QApplication([])
+    seed_diary(tmp_path, 20)
+    diary = DiaryManager(str(tmp_path / "db"))
+    tab = ExplorerTab(diary)
+    tab.refresh_explorer() # Before the first show: nothing to do yet
+    assert not tab.built and not hasattr(tab, 'model')
+
+    tab.show()
+    assert tab.built and tab.model.rowCount() == 0 # Rows come on the next event loop pass
+    deadline = time.time() + 5
+    while tab.model.rowCount() < 20 and time.time() < deadline:
+        app.processEvents()
+    assert tab.model.rowCount() == 20
+    tab.stop_scan()
+    tab.close()
+    diary.close()
@@ -0,0 +1,94 @@
+import os
+import time
+import pytest
+from yt.diary import DiaryManager
+from yt.ui import icons
+from yt.ui.theme import PALETTES, ThemeManager, compile_stylesheet, scope, themes
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+@pytest.fixture(scope="module")
+def app():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+def test_scope():
+    sheet = scope("QMainWindow { color: red; }\nQFrame#card, QMenu::item:selected { border: none; }", "dark")
+    assert sheet.splitlines() == [
+        'QMainWindow[theme="dark"] { color: red; }',
+        'QMainWindow[theme="dark"] QFrame#card, QMainWindow[theme="dark"] QMenu::item:selected { border: none; }',
+    ]
+
+def test_one_sheet_for_all_themes():
+    sheet = compile_stylesheet()
+    assert '[theme="dark"]' in sheet and '[theme="light"]' in sheet
+    assert "$" not in sheet and set(PALETTES['dark']) == set(PALETTES['light'])
+
+def test_switching_restyles_and_reuses_icons(app, monkeypatch):
+    from PySide6.QtWidgets import QMainWindow, QFrame, QPushButton
+    window = QMainWindow()
+    card = QFrame()
+    card.setObjectName("card")
+    window.setCentralWidget(card)
+    button = QPushButton(card)
+    manager = ThemeManager()
+    manager.attach(window)
+    monkeypatch.setattr(icons, 'loaded', True)
+    manager.set_icon(button, {'dark': 'fa5s.moon', 'light': 'fa5s.sun'})
+    window.resize(200, 100)
+    window.show()
+    app.processEvents()
+    pixel = lambda: card.grab().toImage().pixelColor(card.width() // 2, card.height() - 5).name()
+    assert pixel() == PALETTES['dark']['card'].lower()
+
+    manager.prepare_icons()
+    made = icons.icon.cache_info().misses
+    changes = []
+    manager.theme_changed.connect(changes.append)
+    assert manager.toggle() == "light"
+    app.processEvents()
+    assert pixel() == PALETTES['light']['card'].lower()
+    assert changes == ["light"] and icons.icon.cache_info().misses == made
+
+    # Widgets deleted since registering are dropped, not an error
+    from shiboken6 import delete
+    delete(button)
+    manager.toggle()
+    assert manager.themed_icons == []
+    window.close()
+
+def test_explorer_restyles_without_reloading(app, tmp_path, monkeypatch):
+    from PySide6.QtWidgets import QMainWindow
+    from yt.ui.explorer_tab import ExplorerTab
+    diary = DiaryManager(str(tmp_path / "db"))
+    diary.save_entries([{'title': f"Video {i}", 'url': f"https://youtu.be/{i:011d}", 'creator': "Someone",
+                         'description': "", 'format_info': "Video"} for i in range(5)])
+    tab = ExplorerTab(diary)
+    window = QMainWindow()
+    window.setCentralWidget(tab)
+    window.resize(600, 500)
+    monkeypatch.setattr(themes, 'window', None)
+    themes.attach(window)
+    window.show()
+    deadline = time.time() + 5
+    while (tab.model.rowCount() < 5 or tab.scan_thread) and time.time() < deadline:
+        app.processEvents()
+
+    def reload(*args, **kwargs):
+        raise AssertionError("theme switch reloaded the library")
+    monkeypatch.setattr(diary, 'get_all_entries', reload)
+    monkeypatch.setattr(tab, 'refresh_explorer', reload)
+    viewport = tab.explorer_table.viewport()
+    # Below the last row: the table's own background
+    pixel = lambda: viewport.grab().toImage().pixelColor(5, viewport.height() - 5).name()
+    assert pixel() == PALETTES['dark']['input'].lower()
+    themes.toggle()
+    app.processEvents()
+    assert tab.delegate.link_color.name() == PALETTES['light']['link'].lower()
+    assert pixel() == PALETTES['light']['input'].lower()
+    themes.toggle()
+    app.processEvents()
+    assert tab.model.rowCount() == 5
+    tab.stop_scan()
+    window.close()
+    diary.close()
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+import pytest
+from yt.thumbnails import ThumbnailStore, ThumbnailCache, image_ext, sidecar_path
+
+# Smallest valid images QImage can decode
+PNG_1PX = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+                        "0000000c49444154089963f8cfc00000030101009ce3bf590000000049454e44ae426082")
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    def __init__(self, content=PNG_1PX, delay=0):
+        self.content = content
+        self.delay = delay
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        time.sleep(self.delay)
+        return FakeResponse(self.content)
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def store(tmp_path):
+    store = ThumbnailStore(str(tmp_path / "db"))
+    store.session = FakeSession()
+    return store
+
+def test_fetch_hits_network_once(store):
+    assert store.fetch("dQw4w9WgXcQ") == PNG_1PX
+    assert store.fetch("dQw4w9WgXcQ", "https://example.invalid/x.jpg") == PNG_1PX
+    assert store.session.urls == ["https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg"]
+
+def test_concurrent_misses_share_one_download(store):
+    store.session.delay = 0.1
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.fetch("abcdefghijk"))) for _ in range(5)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert results == [PNG_1PX] * 5
+    assert len(store.session.urls) == 1
+
+def test_save_beside(store, tmp_path):
+    video = tmp_path / "videos" / "Clip [720p].mp4"
+    video.parent.mkdir()
+    video.write_bytes(b"")
+    path = store.save_beside(str(video), "abcdefghijk")
+    assert path == str(tmp_path / "videos" / "Clip [720p].png")
+    assert sidecar_path(str(video)) == path
+    # Second call reuses the file
+    assert store.save_beside(str(video), "abcdefghijk") == path
+    assert len(store.session.urls) == 1
+
+def test_image_ext():
+    assert image_ext(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == ".webp"
+    assert image_ext(PNG_1PX) == ".png"
+    assert image_ext(b"\xff\xd8\xff\xe0") == ".jpg"
+
+def test_thumbnail_cache_evicts_oldest(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1000)
+    for i in range(5):
+        cache.put(f"v{i}", bytes(300))
+    assert cache.get("v0") is None and cache.get("v4") == bytes(300)
+    assert cache.total <= 1000
+    cache.close()
+    # Size accounting survives a reopen
+    assert ThumbnailCache(str(tmp_path), max_bytes=1000).total == cache.total
+
+@pytest.fixture
+def qapp():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+def wait_for(app, condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+def test_service_caches_and_coalesces(store, qapp):
+    from yt.thumbnail_service import ThumbnailService
+    app = qapp
+
+    service = ThumbnailService(store, max_pixmaps=1)
+    ready = []
+    service.thumbnail_ready.connect(lambda key, pixmap: ready.append(key))
+    assert service.request("abcdefghijk", size=(32, 18)) is None
+    assert service.request("abcdefghijk", size=(32, 18)) is None # already in flight
+    wait_for(app, lambda: ready)
+    assert ready == [("abcdefghijk", (32, 18))]
+    assert service.request("abcdefghijk", size=(32, 18)) is not None
+
+    # LRU holds one pixmap: a second size evicts the first
+    service.request("abcdefghijk", size=(64, 36))
+    wait_for(app, lambda: len(ready) == 2)
+    assert list(service.pixmaps) == [("abcdefghijk", (64, 36))]
+    service.shutdown()
+
+def test_library_thumbnails_prefer_files_next_to_videos(store, qapp, tmp_path):
+    from yt.thumbnail_service import ThumbnailService
+    service = ThumbnailService(store)
+    video = tmp_path / "Clip.mp4"
+    video.write_bytes(b"")
+    (tmp_path / "Clip.png").write_bytes(PNG_1PX)
+
+    ready = []
+    service.thumbnail_ready.connect(lambda key, pixmap: ready.append(key))
+    assert service.request_library("abcdefghijk", None, str(video), (64, 36)) is None
+    assert service.request_library("zzzzzzzzzzz", None, None, (64, 36)) is None
+    wait_for(qapp, lambda: len(ready) == 2)
+    assert store.session.urls == ["https://i.ytimg.com/vi/zzzzzzzzzzz/hqdefault.jpg"]
+
+    # Decoded once, then served from the compact cache and the pixmap LRU
+    assert service.request_library("abcdefghijk", None, str(video), (64, 36)) is not None
+    assert service.small_cache.get("abcdefghijk@64x36")
+    service.shutdown()
+
+def test_library_jobs_for_scrolled_away_rows_are_dropped(store, qapp):
+    from yt.thumbnail_service import ThumbnailService
+    service = ThumbnailService(store, max_threads=1)
+    store.session.delay = 0.2
+    service.request_library("aaaaaaaaaaa", None, None, (64, 36))
+    service.request_library("bbbbbbbbbbb", None, None, (64, 36))
+    service.forget_wanted() # scrolled while the second job was still queued
+    wait_for(qapp, lambda: not service.in_flight)
+    assert "https://i.ytimg.com/vi/bbbbbbbbbbb/hqdefault.jpg" not in store.session.urls
+    assert service.request_library("bbbbbbbbbbb", None, None, (64, 36)) is None # asked again once visible
+    service.shutdown()
+
+def test_failed_library_thumbnails_are_retried_later(store, qapp):
+    from yt.thumbnail_service import ThumbnailService, RETRY_AFTER
+    now = [0]
+    service = ThumbnailService(store, clock=lambda: now[0])
+    def offline(url, timeout=None):
+        store.session.urls.append(url)
+        raise OSError("offline")
+    store.session.get = offline
+    ask = lambda: service.request_library("ccccccccccc", None, None, (64, 36))
+    ask()
+    wait_for(qapp, lambda: not service.in_flight)
+    ask() # repaints don't hit the network again...
+    assert len(store.session.urls) == 1 and not service.in_flight
+
+    now[0] = RETRY_AFTER # ...until the backoff is over
+    ask()
+    wait_for(qapp, lambda: not service.in_flight)
+    assert len(store.session.urls) == 2
+    now[0] += RETRY_AFTER
+    ask() # twice as long after the second failure
+    assert not service.in_flight
+
+    service.retry("ccccccccccc") # its files changed
+    ask()
+    wait_for(qapp, lambda: not service.in_flight)
+    assert len(store.session.urls) == 3
+    service.shutdown()
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import pytest
+from yt.diary import DiaryManager
+from yt.transcript_store import TranscriptStore, parse_srt_cues, store_missing_transcripts
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(str(tmp_path / "db"))
+    yield store
+    store.close()
+
+CUES = [(0.0, 2.5, "[Music]"), (2.5, 30.0, "a long caption that stays up"), (5.0, 6.0, "short"),
+        (10.0, 12.0, "[Music]"), (12.0, 14.0, "café ☕")]
+
+def test_roundtrip_and_window(store):
+    offset = store.add(CUES)
+    assert store.count(offset) == 5
+    assert list(store.cues(offset)) == CUES
+    assert list(store.cues(offset, 3)) == CUES[3:]
+    # The long cue started before the window but is still on screen in it
+    assert [c[2] for c in store.window(offset, 9, 11)] == ["a long caption that stays up", "[Music]"]
+    assert list(store.window(offset, 40, 50)) == []
+
+def test_strings_are_pooled_and_survive_reopen(store, tmp_path):
+    first = store.add(CUES)
+    size = os.path.getsize(store.path)
+    second = store.add(CUES)
+    # Only the columns are new: 8 header + 5 * (4 + 4 + 8) bytes
+    assert os.path.getsize(store.path) - size == 8 + 8 + 5 * 16
+    store.close()
+
+    reopened = TranscriptStore(str(tmp_path / "db"))
+    third = reopened.add([(0, 1, "[Music]"), (1, 2, "new")])
+    assert list(reopened.cues(first)) == list(reopened.cues(second)) == CUES
+    assert list(reopened.cues(third))[1] == (1.0, 2.0, "new")
+    assert len(reopened.pool) == 5
+    reopened.close()
+
+def test_half_written_tail_is_cleared_not_truncated(store, tmp_path):
+    offset = store.add(CUES)
+    cues = store.cues(offset) # Holds a view of the map as it is now
+    with open(store.path, 'ab') as f:
+        f.write(b"\x02\x00\x00\x00\xff\xff\x00\x00garbage")
+    size = os.path.getsize(store.path)
+    later = store.add([(1, 2, "after the crash")])
+    assert os.path.getsize(store.path) >= size
+    assert list(cues) == CUES
+    assert list(store.cues(later)) == [(1.0, 2.0, "after the crash")]
+    reopened = TranscriptStore(str(tmp_path / "db"))
+    assert list(reopened.cues(reopened.add([(1, 2, "after the crash")]))) == [(1.0, 2.0, "after the crash")]
+    assert "after the crash" in reopened.pool
+    reopened.close()
+
+def test_two_writers_on_one_file(store, tmp_path):
+    other = TranscriptStore(str(tmp_path / "db"))
+    first = store.add(CUES)
+    # The other writer's pool catches up before it appends, so its refs point at real strings
+    second = other.add([(0, 1, "[Music]"), (1, 2, "from the other one")])
+    third = store.add([(0, 1, "from the other one"), (1, 2, "back again")])
+    for reader in (store, other):
+        assert list(reader.cues(first)) == CUES
+        assert list(reader.cues(second)) == [(0.0, 1.0, "[Music]"), (1.0, 2.0, "from the other one")]
+        assert list(reader.cues(third)) == [(0.0, 1.0, "from the other one"), (1.0, 2.0, "back again")]
+    assert store.pool["from the other one"] == other.pool["from the other one"]
+    other.close()
+
+WRITER = """
+import sys
+from yt.transcript_store import TranscriptStore
+store = TranscriptStore(sys.argv[1])
+for i in range(100):
+    print(store.add([(0, 1, "[Music]"), (1, 2, f"{sys.argv[2]} {i}")]))
+"""
+
+def test_processes_appending_at_once(tmp_path):
+    db = str(tmp_path / "db")
+    TranscriptStore(db).close()
+    env = {**os.environ, 'PYTHONPATH': SRC}
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, db, name], env=env, stdout=subprocess.PIPE, text=True)
+               for name in ("gui", "cli")]
+    offsets = {name: [int(line) for line in w.communicate(timeout=60)[0].split()] for name, w in zip(("gui", "cli"), writers)}
+    store = TranscriptStore(db)
+    for name, found in offsets.items():
+        assert [list(store.cues(offset)) for offset in found] == [[(0.0, 1.0, "[Music]"), (1.0, 2.0, f"{name} {i}")]
+                                                                  for i in range(100)]
+    store.close()
+
+def test_store_missing_transcripts(store, tmp_path):
+    srt = tmp_path / "clip.en.srt"
+    srt.write_text("1\n00:00:01,000 --> 00:00:02,500\nHello <b>there</b>\n\n2\n00:01:00,000 --> 00:01:01,000\nBye\n",
+                   encoding="utf-8")
+    assert parse_srt_cues(srt.read_text(encoding="utf-8")) == [(1.0, 2.5, "Hello there"), (60.0, 61.0, "Bye")]
+    diary = DiaryManager(str(tmp_path / "db"), flush_delay=0)
+    diary.save_entry("Clip", "https://youtu.be/aaaaaaaaaaa", "C", "D", "F", srt_path=str(srt))
+    diary.save_entry("Video only", "https://youtu.be/bbbbbbbbbbb", "C", "D", "F", video_path="missing.mp4")
+    assert store_missing_transcripts(store, diary) == 1
+    assert store_missing_transcripts(store, diary) == 0
+    entry = diary.find_by_url("https://youtu.be/aaaaaaaaaaa")
+    assert list(store.window(entry['transcript_offset'], 59, 70)) == [(60.0, 61.0, "Bye")]
+    # A new .srt for the entry unlinks the stale copy
+    diary.save_entry("Clip", "https://youtu.be/aaaaaaaaaaa", "C", "D", "F", srt_path=str(srt))
+    assert diary.find_by_url("https://youtu.be/aaaaaaaaaaa")['transcript_offset'] is None
+    diary.close()
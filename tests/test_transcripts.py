@@ -0,0 +1,114 @@
+import json
+import os
+import pytest
+from youtube_transcript_api import (FetchedTranscript, FetchedTranscriptSnippet, RequestBlocked, PoTokenRequired,
+                                    TranscriptsDisabled)
+import yt.transcripts as transcripts
+from yt.transcripts import TranscriptEngine, pick_transcript, result_record
+
+class FakeTranscript:
+    def __init__(self, video_id, code, is_generated):
+        self.video_id = video_id
+        self.language_code = code
+        self.language = code.upper()
+        self.is_generated = is_generated
+
+    def fetch(self):
+        return FetchedTranscript([FetchedTranscriptSnippet("Hello there", 1.5, 2.0),
+                                  FetchedTranscriptSnippet("General Kenobi", 4.0, 1.0)],
+                                 self.video_id, self.language, self.language_code, self.is_generated)
+
+class FakeList(list):
+    def find_transcript(self, codes):
+        return next(t for t in self if t.language_code in codes)
+
+class FakeApi:
+    """Stands in for YouTubeTranscriptApi; `behaviour[video_id]` is a list of exceptions to raise first."""
+    behaviour = {}
+    calls = []
+
+    def __init__(self, http_client=None):
+        self.http_client = http_client
+
+    def list(self, video_id):
+        self.calls.append(video_id)
+        errors = self.behaviour.get(video_id) or []
+        if errors:
+            raise errors.pop(0)
+        return FakeList([FakeTranscript(video_id, 'en', True), FakeTranscript(video_id, 'en-GB', False),
+                         FakeTranscript(video_id, 'de', False)])
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    FakeApi.behaviour = {}
+    FakeApi.calls = []
+    monkeypatch.setattr(transcripts, "YouTubeTranscriptApi", FakeApi)
+    return FakeApi
+
+def engine(tmp_path, **kwargs):
+    slept = []
+    e = TranscriptEngine(out_dir=str(tmp_path / "SRT"), clock=lambda: 0, sleep=slept.append, **kwargs)
+    e.slept = slept
+    return e
+
+def test_pick_prefers_manual_then_prefix():
+    tracks = FakeList([FakeTranscript("x", 'en', True), FakeTranscript("x", 'en-GB', False)])
+    assert pick_transcript(tracks, "en").language_code == 'en-GB'
+    assert pick_transcript(tracks, "fr") is None
+
+def test_writes_srt_and_json(fake_api, tmp_path):
+    result = engine(tmp_path).process({'id': "aaaaaaaaaaa", 'url': "https://youtu.be/aaaaaaaaaaa", 'title': "A/B clip"})
+    assert result['error'] is None and result['source'] == 'api' and result['language'] == 'en-GB'
+    assert result['srt_path'].endswith("A⧸B clip (Subtitle).en-GB.srt")
+    srt = open(result['srt_path'], encoding='utf-8').read()
+    assert "00:00:01,500 --> 00:00:03,500\nHello there" in srt
+    data = json.load(open(result['json_path'], encoding='utf-8'))
+    assert data['language_code'] == 'en-GB' and data['snippets'][1]['text'] == "General Kenobi"
+    assert result_record(result)['format_info'] == "Subtitle (en-GB)"
+
+def test_blocks_back_off_and_fallback(fake_api, tmp_path):
+    fallbacks = []
+
+    def fallback(entry, code):
+        fallbacks.append(entry['id'])
+        return "videos/SRT/x.en.srt", {'title': "From yt-dlp"}
+
+    e = engine(tmp_path, fallback=fallback)
+    fake_api.behaviour = {
+        "blocked1time": [RequestBlocked("blocked1time")],
+        "potokenvide": [PoTokenRequired("potokenvide")],
+        "nocaptions0": [TranscriptsDisabled("nocaptions0")],
+    }
+    results = {r['id']: r for r in e.run([{'id': i, 'title': i} for i in
+                                          ("blocked1time", "potokenvide", "nocaptions0")])}
+    # The block pauses every worker, not just the one that hit it
+    assert results["blocked1time"]['source'] == 'api' and e.slept and e.paused_until >= transcripts.BACKOFF_BASE
+    assert results["potokenvide"]['source'] == 'yt-dlp' and results["potokenvide"]['srt_path'] == "videos/SRT/x.en.srt"
+    assert results["nocaptions0"]['error'] and fallbacks == ["potokenvide"]
+
+def test_cli_subs_saves_diary_in_batches(fake_api, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    from yt import cli
+    from yt.diary import DiaryManager
+    monkeypatch.setattr(transcripts.TranscriptEngine, "fetch_title", lambda self, video_id: (f"T {video_id}", "C"))
+    saves = []
+    real = DiaryManager.save_entries
+    monkeypatch.setattr(DiaryManager, "save_entries", lambda self, records: saves.append(len(records)) or real(self, records))
+    monkeypatch.setattr(cli, "SAVE_BATCH", 2)
+    ids = [f"vid{i:08d}" for i in range(5)]
+    assert cli.main(["--json", "subs", *ids]) == 0
+    lines = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert sorted(l['id'] for l in lines) == ids and sorted(fake_api.calls) == ids
+    assert saves == [2, 2, 1]
+    assert cli.main(["--json", "search", "T", "vid00000003"]) == 0
+    assert [json.loads(l)['title'] for l in capsys.readouterr().out.splitlines()] == ["T vid00000003"]
+
+    diary = DiaryManager("db")
+    entry = diary.find_by_url("https://youtu.be/vid00000003")
+    diary.close()
+    assert cli.main(["--json", "transcript", entry['id'], "--from", "3.6", "--to", "4.5"]) == 0
+    assert [json.loads(l)['text'] for l in capsys.readouterr().out.splitlines()] == ["General Kenobi"]
+    json_path = entry['srt_path'][:-len(".srt")] + ".json"
+    assert os.path.exists(json_path)
+    assert cli.main(["delete", entry['id']]) == 0
+    assert not os.path.exists(json_path) and not os.path.exists(entry['srt_path'])
@@ -32,4 +32,4 @@ def test_path_stability():
     from yt.diary import DiaryManager
     manager = DiaryManager("db_test")
     assert "db_test" in manager.file_path
-    assert "download_history.json" in manager.file_path
+    assert "download_history.db" in manager.file_path